@@ -0,0 +1,77 @@
+"""
+Throughput benchmark for shittify_c_cpp on large generated headers.
+
+Run from the repository root:
+
+    python -m benchmarks.c_cpp [--sizes 0.25,1,4] [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+from src.language_transformers import shittify_c_cpp
+
+
+def generate_header(target_bytes: int, seed: int = 0) -> str:
+    """
+    Generate a macro-heavy C header with big lookup tables of roughly target_bytes.
+    
+    @param target_bytes: Approximate size of the generated header
+    @param seed: Seed for the generator
+    @return: Header source code
+    """
+    rng = random.Random(seed)
+    parts = ["#ifndef GENERATED_TABLES_H", "#define GENERATED_TABLES_H", "#include <stdint.h>", ""]
+    size = sum(len(p) + 1 for p in parts)
+    block = 0
+    while size < target_bytes:
+        lines = [
+            f"/* Table block {block}: generated, do not edit.",
+            "   Values are packed row-major. */",
+            f"#define TABLE_{block}_ROWS 64",
+            f"#define TABLE_{block}_GET(row, col) \\",
+            f"    (table_{block}[(row)][(col)])",
+            f"static const uint32_t table_{block}[TABLE_{block}_ROWS][16] = {{",
+        ]
+        for row in range(64):
+            values = ", ".join(f"ENTRY_{block}_{rng.randrange(4096)}" for _ in range(16))
+            lines.append(f"    {{{values}}}, // row {row}")
+        lines.append("};")
+        lines.append(f'static const char *table_{block}_name = "table_{block} \\"quoted\\"";')
+        lines.append(f"static inline uint32_t lookup_{block}(int row, int col) {{")
+        lines.append(f"    uint32_t value = TABLE_{block}_GET(row, col);")
+        lines.append("    return value;")
+        lines.append("}")
+        lines.append("")
+        parts.extend(lines)
+        size += sum(len(line) + 1 for line in lines)
+        block += 1
+    parts.append("#endif")
+    return "\n".join(parts) + "\n"
+
+
+def main() -> None:
+    """
+    Benchmark shittify_c_cpp at several input sizes and print throughput in MB/s.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="0.25,1,4", help="Comma-separated header sizes in MB.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best is reported.")
+    args = parser.parse_args()
+
+    print(f"{'size (MB)':>10} {'best (s)':>10} {'MB/s':>10}")
+    for size_mb in (float(s) for s in args.sizes.split(",")):
+        code = generate_header(int(size_mb * 1024 * 1024))
+        megabytes = len(code.encode("utf-8")) / (1024 * 1024)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            shittify_c_cpp(code, rng=random.Random(0))
+            best = min(best, time.perf_counter() - start)
+        print(f"{megabytes:>10.2f} {best:>10.3f} {megabytes / best:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Synthetic corpus generator for the benchmark suite.
+
+Generates deterministic source files per language and size regime:
+
+    small-files       many files of about 1 KB
+    huge-file         a few files of several hundred KB
+    deep-nesting      functions with deeply nested blocks
+    identifier-dense  code where almost every identifier is distinct
+    minified          whole files on one line
+
+Sizes scale linearly with --scale. Write a corpus to disk with:
+
+    python -m benchmarks.corpus --out /tmp/corpus [--scale 1] [--languages python,go]
+"""
+import argparse
+import os
+import random
+
+
+LANGUAGES = ("python", "c", "cpp", "javascript", "typescript", "go")
+
+REGIMES = ("small-files", "huge-file", "deep-nesting", "identifier-dense", "minified")
+
+EXTENSIONS = {
+    "python": ".py",
+    "c": ".c",
+    "cpp": ".cpp",
+    "javascript": ".js",
+    "typescript": ".ts",
+    "go": ".go",
+}
+
+# (number of files, approximate bytes per file) at scale 1.
+REGIME_SHAPES = {
+    "small-files": (200, 1024),
+    "huge-file": (2, 256 * 1024),
+    "deep-nesting": (20, 8 * 1024),
+    "identifier-dense": (20, 16 * 1024),
+    "minified": (4, 64 * 1024),
+}
+
+# Python rejects more than 100 indentation levels; stay well below on every language.
+NESTING_DEPTH = 40
+
+
+class _Names:
+    """
+    Identifier source: either a small reused vocabulary or an endless supply of distinct names.
+    """
+
+    WORDS = ("value", "count", "index", "total", "item", "node", "buffer", "offset", "result",
+             "left", "right", "state", "key", "entry", "size", "limit", "cursor", "delta")
+
+    def __init__(self, rng: random.Random, dense: bool):
+        """
+        Initialize the name source.
+        
+        @param rng: Random generator
+        @param dense: If True, every call returns a name never returned before
+        @return: None
+        """
+        self.rng = rng
+        self.dense = dense
+        self.counter = 0
+
+    def __call__(self) -> str:
+        """
+        Return the next identifier.
+        
+        @return: Identifier
+        """
+        self.counter += 1
+        word = self.rng.choice(self.WORDS)
+        if self.dense:
+            return f"{word}_{self.counter}"
+        return f"{word}_{self.counter % 7}"
+
+
+def _python_function(name: str, names: _Names, depth: int) -> str:
+    """
+    Generate one Python function.
+    
+    @param name: Function name
+    @param names: Identifier source
+    @param depth: Nesting depth of the if-chain in the body
+    @return: Source code
+    """
+    a, b, x = names(), names(), names()
+    lines = [f"def {name}({a}, {b}=2):", f"    {x} = {a} * {b} + len(str({a}))"]
+    indent = "    "
+    for level in range(depth):
+        lines.append(f"{indent}if {x} > {level}:")
+        indent += "    "
+        lines.append(f"{indent}{x} = {x} - 1  # level {level}")
+    lines.append(f"{indent}{x} = [{a} for {a} in range({x}) if {a} % 2]")
+    lines.append(f"    return {{'{name}': {x}, \"{b}\": f\"{{{a}!r}}\"}}")
+    return "\n".join(lines) + "\n"
+
+
+def _python_class(name: str, names: _Names) -> str:
+    """
+    Generate one Python class with a few methods.
+    
+    @param name: Class name
+    @param names: Identifier source
+    @return: Source code
+    """
+    field, other = names(), names()
+    method = names()
+    return (f"class {name}:\n"
+            f"    def __init__(self, {field}):\n"
+            f"        self.{field} = {field}\n"
+            f"\n"
+            f"    def {method}(self, {other}=None):\n"
+            f"        return self.{field} if {other} is None else {other}\n")
+
+
+def _c_function(name: str, names: _Names, depth: int, cpp: bool) -> str:
+    """
+    Generate one C or C++ function.
+    
+    @param name: Function name
+    @param names: Identifier source
+    @param depth: Nesting depth of the if-chain in the body
+    @param cpp: Generate C++ (references, std::vector) instead of C
+    @return: Source code
+    """
+    a, b, x = names(), names(), names()
+    if cpp:
+        lines = [f"static int {name}(const std::vector<int> &{a}, int {b}) {{",
+                 f"    int {x} = static_cast<int>({a}.size()) * {b};"]
+    else:
+        lines = [f"static int {name}(const int *{a}, int {b}) {{",
+                 f"    int {x} = {a}[0] * {b}; /* product */"]
+    indent = "    "
+    for level in range(depth):
+        lines.append(f"{indent}if ({x} > {level}) {{")
+        indent += "    "
+        lines.append(f"{indent}{x} -= 1; // level {level}")
+    for level in range(depth):
+        indent = indent[:-4]
+        lines.append(f"{indent}}}")
+    lines.append(f'    printf("%d {name}\\n", {x});')
+    lines.append(f"    return {x};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _js_function(name: str, names: _Names, depth: int, typed: bool) -> str:
+    """
+    Generate one JavaScript or TypeScript function.
+    
+    @param name: Function name
+    @param names: Identifier source
+    @param depth: Nesting depth of the if-chain in the body
+    @param typed: Add TypeScript annotations
+    @return: Source code
+    """
+    a, b, x = names(), names(), names()
+    annotation = ": number" if typed else ""
+    lines = [f"function {name}({a}{annotation}, {b}{annotation} = 2){annotation} {{",
+             f"  let {x} = {a} * {b} + `${{{a}}}`.length;"]
+    indent = "  "
+    for level in range(depth):
+        lines.append(f"{indent}if ({x} > {level}) {{")
+        indent += "  "
+        lines.append(f"{indent}{x} -= 1; // level {level}")
+    for level in range(depth):
+        indent = indent[:-2]
+        lines.append(f"{indent}}}")
+    lines.append(f"  return /^{name}/.test(String({x})) ? {x} : {{ {name}: {x} }};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _go_function(name: str, names: _Names, depth: int) -> str:
+    """
+    Generate one Go function.
+    
+    @param name: Function name
+    @param names: Identifier source
+    @param depth: Nesting depth of the if-chain in the body
+    @return: Source code
+    """
+    a, b, x = names(), names(), names()
+    lines = [f"func {name}({a} []int, {b} int) int {{", f"\t{x} := len({a}) * {b}"]
+    indent = "\t"
+    for level in range(depth):
+        lines.append(f"{indent}if {x} > {level} {{")
+        indent += "\t"
+        lines.append(f"{indent}{x}-- // level {level}")
+    for level in range(depth):
+        indent = indent[:-1]
+        lines.append(f"{indent}}}")
+    lines.append(f'\tfmt.Println("{name}", strings.Repeat("x", {x}))')
+    lines.append(f"\treturn {x}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _header(language: str) -> str:
+    """
+    Return the file prologue for a language.
+    
+    @param language: Language name
+    @return: Source code
+    """
+    if language == "python":
+        return "import os\nfrom collections import OrderedDict\n\n"
+    if language == "c":
+        return "#include <stdio.h>\n#include <stdlib.h>\n\n"
+    if language == "cpp":
+        return "#include <cstdio>\n#include <vector>\n\nnamespace generated {\n\n"
+    if language in ("javascript", "typescript"):
+        return "import { readFile } from 'fs';\nconst path = require('path');\n\n"
+    return 'package generated\n\nimport (\n\t"fmt"\n\t"strings"\n)\n\n'
+
+
+def _footer(language: str) -> str:
+    """
+    Return the file epilogue for a language.
+    
+    @param language: Language name
+    @return: Source code
+    """
+    return "}  // namespace generated\n" if language == "cpp" else ""
+
+
+def _unit(language: str, name: str, names: _Names, depth: int, rng: random.Random) -> str:
+    """
+    Generate one top-level unit (function or class) in a language.
+    
+    @param language: Language name
+    @param name: Name of the unit
+    @param names: Identifier source
+    @param depth: Nesting depth
+    @param rng: Random generator
+    @return: Source code
+    """
+    if language == "python":
+        if rng.random() < 0.25:
+            return _python_class(name.title().replace("_", ""), names) + "\n\n"
+        return _python_function(name, names, depth) + "\n\n"
+    if language in ("c", "cpp"):
+        return _c_function(name, names, depth, language == "cpp") + "\n"
+    if language in ("javascript", "typescript"):
+        return _js_function(name, names, depth, language == "typescript") + "\n"
+    return _go_function(name, names, depth) + "\n"
+
+
+def _minify(language: str, units: list) -> str:
+    """
+    Join generated statements into a single line.
+    
+    @param language: Language name
+    @param units: Flat statements (no comments) to join
+    @return: One-line source code with a trailing newline
+    """
+    if language == "go":
+        return "package generated; " + "; ".join(units) + "\n"
+    if language == "python":
+        return ";".join(units) + "\n"
+    return "".join(units) + "\n"
+
+
+def _minified_statements(language: str, names: _Names, target_bytes: int) -> list:
+    """
+    Generate comment-free statements for a minified file.
+    
+    @param language: Language name
+    @param names: Identifier source
+    @param target_bytes: Approximate total size
+    @return: List of statements
+    """
+    statements = []
+    size = 0
+    while size < target_bytes:
+        a, b, f = names(), names(), names()
+        if language == "python":
+            statement = f"{a}=len(str({size}));{b}=[{a}*2 for {f} in range({a})]"
+        elif language in ("c", "cpp"):
+            statement = f"static int {f}(int {a}){{int {b}={a}*2;if({b}>{a}){{{b}-=1;}}return {b};}}"
+        elif language in ("javascript", "typescript"):
+            statement = f"function {f}({a}){{let {b}={a}*2;return {b}>{a}?{b}-1:`${{{a}}}`;}}"
+        else:
+            statement = f"func {f}({a} int) int {{ {b} := {a} * 2; if {b} > {a} {{ {b}-- }}; return {b} }}"
+        statements.append(statement)
+        size += len(statement) + 1
+    return statements
+
+
+def generate_file(language: str, regime: str, index: int, scale: float = 1.0, seed: int = 0) -> str:
+    """
+    Generate one file of a corpus.
+    
+    @param language: Language from LANGUAGES
+    @param regime: Size regime from REGIMES
+    @param index: Index of the file within the corpus
+    @param scale: Size multiplier
+    @param seed: Seed for the generator
+    @return: Source code
+    """
+    rng = random.Random(f"{seed}:{language}:{regime}:{index}")
+    names = _Names(rng, dense=regime == "identifier-dense")
+    target_bytes = int(REGIME_SHAPES[regime][1] * scale)
+    if regime == "minified":
+        return _minify(language, _minified_statements(language, names, target_bytes))
+    depth = NESTING_DEPTH if regime == "deep-nesting" else 2
+    parts = [_header(language)]
+    size = len(parts[0])
+    unit = 0
+    while size < target_bytes:
+        text = _unit(language, f"fn_{index}_{unit}" if not names.dense else names(), names, depth, rng)
+        parts.append(text)
+        size += len(text)
+        unit += 1
+    parts.append(_footer(language))
+    return "".join(parts)
+
+
+def generate_corpus(language: str, regime: str, scale: float = 1.0, seed: int = 0) -> list:
+    """
+    Generate every file of one corpus.
+    
+    @param language: Language from LANGUAGES
+    @param regime: Size regime from REGIMES
+    @param scale: Size multiplier (file sizes for huge-file, file counts for small-files)
+    @param seed: Seed for the generator
+    @return: List of (file name, source code) pairs
+    """
+    count, _ = REGIME_SHAPES[regime]
+    if regime == "small-files":
+        count, file_scale = max(1, int(count * scale)), 1.0
+    else:
+        file_scale = scale
+    return [
+        (f"{regime}_{index}{EXTENSIONS[language]}", generate_file(language, regime, index, file_scale, seed))
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    """
+    Write synthetic corpora to a directory tree: <out>/<language>/<regime>/<files>.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="Output directory.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Size multiplier.")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed.")
+    parser.add_argument("--languages", default=",".join(LANGUAGES), help="Comma-separated languages.")
+    parser.add_argument("--regimes", default=",".join(REGIMES), help="Comma-separated regimes.")
+    args = parser.parse_args()
+
+    for language in args.languages.split(","):
+        for regime in args.regimes.split(","):
+            directory = os.path.join(args.out, language, regime)
+            os.makedirs(directory, exist_ok=True)
+            corpus = generate_corpus(language, regime, args.scale, args.seed)
+            for name, source in corpus:
+                with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+                    f.write(source)
+            total = sum(len(source) for _, source in corpus)
+            print(f"{language:11} {regime:17} {len(corpus):4} files {total / 1024:9.1f} KB -> {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-file latency of a cold CLI run versus a request to a warm daemon.
+
+Starts `main.py --serve` on a temporary socket, then compares running the CLI
+in a fresh interpreter on a small file with sending the same file to the
+daemon. Run from the repository root:
+
+    python -m benchmarks.daemon [--requests 200]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.daemon import daemon_is_running, obfuscate_remote, request
+
+
+SAMPLES = {
+    "python": "import os\n\ndef area(width, height):\n    result = width * height\n    return result\n\nprint(area(2, 3))\n",
+    "c": "#include <stdio.h>\n\nint main(void) {\n    int total = 2 * 3;\n    printf(\"%d\\n\", total);\n    return 0;\n}\n",
+    "go": "package main\n\nimport \"fmt\"\n\nfunc main() {\n\ttotal := 2 * 3\n\tfmt.Println(total)\n}\n",
+}
+
+
+def cold_run_ms(language: str, source: str, runs: int) -> float:
+    """
+    Median wall time of the CLI in a fresh interpreter, reading stdin.
+    
+    @param language: Language name
+    @param source: Source code
+    @param runs: Number of runs
+    @return: Milliseconds
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--no-cache", "-", "--lang", language],
+                       input=source.encode("utf-8"), capture_output=True, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def daemon_ms(socket_path: str, language: str, source: str, requests: int) -> float:
+    """
+    Median round-trip time of obfuscation requests to the daemon.
+    
+    @param socket_path: Daemon socket
+    @param language: Language name
+    @param source: Source code
+    @param requests: Number of requests
+    @return: Milliseconds
+    """
+    times = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        obfuscate_remote(socket_path, source, language)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main() -> None:
+    """
+    Start a daemon, measure both paths for every sample language and print the results.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Daemon requests per language.")
+    parser.add_argument("--cold-runs", type=int, default=5, help="Fresh CLI runs per language.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        socket_path = os.path.join(workdir, "bench.sock")
+        server = subprocess.Popen([sys.executable, "main.py", "--serve", "--no-cache", "--socket", socket_path],
+                                  stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + 30
+            while not daemon_is_running(socket_path):
+                if time.monotonic() > deadline or server.poll() is not None:
+                    sys.exit("daemon did not start")
+                time.sleep(0.05)
+            print(f"{'language':10} {'cold CLI':>10} {'daemon':>10}")
+            for language, source in SAMPLES.items():
+                cold = cold_run_ms(language, source, args.cold_runs)
+                warm = daemon_ms(socket_path, language, source, args.requests)
+                print(f"{language:10} {cold:8.1f} ms {warm:8.2f} ms")
+            request(socket_path, {"op": "shutdown"})
+        finally:
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Throughput benchmark for shittify_go on generated protobuf-style Go files.
+
+The generated files mimic protoc-gen-go output: a grouped import block, long
+raw-string struct tags, many message types with getters, and large
+descriptor byte tables. Run from the repository root:
+
+    python -m benchmarks.go [--messages 50,200,800] [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+from src.language_transformers import shittify_go
+
+
+def generate_pb_go(message_count: int, seed: int = 0) -> str:
+    """
+    Generate a *.pb.go-like file with message_count message types.
+    
+    @param message_count: Number of message types to generate
+    @param seed: Seed for the generator
+    @return: Go source code
+    """
+    rng = random.Random(seed)
+    parts = [
+        "// Code generated by protoc-gen-go. DO NOT EDIT.",
+        "// source: service.proto",
+        "",
+        "package servicepb",
+        "",
+        "import (",
+        '\tprotoreflect "google.golang.org/protobuf/reflect/protoreflect"',
+        '\tprotoimpl "google.golang.org/protobuf/runtime/protoimpl"',
+        '\treflect "reflect"',
+        '\tsync "sync"',
+        ")",
+        "",
+    ]
+    for index in range(message_count):
+        name = f"Message{index}"
+        fields = [(f"Field{index}_{j}", f"field_{index}_{j}", rng.choice(["string", "int64", "bool"]))
+                  for j in range(rng.randint(4, 12))]
+        parts.append(f"type {name} struct {{")
+        parts.append("\tstate         protoimpl.MessageState")
+        parts.append("\tsizeCache     protoimpl.SizeCache")
+        for number, (field, json_name, go_type) in enumerate(fields, 1):
+            parts.append(f'\t{field} {go_type} `protobuf:"bytes,{number},opt,name={json_name},proto3" '
+                         f'json:"{json_name},omitempty"`')
+        parts.append("}")
+        parts.append("")
+        parts.append(f"func (x *{name}) Reset() {{")
+        parts.append(f"\t*x = {name}{{}}")
+        parts.append(f"\tmi := &file_service_proto_msgTypes[{index}]")
+        parts.append("\tms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))")
+        parts.append("\tms.StoreMessageInfo(mi)")
+        parts.append("}")
+        parts.append("")
+        for field, _, go_type in fields:
+            zero = {"string": '""', "int64": "0", "bool": "false"}[go_type]
+            parts.append(f"func (x *{name}) Get{field}() {go_type} {{")
+            parts.append("\tif x != nil {")
+            parts.append(f"\t\treturn x.{field}")
+            parts.append("\t}")
+            parts.append(f"\treturn {zero}")
+            parts.append("}")
+            parts.append("")
+    parts.append("var file_service_proto_rawDesc = []byte{")
+    for _ in range(message_count * 4):
+        parts.append("\t" + ", ".join(f"0x{rng.randrange(256):02x}" for _ in range(16)) + ",")
+    parts.append("}")
+    parts.append("")
+    parts.append(f"var file_service_proto_msgTypes = make([]protoimpl.MessageInfo, {message_count})")
+    parts.append("var file_service_proto_rawDescOnce sync.Once")
+    parts.append("var _ = reflect.TypeOf")
+    parts.append("var _ protoreflect.Message")
+    return "\n".join(parts) + "\n"
+
+
+def main() -> None:
+    """
+    Benchmark shittify_go on files of increasing size and print throughput.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", default="50,200,800", help="Comma-separated message counts.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best is reported.")
+    args = parser.parse_args()
+
+    print(f"{'messages':>10} {'size (MB)':>10} {'best (s)':>10} {'MB/s':>10}")
+    for message_count in (int(m) for m in args.messages.split(",")):
+        code = generate_pb_go(message_count)
+        megabytes = len(code.encode("utf-8")) / (1024 * 1024)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            shittify_go(code, rng=random.Random(0))
+            best = min(best, time.perf_counter() - start)
+        print(f"{message_count:>10} {megabytes:>10.2f} {best:>10.3f} {megabytes / best:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
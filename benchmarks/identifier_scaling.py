@@ -0,0 +1,59 @@
+"""
+Scaling benchmark for the Python engines as the number of distinct identifiers grows.
+
+Each generated module defines N distinct names, attributes and functions. With
+constant-time name lookups the time per identifier should stay roughly flat as
+N doubles. Run from the repository root:
+
+    python -m benchmarks.identifier_scaling [--counts 1000,2000,4000,8000]
+"""
+import argparse
+import random
+import time
+
+from src.transformer import _obfuscate_code_with_ast_fallback, LIBCST_AVAILABLE
+
+
+def generate_module(identifier_count: int) -> str:
+    """
+    Generate a Python module with roughly identifier_count distinct identifiers.
+    
+    @param identifier_count: Number of distinct variables to define
+    @return: Python source code
+    """
+    lines = ["import os", ""]
+    for index in range(identifier_count // 4):
+        lines.append(f"def function_{index}(param_{index}):")
+        lines.append(f"    value_{index} = param_{index}.attribute_{index} + os.sep")
+        lines.append(f"    return value_{index}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    """
+    Time each Python engine at increasing identifier counts and print microseconds per identifier.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", default="1000,2000,4000,8000", help="Comma-separated identifier counts.")
+    args = parser.parse_args()
+
+    engines = [("ast", _obfuscate_code_with_ast_fallback)]
+    if LIBCST_AVAILABLE:
+        from src.transformer_libcst import obfuscate_code_with_libcst
+        engines.append(("libcst", obfuscate_code_with_libcst))
+
+    print(f"{'engine':>8} {'identifiers':>12} {'time (s)':>10} {'us/identifier':>14}")
+    for name, engine in engines:
+        for count in (int(c) for c in args.counts.split(",")):
+            code = generate_module(count)
+            start = time.perf_counter()
+            engine(code, rng=random.Random(0))
+            elapsed = time.perf_counter() - start
+            print(f"{name:>8} {count:>12} {elapsed:>10.3f} {elapsed / count * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
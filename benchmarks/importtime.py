@@ -0,0 +1,128 @@
+"""
+Import time of obfuscated Python modules vs the originals, with python -X importtime.
+
+One generated module per corpus regime (see benchmarks.corpus) is written to a
+temporary directory next to its obfuscated version for every installed Python
+engine. The .pyc files are written up front (also under PYTHONDONTWRITEBYTECODE),
+then each module is imported in a fresh interpreter --runs times, originals and
+obfuscated modules alternating, and the median cumulative import time of each
+is compared. The
+check fails (exit status 1) if an obfuscated module takes longer than
+original * (1 + budget) + slack. Run from the repository root:
+
+    python -m benchmarks.importtime [--runs 9] [--budget 0.1] [--slack-ms 0.5]
+"""
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.corpus import REGIMES, generate_file
+from src.api import run_backend
+from src.options import ObfuscationOptions, PYTHON_ENGINES
+from src.transformer import LIBCST_AVAILABLE
+
+
+def parse_importtime(stderr: str) -> tuple:
+    """
+    Parse -X importtime output.
+    
+    @param stderr: Standard error of the interpreter
+    @return: Tuple of (dict of top-level module name to cumulative microseconds,
+             set of every imported module name)
+    """
+    top_level = {}
+    imported = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imported.add(name.strip())
+        if name[1:2] != " ":
+            top_level[name.strip()] = int(cumulative)
+    return top_level, imported
+
+
+def module_name(regime: str, engine: str = None) -> str:
+    """
+    Return the module name of a generated or obfuscated module.
+    
+    @param regime: Corpus regime
+    @param engine: Python engine, or None for the original
+    @return: Importable module name
+    """
+    prefix = f"obf_{engine}" if engine else "orig"
+    return f"{prefix}_{regime.replace('-', '_')}"
+
+
+def import_time_us(directory: str, name: str) -> int:
+    """
+    Import one module in a fresh interpreter.
+    
+    @param directory: Directory containing the module
+    @param name: Module name
+    @return: Cumulative import time in microseconds
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {name}"],
+                            capture_output=True, text=True, cwd=directory, check=True)
+    top_level, _ = parse_importtime(result.stderr)
+    return top_level[name]
+
+
+def main() -> None:
+    """
+    Compare the import time of every obfuscated module with its original and exit 1 over budget.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=9, help="Fresh interpreter imports per module.")
+    parser.add_argument("--budget", type=float, default=0.1,
+                        help="Allowed relative import time increase of an obfuscated module.")
+    parser.add_argument("--slack-ms", type=float, default=0.5, help="Allowed absolute increase on top of the budget.")
+    parser.add_argument("--scale", type=float, default=0.25, help="Size multiplier of the generated modules.")
+    args = parser.parse_args()
+    engines = [engine for engine in PYTHON_ENGINES if engine == "ast" or LIBCST_AVAILABLE]
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        modules = []
+        for regime in REGIMES:
+            source = generate_file("python", regime, 0, args.scale)
+            variants = [(module_name(regime), source)]
+            for engine in engines:
+                options = ObfuscationOptions(seed=0, engine=engine)
+                variants.append((module_name(regime, engine), run_backend(source, "python", options, regime)))
+            for name, code in variants:
+                with open(os.path.join(workdir, f"{name}.py"), "w", encoding="utf-8") as f:
+                    f.write(code)
+            modules.append((regime, [name for name, _ in variants]))
+
+        all_names = [name for _, names in modules for name in names]
+        compileall.compile_dir(workdir, quiet=1)
+
+        timings = {name: [] for name in all_names}
+        for _ in range(args.runs):
+            for name in all_names:
+                timings[name].append(import_time_us(workdir, name))
+
+        print(f"{'regime':17} {'engine':7} {'original ms':>12} {'obfuscated ms':>14} {'change':>8}")
+        for regime, names in modules:
+            original = statistics.median(timings[names[0]]) / 1000
+            for engine, name in zip(engines, names[1:]):
+                obfuscated = statistics.median(timings[name]) / 1000
+                status = ""
+                if obfuscated > original * (1 + args.budget) + args.slack_ms:
+                    status = "  OVER BUDGET"
+                    failures += 1
+                print(f"{regime:17} {engine:7} {original:12.2f} {obfuscated:14.2f} "
+                      f"{obfuscated / original - 1:+8.1%}{status}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Throughput benchmark for shittify_javascript_typescript on minified bundles.
+
+The generated bundle is a single line, like the output of a minifier, and mixes
+template literals with nested substitutions, regex literals, strings and
+comments. Run from the repository root:
+
+    python -m benchmarks.javascript [--sizes 0.5,1,5] [--repeat 1] [--max-seconds 60]
+"""
+import argparse
+import random
+import sys
+import time
+
+from src.language_transformers import shittify_javascript_typescript
+
+
+def generate_minified_bundle(target_bytes: int, seed: int = 0) -> str:
+    """
+    Generate a single-line minified JavaScript bundle of roughly target_bytes.
+    
+    @param target_bytes: Approximate size of the generated bundle
+    @param seed: Seed for the generator
+    @return: Bundle source code
+    """
+    rng = random.Random(seed)
+    chunks = ['/*! bundle v1.0.0 | MIT */!function(e,t){"use strict";']
+    size = len(chunks[0])
+    module = 0
+    while size < target_bytes:
+        a, b, c = (f"m{module}_{rng.randrange(512)}" for _ in range(3))
+        chunk = (
+            f"var {a}=function({b},{c}){{var r=/^[a-z]+\\/(\\d+)$/i.exec({b});"
+            f"return r?`${{{b}}}:${{`${{{c}.x}}-${{r[1]}}`}}`:{b}/2+{c}/3}},"
+            f"{b}={{key:'{a}',\"v\":[1,2,3],t:`plain`}};"
+            f"e.{a}={a};console.log({a}({b},{c}));/* m{module} */"
+        )
+        chunks.append(chunk)
+        size += len(chunk)
+        module += 1
+    chunks.append("}(window,document);")
+    return "".join(chunks)
+
+
+def main() -> None:
+    """
+    Benchmark shittify_javascript_typescript at several bundle sizes and print throughput.
+    
+    Exits with status 1 if any size takes longer than --max-seconds.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="0.5,1,5", help="Comma-separated bundle sizes in MB.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size; the best is reported.")
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="Fail if a single run exceeds this.")
+    args = parser.parse_args()
+
+    print(f"{'size (MB)':>10} {'best (s)':>10} {'MB/s':>10}")
+    too_slow = False
+    for size_mb in (float(s) for s in args.sizes.split(",")):
+        code = generate_minified_bundle(int(size_mb * 1024 * 1024))
+        megabytes = len(code.encode("utf-8")) / (1024 * 1024)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            shittify_javascript_typescript(code, rng=random.Random(0))
+            best = min(best, time.perf_counter() - start)
+        print(f"{megabytes:>10.2f} {best:>10.3f} {megabytes / best:>10.2f}")
+        too_slow = too_slow or best > args.max_seconds
+    if too_slow:
+        print(f"FAIL: a run exceeded {args.max_seconds} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
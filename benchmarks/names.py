@@ -0,0 +1,88 @@
+"""
+Per-name cost of generate_random_variable_name() vs NamePool.take().
+
+Both generators draw --count names from a seeded random.Random; the pool must
+be faster per name and must not hand out a duplicate, otherwise the check
+fails (exit status 1). Run from the repository root:
+
+    python -m benchmarks.names [--count 200000] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import time
+
+from src.name_table import PYTHON_RESERVED_WORDS
+from src.utils import NamePool, generate_random_variable_name
+
+
+def per_call_names(count: int) -> list:
+    """
+    Generate names with one generate_random_variable_name() call each.
+    
+    @param count: Number of names
+    @return: List of names
+    """
+    rng = random.Random(0)
+    return [generate_random_variable_name(rng) for _ in range(count)]
+
+
+def pooled_names(count: int) -> list:
+    """
+    Generate names from a NamePool.
+    
+    @param count: Number of names
+    @return: List of names
+    """
+    pool = NamePool(random.Random(0), reserved=PYTHON_RESERVED_WORDS)
+    return [pool.take() for _ in range(count)]
+
+
+def best_time(generator, count: int, repeat: int) -> tuple:
+    """
+    Time a name generator.
+    
+    @param generator: Callable count -> list of names
+    @param count: Number of names per run
+    @param repeat: Number of runs
+    @return: Tuple of (best seconds per name, names of the last run)
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        names = generator(count)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count, names
+
+
+def main() -> None:
+    """
+    Compare both generators and exit 1 if the pool is slower or not unique.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200000, help="Names generated per run.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per generator; the fastest counts.")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'generator':10} {'us/name':>9} {'duplicates':>11}")
+    results = {}
+    for label, generator in (("per-call", per_call_names), ("pool", pooled_names)):
+        seconds, names = best_time(generator, args.count, args.repeat)
+        duplicates = len(names) - len(set(names))
+        results[label] = seconds
+        print(f"{label:10} {seconds * 1e6:9.2f} {duplicates:11}")
+        if label == "pool" and duplicates:
+            failures += 1
+    if results["pool"] >= results["per-call"]:
+        print("NamePool is not cheaper per name")
+        failures += 1
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Run-time overhead of obfuscated Python: original vs obfuscated hot functions.
+
+A module of numeric hot paths (tight loops, nested loops, while loops with
+branches, float arithmetic with constants, method calls in a loop) is
+obfuscated with every Python engine and transform profile. Each function is
+then timed in rounds of one original and one obfuscated call (in alternating
+order, with the garbage collector off), and the overhead is the median of the
+per-round time ratios, which is far less sensitive to a noisy machine than
+comparing the fastest runs. The check fails (exit status 1) if a function
+returns a different result, or if the perf-neutral profile is slower than the
+original by more than the budget. The default profile is reported for
+comparison. Run from the repository root:
+
+    python -m benchmarks.overhead [--budget 0.05] [--rounds 21] [--engine ast]
+"""
+import argparse
+import gc
+import statistics
+import sys
+import time
+
+from src.api import run_backend
+from src.name_table import NameTable
+from src.options import ObfuscationOptions, PYTHON_ENGINES, TRANSFORM_PROFILES
+from src.transformer import LIBCST_AVAILABLE
+
+
+HOT_PATHS = '''
+def sum_of_squares(n):
+    total = 0
+    for i in range(n):
+        square = i * i
+        total += square
+    return total
+
+
+def matrix_multiply(a, b):
+    size = len(a)
+    result = [[0] * size for _ in range(size)]
+    for i in range(size):
+        row = a[i]
+        for j in range(size):
+            acc = 0
+            for k in range(size):
+                acc += row[k] * b[k][j]
+            result[i][j] = acc
+    return result
+
+
+def collatz_steps(limit):
+    longest = 0
+    for start in range(1, limit):
+        value = start
+        steps = 0
+        while value != 1:
+            if value % 2:
+                value = 3 * value + 1
+            else:
+                value = value // 2
+            steps += 1
+        if steps > longest:
+            longest = steps
+    return longest
+
+
+def escape_times(width):
+    counts = []
+    for x in range(width):
+        real = x * (3.5 / 2) / width - 2.0
+        imag = 0.25
+        zr = zi = 0.0
+        n = 0
+        while zr * zr + zi * zi < 2 * 2 and n < 64:
+            zr, zi = zr * zr - zi * zi + real, 2 * zr * zi + imag
+            n += 1
+        counts.append(n)
+    return counts
+
+
+class Vector:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def dot(self, other):
+        product = self.x * other.x + self.y * other.y
+        return product
+
+
+def dot_products(n):
+    base = Vector(1.5, -2.0)
+    total = 0.0
+    for i in range(n):
+        total += base.dot(Vector(i, i + 1))
+    return total
+'''
+
+# (function name, arguments): each call takes a few milliseconds.
+CALLS = [
+    ("sum_of_squares", (200000,)),
+    ("matrix_multiply", ([[i + j for j in range(40)] for i in range(40)], [[i - j for j in range(40)] for i in range(40)])),
+    ("collatz_steps", (3000,)),
+    ("escape_times", (3000,)),
+    ("dot_products", (30000,)),
+]
+
+
+def load_module(source: str) -> dict:
+    """
+    Execute a module's source in a fresh namespace.
+    
+    @param source: Module source
+    @return: Module namespace
+    """
+    namespace = {"__name__": "hot_paths"}
+    exec(compile(source, "<hot_paths>", "exec"), namespace)
+    return namespace
+
+
+def time_call(function, args: tuple) -> float:
+    """
+    Time one call.
+    
+    @param function: Function to call
+    @param args: Positional arguments
+    @return: Seconds
+    """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def measure_overhead(reference, candidate, args: tuple, rounds: int) -> tuple:
+    """
+    Time a function against its obfuscated version.
+    
+    @param reference: Original function
+    @param candidate: Obfuscated function
+    @param args: Positional arguments for both
+    @param rounds: Number of rounds of one call each
+    @return: Tuple of (median original seconds, median obfuscated seconds, median per-round ratio - 1)
+    """
+    reference_times, candidate_times, ratios = [], [], []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for round_index in range(rounds):
+            if round_index % 2:
+                reference_time = time_call(reference, args)
+                candidate_time = time_call(candidate, args)
+            else:
+                candidate_time = time_call(candidate, args)
+                reference_time = time_call(reference, args)
+            reference_times.append(reference_time)
+            candidate_times.append(candidate_time)
+            ratios.append(candidate_time / reference_time)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return statistics.median(reference_times), statistics.median(candidate_times), statistics.median(ratios) - 1
+
+
+def main() -> None:
+    """
+    Compare every obfuscated function with its original and exit 1 on a failed check.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=0.05,
+                        help="Maximum relative slowdown of the perf-neutral profile.")
+    parser.add_argument("--rounds", type=int, default=21, help="Timed rounds per function.")
+    parser.add_argument("--engine", choices=PYTHON_ENGINES, action="append",
+                        help="Python engine to check (repeatable; default: every installed engine).")
+    args = parser.parse_args()
+    engines = args.engine or [engine for engine in PYTHON_ENGINES if engine == "ast" or LIBCST_AVAILABLE]
+
+    original = load_module(HOT_PATHS)
+    failures = 0
+    print(f"{'engine':7} {'profile':13} {'function':16} {'original ms':>12} {'obfuscated ms':>14} {'overhead':>9}")
+    for engine in engines:
+        for profile in TRANSFORM_PROFILES:
+            names = NameTable()
+            options = ObfuscationOptions(seed=0, engine=engine, transform_profile=profile)
+            obfuscated = load_module(run_backend(HOT_PATHS, "python", options, "hot_paths.py", names))
+            for name, call_args in CALLS:
+                reference = original[name]
+                candidate = obfuscated[names.forward.get(name, name)]
+                if candidate(*call_args) != reference(*call_args):
+                    print(f"{engine:7} {profile:13} {name:16} RESULT DIFFERS")
+                    failures += 1
+                    continue
+                reference_time, candidate_time, overhead = measure_overhead(reference, candidate, call_args,
+                                                                            args.rounds)
+                status = ""
+                if profile == "perf-neutral" and overhead > args.budget:
+                    status = f"  OVER BUDGET ({args.budget:.0%})"
+                    failures += 1
+                print(f"{engine:7} {profile:13} {name:16} {reference_time * 1000:12.2f} "
+                      f"{candidate_time * 1000:14.2f} {overhead:+9.1%}{status}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
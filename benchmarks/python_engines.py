@@ -0,0 +1,79 @@
+"""
+Throughput and parity check of the two Python engines (libcst and ast).
+
+Every module of the corpus is obfuscated by both engines. The run reports the
+throughput of each engine and fails if the engines disagree on which
+identifiers they rename, or if either engine fails on a module the other one
+handles. Run from the repository root:
+
+    python -m benchmarks.python_engines [--limit 200] [--corpus DIR]
+"""
+import argparse
+import random
+import sys
+import sysconfig
+import time
+
+from benchmarks.python_pipeline import load_corpus
+from src.name_table import NameTable
+from src.transformer import ENGINES, obfuscate_code_with_ast
+
+
+def run_engine(engine: str, path: str, source: str):
+    """
+    Obfuscate one module and return the renamed identifiers.
+    
+    @param engine: Engine name from ENGINES
+    @param path: Module path, used to seed the RNG
+    @param source: Module source
+    @return: Tuple of (set of renamed identifiers or None on failure, seconds)
+    """
+    names = NameTable()
+    start = time.perf_counter()
+    try:
+        obfuscate_code_with_ast(source, rng=random.Random(path), engine=engine, names=names)
+    except Exception:
+        return None, time.perf_counter() - start
+    return set(names.forward), time.perf_counter() - start
+
+
+def main() -> None:
+    """
+    Run both engines over the corpus, print throughput and exit 1 on any parity mismatch.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=sysconfig.get_paths()["stdlib"], help="Directory of .py files.")
+    parser.add_argument("--limit", type=int, default=200, help="Maximum number of modules.")
+    args = parser.parse_args()
+
+    modules = load_corpus(args.corpus, args.limit)
+    total_mb = sum(len(source.encode("utf-8")) for _, source in modules) / (1024 * 1024)
+    elapsed = {engine: 0.0 for engine in ENGINES}
+    mismatches = 0
+    for path, source in modules:
+        renamed = {}
+        for engine in ENGINES:
+            renamed[engine], seconds = run_engine(engine, path, source)
+            elapsed[engine] += seconds
+        libcst_names, ast_names = renamed["libcst"], renamed["ast"]
+        if libcst_names != ast_names:
+            mismatches += 1
+            if libcst_names is None or ast_names is None:
+                print(f"MISMATCH {path}: " + ", ".join(f"{e} failed" for e in ENGINES if renamed[e] is None))
+            else:
+                only_libcst = sorted(libcst_names - ast_names)[:5]
+                only_ast = sorted(ast_names - libcst_names)[:5]
+                print(f"MISMATCH {path}: only libcst {only_libcst}, only ast {only_ast}")
+
+    print(f"modules:  {len(modules)} ({total_mb:.2f} MB), {mismatches} parity mismatches")
+    for engine in ENGINES:
+        print(f"{engine + ':':9} {elapsed[engine]:.2f} s, {total_mb / elapsed[engine]:.3f} MB/s")
+    print(f"speedup:  {elapsed['libcst'] / elapsed['ast']:.1f}x")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Throughput benchmark for the Python pipeline on a corpus of real modules.
+
+By default the corpus is the pure-Python part of the running interpreter's
+standard library, so results are comparable between machines with the same
+Python version. Run from the repository root:
+
+    python -m benchmarks.python_pipeline [--limit 200] [--corpus DIR] [--engine ast|libcst]
+"""
+import argparse
+import os
+import random
+import sysconfig
+import time
+
+from src.transformer import ENGINES, obfuscate_code_with_ast
+
+
+def load_corpus(corpus_dir: str, limit: int) -> list:
+    """
+    Read up to limit parseable .py files from corpus_dir, in sorted path order.
+    
+    @param corpus_dir: Directory to collect modules from
+    @param limit: Maximum number of modules
+    @return: List of (path, source) pairs
+    """
+    modules = []
+    for root, dirs, files in os.walk(corpus_dir):
+        dirs[:] = sorted(d for d in dirs if d not in ("test", "tests", "idlelib", "lib2to3", "site-packages"))
+        for name in sorted(files):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    source = f.read()
+                compile(source, path, "exec", dont_inherit=True)
+            except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+                continue
+            if source.strip():
+                modules.append((path, source))
+            if len(modules) >= limit:
+                return modules
+    return modules
+
+
+def main() -> None:
+    """
+    Obfuscate every module in the corpus once and print files/s and MB/s.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=sysconfig.get_paths()["stdlib"], help="Directory of .py files.")
+    parser.add_argument("--limit", type=int, default=200, help="Maximum number of modules.")
+    parser.add_argument("--engine", choices=ENGINES, default=None, help="Python engine (default: libcst if installed).")
+    args = parser.parse_args()
+
+    modules = load_corpus(args.corpus, args.limit)
+    total_bytes = sum(len(source.encode("utf-8")) for _, source in modules)
+    failures = 0
+    start = time.perf_counter()
+    for path, source in modules:
+        try:
+            obfuscate_code_with_ast(source, rng=random.Random(path), engine=args.engine)
+        except Exception:
+            failures += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"modules:  {len(modules)} ({failures} failed)")
+    print(f"size:     {total_bytes / (1024 * 1024):.2f} MB")
+    print(f"time:     {elapsed:.2f} s")
+    print(f"files/s:  {len(modules) / elapsed:.1f}")
+    print(f"MB/s:     {total_bytes / (1024 * 1024) / elapsed:.3f}")
+
+
+if __name__ == "__main__":
+    main()
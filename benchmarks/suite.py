@@ -0,0 +1,345 @@
+"""
+Benchmark suite: every engine entry point on every synthetic corpus regime.
+
+`run` generates the corpora of benchmarks.corpus and measures, per engine and
+regime, lines of code per second, MB per second and the peak resident set size.
+Each (engine, regime) pair runs in a fresh interpreter so peak RSS belongs to
+that pair alone; timings are the best of --repeat passes after one warm-up file.
+Results are written as JSON.
+
+`compare` matches two result files by engine and regime and exits with status 1
+if throughput dropped or peak RSS grew by more than the threshold. Run from the
+repository root:
+
+    python -m benchmarks.suite run [--out results.json] [--scale 1] [--repeat 3]
+                                   [--engines c,go] [--regimes minified] [--baseline old.json]
+    python -m benchmarks.suite compare baseline.json results.json [--threshold 0.1]
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.corpus import REGIMES, generate_corpus
+
+
+# Engine entry point -> (language, Python engine). Every entry runs through
+# src.api.run_backend, the dispatch used by the CLI, the daemon and the library API.
+ENGINES = {
+    "python-libcst": ("python", "libcst"),
+    "python-ast": ("python", "ast"),
+    "c": ("c", None),
+    "cpp": ("cpp", None),
+    "javascript": ("javascript", None),
+    "typescript": ("typescript", None),
+    "go": ("go", None),
+}
+
+RESULTS_VERSION = 1
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_mb() -> float:
+    """
+    Return the peak resident set size of this process.
+    
+    @return: Megabytes, or None where the resource module is unavailable (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def corpus_fingerprint(corpus: list) -> str:
+    """
+    Hash a corpus, so compare can tell when the generator changed between two runs.
+    
+    @param corpus: List of (file name, source code) pairs
+    @return: Short hex digest
+    """
+    digest = hashlib.sha256()
+    for name, source in corpus:
+        digest.update(name.encode("utf-8") + b"\0" + source.encode("utf-8") + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def measure(engine: str, regime: str, scale: float, seed: int, repeat: int) -> dict:
+    """
+    Measure one engine on one corpus regime in this process.
+    
+    @param engine: Engine name from ENGINES
+    @param regime: Regime from REGIMES
+    @param scale: Corpus size multiplier
+    @param seed: Corpus generator seed
+    @param repeat: Timed passes over the corpus; the fastest counts
+    @return: Result dict
+    """
+    from src.api import run_backend
+    from src.options import ObfuscationOptions
+
+    language, python_engine = ENGINES[engine]
+    options = ObfuscationOptions(seed=0, engine=python_engine)
+    corpus = generate_corpus(language, regime, scale, seed)
+    total_bytes = sum(len(source.encode("utf-8")) for _, source in corpus)
+    total_lines = sum(source.count("\n") for _, source in corpus)
+
+    errors = []
+    # Warm up: import the backend and fill lazy caches outside the timed passes.
+    try:
+        run_backend(corpus[0][1], language, options, corpus[0][0])
+    except Exception as e:
+        errors.append(f"{corpus[0][0]}: {type(e).__name__}: {e}")
+    setup_rss = peak_rss_mb()
+
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        for name, source in corpus:
+            try:
+                run_backend(source, language, options, name)
+            except Exception as e:
+                if len(timings) == 0:
+                    errors.append(f"{name}: {type(e).__name__}: {e}")
+        timings.append(time.perf_counter() - start)
+
+    seconds = min(timings)
+    peak = peak_rss_mb()
+    return {
+        "engine": engine,
+        "regime": regime,
+        "files": len(corpus),
+        "bytes": total_bytes,
+        "lines": total_lines,
+        "corpus": corpus_fingerprint(corpus),
+        "seconds": seconds,
+        "seconds_all": timings,
+        "loc_per_s": total_lines / seconds if seconds else None,
+        "mb_per_s": total_bytes / (1024 * 1024) / seconds if seconds else None,
+        "peak_rss_mb": peak,
+        "engine_rss_mb": peak - setup_rss if peak is not None else None,
+        "errors": sorted(set(errors))[:10],
+    }
+
+
+def measure_in_subprocess(engine: str, regime: str, scale: float, seed: int, repeat: int) -> dict:
+    """
+    Run measure() in a fresh interpreter, so peak RSS is not inflated by earlier pairs.
+    
+    @param engine: Engine name from ENGINES
+    @param regime: Regime from REGIMES
+    @param scale: Corpus size multiplier
+    @param seed: Corpus generator seed
+    @param repeat: Timed passes over the corpus
+    @return: Result dict, with an "errors" entry if the interpreter failed
+    """
+    command = [sys.executable, "-m", "benchmarks.suite", "measure", engine, regime,
+               "--scale", str(scale), "--seed", str(seed), "--repeat", str(repeat)]
+    result = subprocess.run(command, capture_output=True, text=True, cwd=REPOSITORY_ROOT)
+    if result.returncode != 0:
+        message = (result.stderr.strip().splitlines() or [f"exit status {result.returncode}"])[-1]
+        return {"engine": engine, "regime": regime, "errors": [message]}
+    return json.loads(result.stdout)
+
+
+def git_revision() -> str:
+    """
+    Return the checked-out commit of the repository, if it is a git checkout.
+    
+    @return: Commit hash, or None
+    """
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=REPOSITORY_ROOT)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def format_result(result: dict) -> str:
+    """
+    Render one result as a table row.
+    
+    @param result: Result dict
+    @return: Line of text
+    """
+    if "seconds" not in result:
+        return f"{result['engine']:14} {result['regime']:17} FAILED: {result['errors'][0]}"
+    rss = result["peak_rss_mb"]
+    line = (f"{result['engine']:14} {result['regime']:17} {result['files']:6} {result['bytes'] / 1024:9.0f} "
+            f"{result['loc_per_s']:11.0f} {result['mb_per_s']:8.3f} {rss if rss is not None else float('nan'):9.1f}")
+    if result["errors"]:
+        line += f"  ({len(result['errors'])} failing files, e.g. {result['errors'][0]})"
+    return line
+
+
+def load_results(path: str) -> dict:
+    """
+    Read a results file written by run.
+    
+    @param path: JSON file
+    @return: Dict of (engine, regime) -> result dict
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {document.get('version')!r}")
+    return {(result["engine"], result["regime"]): result for result in document["results"]}
+
+
+def compare(baseline: dict, current: dict, threshold: float, rss_threshold: float) -> tuple:
+    """
+    Compare two sets of results.
+    
+    A pair regresses if its MB/s fell by more than threshold (relative), if its
+    peak RSS grew by more than rss_threshold (relative), or if it failed in the
+    current run but not in the baseline.
+    
+    @param baseline: Results from load_results()
+    @param current: Results from load_results()
+    @param threshold: Allowed relative throughput loss, e.g. 0.1 for 10%
+    @param rss_threshold: Allowed relative peak RSS growth
+    @return: Tuple of (list of report lines, number of regressions)
+    """
+    header = f"{'engine':14} {'regime':17} {'base MB/s':>10} {'MB/s':>10} {'change':>8} {'RSS change':>11}  status"
+    lines = [header, "-" * len(header)]
+    regressions = 0
+    for key in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(key), current.get(key)
+        prefix = f"{key[0]:14} {key[1]:17}"
+        if old is None or new is None:
+            lines.append(f"{prefix} {'':>10} {'':>10} {'':>8} {'':>11}  {'new' if old is None else 'missing'}")
+            continue
+        if "seconds" not in new:
+            regressions += "seconds" in old
+            lines.append(f"{prefix} {'':>10} {'':>10} {'':>8} {'':>11}  FAILED: {new['errors'][0]}")
+            continue
+        if "seconds" not in old:
+            lines.append(f"{prefix} {'':>10} {new['mb_per_s']:10.3f} {'':>8} {'':>11}  fixed")
+            continue
+        change = new["mb_per_s"] / old["mb_per_s"] - 1
+        rss_change = None
+        if old.get("peak_rss_mb") and new.get("peak_rss_mb") is not None:
+            rss_change = new["peak_rss_mb"] / old["peak_rss_mb"] - 1
+        problems = []
+        if change < -threshold:
+            problems.append("SLOWER")
+        if rss_change is not None and rss_change > rss_threshold:
+            problems.append("MORE MEMORY")
+        if len(new["errors"]) > len(old["errors"]):
+            problems.append("NEW FAILURES")
+        status = "REGRESSION: " + ", ".join(problems) if problems else "ok"
+        if old.get("corpus") != new.get("corpus"):
+            status += " (corpus changed)"
+        regressions += bool(problems)
+        rss_text = f"{rss_change:+11.1%}" if rss_change is not None else f"{'-':>11}"
+        lines.append(f"{prefix} {old['mb_per_s']:10.3f} {new['mb_per_s']:10.3f} {change:+8.1%} {rss_text}  {status}")
+    return lines, regressions
+
+
+def split_list(text: str, allowed) -> list:
+    """
+    Parse a comma-separated list of names for argparse.
+    
+    @param text: Comma-separated names
+    @param allowed: Valid names
+    @return: List of names
+    """
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(allowed)})")
+    return names
+
+
+def main() -> None:
+    """
+    Dispatch the run, compare and measure subcommands.
+    
+    @return: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Measure every engine on every regime.")
+    run_parser.add_argument("--out", default="benchmark-results.json", help="Results file.")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="Corpus size multiplier.")
+    run_parser.add_argument("--seed", type=int, default=0, help="Corpus generator seed.")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Timed passes per pair; the fastest counts.")
+    run_parser.add_argument("--engines", type=lambda text: split_list(text, ENGINES), default=list(ENGINES),
+                            help="Comma-separated engines (default: all).")
+    run_parser.add_argument("--regimes", type=lambda text: split_list(text, REGIMES), default=list(REGIMES),
+                            help="Comma-separated regimes (default: all).")
+    run_parser.add_argument("--baseline", help="Compare against this results file afterwards.")
+    run_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative throughput loss.")
+    run_parser.add_argument("--rss-threshold", type=float, default=0.1, help="Allowed relative peak RSS growth.")
+
+    compare_parser = subparsers.add_parser("compare", help="Flag regressions between two results files.")
+    compare_parser.add_argument("baseline", help="Results file of the reference run.")
+    compare_parser.add_argument("current", help="Results file of the run to check.")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative throughput loss.")
+    compare_parser.add_argument("--rss-threshold", type=float, default=0.1, help="Allowed relative peak RSS growth.")
+
+    # Internal: one (engine, regime) pair in this interpreter, result as JSON on stdout.
+    measure_parser = subparsers.add_parser("measure")
+    measure_parser.add_argument("engine", choices=list(ENGINES))
+    measure_parser.add_argument("regime", choices=REGIMES)
+    measure_parser.add_argument("--scale", type=float, default=1.0)
+    measure_parser.add_argument("--seed", type=int, default=0)
+    measure_parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "measure":
+        json.dump(measure(args.engine, args.regime, args.scale, args.seed, args.repeat), sys.stdout)
+        return
+
+    if args.command == "compare":
+        lines, regressions = compare(load_results(args.baseline), load_results(args.current),
+                                     args.threshold, args.rss_threshold)
+        print("\n".join(lines))
+        if regressions:
+            sys.exit(1)
+        return
+
+    print(f"{'engine':14} {'regime':17} {'files':>6} {'KB':>9} {'LOC/s':>11} {'MB/s':>8} {'peak MB':>9}")
+    results = []
+    for engine in args.engines:
+        for regime in args.regimes:
+            result = measure_in_subprocess(engine, regime, args.scale, args.seed, args.repeat)
+            results.append(result)
+            print(format_result(result), flush=True)
+
+    document = {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        lines, regressions = compare(load_results(args.baseline), {(r["engine"], r["regime"]): r for r in results},
+                                     args.threshold, args.rss_threshold)
+        print("\n".join(lines))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,161 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
+import importlib.util
+import io
+import itertools
 import os
 import shutil
-from src.transformer import obfuscate_code_with_ast
-from src.language_transformers import (
-    shittify_c_cpp,
-    shittify_javascript_typescript,
-    shittify_go,
-    handle_rust,
-)
-
-
-SUPPORTED_EXTENSIONS = {
-    '.py': 'python',
-    '.c': 'c',
-    '.cpp': 'cpp',
-    '.cc': 'cpp',
-    '.cxx': 'cpp',
-    '.h': 'c',
-    '.hpp': 'cpp',
-    '.js': 'javascript',
-    '.jsx': 'javascript',
-    '.ts': 'typescript',
-    '.tsx': 'typescript',
-    '.go': 'go',
-    '.rs': 'rust',
-}
-
-
-def get_file_language(file_path: str) -> str:
-    """
-    Determine the programming language based on file extension.
+import signal
+import sys
+import tempfile
+import time
+from src.api import LANGUAGE_BACKENDS, get_file_language, load_backend, run_backend
+from src.cache import ResultCache, DEFAULT_CACHE_MAX_BYTES
+from src import profiling
+from src.options import ObfuscationOptions, PASSTHROUGH_MODES, PYTHON_ENGINES, TRANSFORM_PROFILES, WalkOptions
+from src.profiling import profile_file, stage
+from src.walker import IGNORE_FILE_NAMES, TreeWalker, parse_size, passthrough_file
+
+
+# Tasks handed to the process pool at a time, per worker, when streaming a file list.
+TASK_WINDOW_PER_JOB = 256
+
+FILE_LIST_CHUNK_SIZE = 64 * 1024
+
+
+def shittified_path(file_path: str) -> str:
+    """
+    Return the output name for a file: name.ext becomes name.shittified.ext.
+    
+    @param file_path: Path to the input file
+    @return: Path with .shittified inserted before the extension
+    """
+    root, ext = os.path.splitext(file_path)
+    return f"{root}.shittified{ext}"
+
+
+def mirror_path(path: str, output_root: str) -> str:
+    """
+    Map an input path to the same relative location under output_root.
+    
+    Paths below the current directory keep their relative path; other paths are
+    mirrored by their absolute path without the leading separator.
+    
+    @param path: Input file or directory
+    @param output_root: Root of the output tree (--output-dir)
+    @return: Path under output_root
+    """
+    absolute = os.path.abspath(path)
+    relative = os.path.relpath(absolute)
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        relative = os.path.splitdrive(absolute)[1].lstrip(os.sep)
+    return os.path.normpath(os.path.join(output_root, relative))
+
+
+def iter_file_list(stream):
+    """
+    Stream paths from a binary file list without reading it all into memory.
+    
+    The list is NUL-delimited (find -print0, git ls-files -z) if its first chunk
+    contains a NUL byte, and newline-delimited otherwise. Empty entries are skipped.
+    
+    @param stream: Binary file object
+    @return: Generator of path strings
+    """
+    separator = None
+    pending = b""
+    while True:
+        chunk = stream.read(FILE_LIST_CHUNK_SIZE)
+        if not chunk:
+            break
+        if separator is None:
+            separator = b"\0" if b"\0" in chunk else b"\n"
+        pending += chunk
+        *entries, pending = pending.split(separator)
+        for entry in entries:
+            if separator == b"\n":
+                entry = entry.rstrip(b"\r")
+            if entry:
+                yield os.fsdecode(entry)
+    if separator == b"\n":
+        pending = pending.rstrip(b"\r")
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def is_archive(file_path: str) -> bool:
+    """
+    Check whether a path names an archive that is processed member by member.
     
     @param file_path: Path to the file
-    @return: Language name or None if unsupported
+    @return: True for .tar, .tar.gz, .tgz, .tar.bz2, .tar.xz and .zip files
     """
-    _, ext = os.path.splitext(file_path)
-    ext_lower = ext.lower()
-    return SUPPORTED_EXTENSIONS.get(ext_lower)
+    from src.archive import archive_suffix
+    return archive_suffix(file_path) is not None
 
 
-def process_single_file(file_path: str, output_file_path: str = None) -> None:
+def obfuscate_source(source_code: str, language: str, cache: ResultCache = None,
+                     options: ObfuscationOptions = None, rng_key: str = "") -> str:
+    """
+    Obfuscate source code with the engine for the given language.
+    
+    In daemon client mode (--use-daemon) the work is sent to the daemon, and done
+    in-process if no daemon is listening, the daemon does not answer properly
+    (after which this process stops using it) or a name map is in use (new
+    names must be recorded in this process, see src.name_map).
+    
+    @param source_code: Source code as a string
+    @param language: Language name from SUPPORTED_EXTENSIONS (not 'rust')
+    @param cache: Optional result cache consulted before running the engine
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param rng_key: Stable identifier of the file, mixed into the seed to derive its RNG
+    @return: Obfuscated source code as a string
+    """
+    global _daemon_socket
+    options = options or ObfuscationOptions()
+    if _daemon_socket is not None and options.name_map is None:
+        from src.daemon import obfuscate_remote
+        result = obfuscate_remote(_daemon_socket, source_code, language, seed=options.seed,
+                                  engine=options.engine, rng_key=rng_key,
+                                  transform_profile=options.transform_profile,
+                                  symbol_index=options.symbol_index)
+        if result is not None:
+            return result
+        _daemon_socket = None
+    def run_engine() -> str:
+        return run_backend(source_code, language, options, rng_key)
+    
+    if cache is None:
+        return run_engine()
+    return cache.get_or_compute(source_code, language, options.cache_config(rng_key, language), run_engine)
+
+
+def process_single_file(file_path: str, output_file_path: str = None, cache: ResultCache = None,
+                        options: ObfuscationOptions = None, rng_key: str = None) -> bool:
     """
     Read a file, obfuscate it based on language, and write output to a new file.
     
     @param file_path: Path to the input file
     @param output_file_path: Optional output file path. If None, creates .shittified.* next to original
-    @return: None
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param rng_key: Stable identifier used to derive the file's RNG. None uses file_path
+    @return: True if an output file was written, False otherwise
     """
     if not os.path.exists(file_path):
         print(f"Error: File not found: {file_path}")
-        return
+        return False
     
     if not os.path.isfile(file_path):
         print(f"Error: Path is not a file: {file_path}")
-        return
+        return False
     
     language = get_file_language(file_path)
     
     if not language:
         print(f"Skipping unsupported file type: {file_path}")
-        return
+        return False
     
     try:
         with open(file_path, "r", encoding="utf-8") as f:
@@ -68,43 +163,35 @@ def process_single_file(file_path: str, output_file_path: str = None) -> None:
         
         if not source_code.strip():
             print(f"Warning: File is empty: {file_path}")
-            return
+            return False
         
         if language == 'rust':
+            from src.language_transformers import handle_rust
             rust_message = handle_rust()
             print(f"\nRust file detected: {file_path}")
             print(rust_message)
             print(f"Rust is already shittified beyond repair. No output file created.\n")
-            return
+            return False
         
-        if language == 'python':
-            obfuscated_code = obfuscate_code_with_ast(source_code)
-            if output_file_path is None:
-                output_file_path = file_path.replace(".py", ".shittified.py")
-        elif language in ('c', 'cpp'):
-            obfuscated_code = shittify_c_cpp(source_code)
-            if output_file_path is None:
-                ext = os.path.splitext(file_path)[1]
-                output_file_path = file_path.replace(ext, f".shittified{ext}")
-        elif language in ('javascript', 'typescript'):
-            obfuscated_code = shittify_javascript_typescript(source_code)
-            if output_file_path is None:
-                ext = os.path.splitext(file_path)[1]
-                output_file_path = file_path.replace(ext, f".shittified{ext}")
-        elif language == 'go':
-            obfuscated_code = shittify_go(source_code)
-            if output_file_path is None:
-                output_file_path = file_path.replace(".go", ".shittified.go")
-        else:
+        if language not in ('python', 'c', 'cpp', 'javascript', 'typescript', 'go'):
             print(f"Unsupported language: {language}")
-            return
+            return False
         
-        output_dir = os.path.dirname(output_file_path)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-        with open(output_file_path, "w", encoding="utf-8") as f:
-            f.write(obfuscated_code)
+        if rng_key is None:
+            rng_key = os.path.normpath(file_path).replace(os.sep, "/")
+        if output_file_path is None:
+            output_file_path = shittified_path(file_path)
+        with profile_file(file_path, language, rng_key, options):
+            obfuscated_code = obfuscate_source(source_code, language, cache=cache, options=options, rng_key=rng_key)
+            
+            with stage("write"):
+                output_dir = os.path.dirname(output_file_path)
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+                with open(output_file_path, "w", encoding="utf-8") as f:
+                    f.write(obfuscated_code)
         print(f"Processed: {file_path} -> {output_file_path}")
+        return True
     except FileNotFoundError:
         print(f"Error: File not found: {file_path}")
     except PermissionError:
@@ -115,13 +202,263 @@ def process_single_file(file_path: str, output_file_path: str = None) -> None:
         print(f"Error processing {file_path}: {e}")
         import traceback
         traceback.print_exc()
+    return False
+
+
+_worker_cache = None
+_worker_options = None
+_daemon_socket = None
 
 
-def process_directory(input_dir: str) -> None:
+def _init_worker(cache: ResultCache, options: ObfuscationOptions, profile_mode: str = None,
+                 daemon_socket: str = None) -> None:
+    """
+    Process pool initializer: install per-worker state shared by all tasks.
+    
+    @param cache: Result cache to use in this worker, or None
+    @param options: Obfuscation options for this run
+    @param profile_mode: Stage profiling mode (see src.profiling.enable), or None
+    @param daemon_socket: Socket of the daemon to send files to (--use-daemon), or None
+    @return: None
+    """
+    global _worker_cache, _worker_options, _daemon_socket
+    _worker_cache = cache
+    _worker_options = options
+    _daemon_socket = daemon_socket
+    if profile_mode is not None:
+        profiling.enable(profile_mode)
+
+
+def _process_file_task(task: tuple) -> tuple:
+    """
+    Worker entry point: process one file while capturing everything it prints.
+    
+    @param task: (input path, output path, rng key) triple
+    @return: (success flag, captured stdout, captured stderr, stage profiles recorded for the file,
+             names derived for the name map)
+    """
+    src_path, dst_path, rng_key = task
+    stdout_buffer = io.StringIO()
+    stderr_buffer = io.StringIO()
+    with contextlib.redirect_stdout(stdout_buffer), contextlib.redirect_stderr(stderr_buffer):
+        ok = process_single_file(src_path, dst_path, cache=_worker_cache, options=_worker_options, rng_key=rng_key)
+    additions = {}
+    if _worker_options is not None and _worker_options.name_map:
+        from src.name_map import take_additions
+        additions = take_additions()
+    return ok, stdout_buffer.getvalue(), stderr_buffer.getvalue(), profiling.take_records(), additions
+
+
+def run_file_tasks(tasks: list, jobs: int = None, cache: ResultCache = None,
+                   options: ObfuscationOptions = None, failed: list = None) -> int:
+    """
+    Process (input, output) file pairs, fanning out to a process pool when jobs > 1.
+    
+    Output of each file is captured in the worker and replayed here in task order,
+    so messages from different files never interleave. Tasks are consumed lazily,
+    a bounded window at a time, so an arbitrarily long stream of tasks can be processed.
+    
+    @param tasks: List or iterable of (input path, output path, rng key) triples
+    @param jobs: Number of worker processes. None means os.cpu_count()
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param failed: Optional list receiving the tasks that failed
+    @return: Number of files that failed to produce output
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if isinstance(tasks, (list, tuple)):
+        jobs = max(1, min(jobs, len(tasks)))
+    
+    failures = 0
+    if jobs == 1:
+        for task in tasks:
+            src_path, dst_path, rng_key = task
+            if not process_single_file(src_path, dst_path, cache=cache, options=options, rng_key=rng_key):
+                failures += 1
+                if failed is not None:
+                    failed.append(task)
+        return failures
+    
+    tasks = iter(tasks)
+    from concurrent.futures import ProcessPoolExecutor
+
+    initargs = (cache, options, profiling.current_mode(), _daemon_socket)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        while True:
+            window = list(itertools.islice(tasks, jobs * TASK_WINDOW_PER_JOB))
+            if not window:
+                break
+            chunksize = max(1, len(window) // (jobs * 8))
+            results = executor.map(_process_file_task, window, chunksize=chunksize)
+            for task, (ok, captured_out, captured_err, records, additions) in zip(window, results):
+                profiling.add_records(records)
+                if additions:
+                    from src.name_map import add_additions
+                    add_additions(additions)
+                if captured_out:
+                    sys.stdout.write(captured_out)
+                if captured_err:
+                    sys.stderr.write(captured_err)
+                if not ok:
+                    failures += 1
+                    if failed is not None:
+                        failed.append(task)
+    sys.stdout.flush()
+    return failures
+
+
+def shard_spec(text: str) -> tuple:
+    """
+    Parse the --shard argument, importing src.shards only when the option is used.
+    
+    @param text: I/N with 1 <= I <= N
+    @return: Tuple of (shard number, shard count)
+    """
+    from src.shards import parse_shard
+    return parse_shard(text)
+
+
+def directory_output_path(input_dir: str, output_root: str = None) -> str:
+    """
+    Return the mirror directory for an input directory.
+    
+    @param input_dir: Path to the input directory
+    @param output_root: Optional --output-dir root
+    @return: shittified_<dirname> next to input_dir, or the mirror under output_root
+    """
+    input_dir = os.path.abspath(input_dir)
+    if output_root is not None:
+        return mirror_path(input_dir, output_root)
+    dir_name = os.path.basename(input_dir.rstrip(os.sep))
+    return os.path.join(os.path.dirname(input_dir), f"shittified_{dir_name}")
+
+
+def mirror_walked_entry(src_path: str, dst_path: str, kind: str, input_dir: str, tasks: list,
+                        walker: TreeWalker, shard: tuple = None) -> None:
+    """
+    Mirror one entry found by the tree walker into the output tree.
+    
+    Supported files are queued in tasks for obfuscation, other files are passed
+    through according to --passthrough and directories are created. Symbolic
+    links, files over --max-file-size and Rust files are skipped.
+    
+    @param src_path: Source path
+    @param dst_path: Corresponding path in the output tree
+    @param kind: Entry kind from TreeWalker.classify()
+    @param input_dir: Root of the processed directory, used for rng keys
+    @param tasks: List receiving (input path, output path, rng key) triples
+    @param walker: Walker of input_dir
+    @param shard: (shard number, shard count) of a --shard run; other shards' files are not passed through
+    @return: None
+    """
+    if kind == "dir":
+        os.makedirs(dst_path, exist_ok=True)
+    elif kind == "other":
+        print(f"Skipping symbolic link: {src_path}")
+    elif kind == "large":
+        print(f"Skipping large file: {src_path}")
+    else:
+        language = get_file_language(src_path)
+        if language == 'rust':
+            from src.language_transformers import handle_rust
+            rust_message = handle_rust()
+            print(f"\nRust file detected: {src_path}")
+            print(rust_message)
+            print(f"Rust is already shittified beyond repair. Skipping.\n")
+        else:
+            rng_key = os.path.relpath(src_path, input_dir).replace(os.sep, "/")
+            if language:
+                tasks.append((src_path, shittified_path(dst_path), rng_key))
+            elif shard is None:
+                passthrough_file(src_path, dst_path, walker.options.passthrough)
+            else:
+                from src.shards import passthrough_shard
+                if passthrough_shard(rng_key, shard[1]) == shard[0]:
+                    passthrough_file(src_path, dst_path, walker.options.passthrough)
+
+
+def mirror_directory_entry(src_path: str, dst_path: str, input_dir: str, tasks: list,
+                           walker: TreeWalker = None, shard: tuple = None) -> None:
+    """
+    Mirror one file or directory tree into the output tree.
+    
+    Paths excluded by ignore files or --exclude are left out; see mirror_walked_entry().
+    
+    @param src_path: Source file or directory
+    @param dst_path: Corresponding path in the output tree
+    @param input_dir: Root of the processed directory, used for rng keys
+    @param tasks: List receiving (input path, output path, rng key) triples
+    @param walker: Walker of input_dir. None walks with default options
+    @param shard: (shard number, shard count) of a --shard run, or None
+    @return: None
+    """
+    walker = walker or TreeWalker(input_dir)
+    if walker.is_ignored(src_path):
+        return
+    is_dir = os.path.isdir(src_path) and not os.path.islink(src_path)
+    is_file = not is_dir and os.path.isfile(src_path) and not os.path.islink(src_path)
+    kind = walker.classify(src_path, is_dir, is_file)
+    mirror_walked_entry(src_path, dst_path, kind, input_dir, tasks, walker, shard)
+    if kind == "dir":
+        for path, relative_path, kind in walker.walk(src_path):
+            mirror_walked_entry(path, os.path.join(dst_path, relative_path), kind, input_dir, tasks, walker, shard)
+
+
+def index_project(tasks: list, index_dir: str, jobs: int = None,
+                  options: ObfuscationOptions = None) -> ObfuscationOptions:
+    """
+    Pre-scan the files of a project and return options that name shared identifiers from its index.
+    
+    @param tasks: (input path, output path, rng key) triples of every file in the project
+    @param index_dir: Directory to write the symbol index to
+    @param jobs: Number of worker processes for the pre-scan. None means os.cpu_count()
+    @param options: Obfuscation options of the run. None uses defaults (unseeded)
+    @return: Copy of options with symbol_index set
+    """
+    from src.symbol_index import build_symbol_index
+
+    options = options or ObfuscationOptions()
+    index_path = os.path.join(index_dir, "symbols.idx")
+    # With a name map, shared names are derived from its salt, so they can be recorded in it.
+    seed = options.seed
+    if options.name_map:
+        from src.name_map import name_map_salt
+        seed = name_map_salt(options.name_map)
+    shared = build_symbol_index([(src_path, rng_key) for src_path, _, rng_key in tasks], index_path,
+                                seed=seed, jobs=jobs)
+    print(f"Symbol index: {shared} identifier(s) shared between {len(tasks)} file(s)")
+    return ObfuscationOptions(seed=options.seed, engine=options.engine, transform_profile=options.transform_profile,
+                              symbol_index=index_path, name_map=options.name_map)
+
+
+def process_directory(input_dir: str, jobs: int = None, cache: ResultCache = None,
+                      options: ObfuscationOptions = None, output_root: str = None,
+                      walk_options: WalkOptions = None, project: bool = False, shard: tuple = None,
+                      index_root: str = None) -> None:
     """
     Process an entire directory and create shittified_<dirname> with same structure.
     
+    Each file's RNG is keyed by its path relative to input_dir, so seeded output
+    does not depend on where the tree lives or how many workers are used.
+    
+    In project mode, all files are pre-scanned first (see index_project()) so
+    that identifiers shared between files get the same name in each of them.
+    
+    With shard, only that slice of the files is processed (see src.shards), and
+    a report for --merge-shards is written to the root of the output directory.
+    
     @param input_dir: Path to the input directory
+    @param jobs: Number of worker processes for obfuscation. None means os.cpu_count()
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param output_root: If given, mirror the directory under this root (see mirror_path)
+                        instead of creating shittified_<dirname> next to it
+    @param walk_options: Ignore rules, size limit and passthrough mode. None uses defaults
+    @param project: Name identifiers consistently across the files of the directory (--project)
+    @param shard: (shard number, shard count) to process only one slice of the files (--shard), or None
+    @param index_root: Directory the caller removes, to keep the project symbol index in after the run.
+                       None keeps it in a temporary directory removed at the end
     @return: None
     """
     if not os.path.isdir(input_dir):
@@ -129,88 +466,560 @@ def process_directory(input_dir: str) -> None:
         return
     
     input_dir = os.path.abspath(input_dir)
-    dir_name = os.path.basename(input_dir.rstrip(os.sep))
-    parent_dir = os.path.dirname(input_dir)
-    output_dir = os.path.join(parent_dir, f"shittified_{dir_name}")
+    output_dir = directory_output_path(input_dir, output_root)
     
     print(f"Processing directory: {input_dir}")
     print(f"Output directory: {output_dir}")
     
-    def process_directory_recursive(src_dir: str, dst_dir: str) -> None:
-        """
-        Recursively process directory structure and obfuscate files.
-        
-        @param src_dir: Source directory path
-        @param dst_dir: Destination directory path
-        @return: None
-        """
-        os.makedirs(dst_dir, exist_ok=True)
-        
-        for entry in os.listdir(src_dir):
-            src_path = os.path.join(src_dir, entry)
-            dst_path = os.path.join(dst_dir, entry)
-            
-            if os.path.islink(src_path):
-                print(f"Skipping symbolic link: {src_path}")
-                continue
-            
-            if os.path.isfile(src_path):
-                language = get_file_language(src_path)
-                if language:
-                    if language == 'rust':
-                        rust_message = handle_rust()
-                        print(f"\nRust file detected: {src_path}")
-                        print(rust_message)
-                        print(f"Rust is already shittified beyond repair. Skipping.\n")
-                        continue
-                    
-                    _, ext = os.path.splitext(entry)
-                    if language == 'python':
-                        dst_path = dst_path.replace(".py", ".shittified.py")
-                    elif language in ('c', 'cpp'):
-                        dst_path = dst_path.replace(ext, f".shittified{ext}")
-                    elif language in ('javascript', 'typescript'):
-                        dst_path = dst_path.replace(ext, f".shittified{ext}")
-                    elif language == 'go':
-                        dst_path = dst_path.replace(".go", ".shittified.go")
-                    
-                    process_single_file(src_path, dst_path)
-                else:
-                    shutil.copy2(src_path, dst_path)
-            elif os.path.isdir(src_path):
-                process_directory_recursive(src_path, dst_path)
+    tasks = []
+    failed = []
+    index_dir = None
+    start = time.perf_counter()
     
     try:
-        process_directory_recursive(input_dir, output_dir)
+        walker = TreeWalker(input_dir, walk_options, skip=(output_dir,))
+        mirror_directory_entry(input_dir, output_dir, input_dir, tasks, walker, shard)
+        if project and tasks:
+            index_dir = tempfile.mkdtemp(prefix="shittier-index-", dir=index_root)
+            options = index_project(tasks, index_dir, jobs, options)
+        if shard is not None:
+            from src.shards import select_shard, write_shard_report
+            all_tasks = len(tasks)
+            tasks, plan, shard_bytes = select_shard(tasks, shard)
+            print(f"Shard {shard[0]}/{shard[1]}: {len(tasks)} of {all_tasks} file(s), {shard_bytes} byte(s)")
+        failures = run_file_tasks(tasks, jobs, cache=cache, options=options, failed=failed)
+        if failures:
+            print(f"\n{failures} of {len(tasks)} file(s) could not be obfuscated.")
+        if shard is not None:
+            write_shard_report(output_dir, {
+                "shard": shard[0],
+                "shards": shard[1],
+                "plan": plan,
+                "files": sorted(rng_key for _, _, rng_key in tasks),
+                "failed": sorted(rng_key for _, _, rng_key in failed),
+                "bytes": shard_bytes,
+                "seconds": round(time.perf_counter() - start, 3),
+            })
         print(f"\n✓ Directory processing complete: {output_dir}")
     except Exception as e:
         print(f"Error processing directory {input_dir}: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if index_dir is not None and index_root is None:
+            shutil.rmtree(index_dir, ignore_errors=True)
+
+
+def remove_mirrored_output(dst_path: str) -> None:
+    """
+    Remove whatever the output tree holds for a source path that no longer exists.
+    
+    @param dst_path: Path in the output tree corresponding to the deleted source path
+    @return: None
+    """
+    for candidate in (shittified_path(dst_path), dst_path):
+        if os.path.isdir(candidate) and not os.path.islink(candidate):
+            shutil.rmtree(candidate, ignore_errors=True)
+            print(f"Removed: {candidate}")
+        elif os.path.lexists(candidate):
+            try:
+                os.unlink(candidate)
+                print(f"Removed: {candidate}")
+            except OSError as e:
+                print(f"Error: Unable to remove {candidate}: {e}")
+
+
+def mirror_changed_path(path: str, input_dir: str, output_dir: str, tasks: list, walker: TreeWalker,
+                        staged_dir: str = None) -> None:
+    """
+    Bring the output tree up to date for one changed source path.
+    
+    Paths that still exist are mirrored again (see mirror_directory_entry()),
+    outputs of paths that no longer exist are removed. With staged_dir, a file
+    exists if it is in the index, and its staged content is mirrored.
+    
+    @param path: Changed path below input_dir
+    @param input_dir: Root of the processed directory
+    @param output_dir: Root of its mirror
+    @param tasks: List receiving (input path, output path, rng key) triples
+    @param walker: Walker of input_dir
+    @param staged_dir: Staged snapshot of input_dir from checkout_staged(), or None for the working tree
+    @return: None
+    """
+    relative_path = os.path.relpath(path, input_dir)
+    dst_path = os.path.join(output_dir, relative_path)
+    if staged_dir is not None:
+        staged_path = os.path.join(staged_dir, relative_path)
+        if not os.path.lexists(staged_path):
+            remove_mirrored_output(dst_path)
+        elif not walker.is_ignored(path):
+            is_file = os.path.isfile(staged_path) and not os.path.islink(staged_path)
+            kind = walker.classify(staged_path, False, is_file)
+            mirror_walked_entry(staged_path, dst_path, kind, staged_dir, tasks, walker)
+    elif os.path.lexists(path):
+        mirror_directory_entry(path, dst_path, input_dir, tasks, walker)
+    else:
+        remove_mirrored_output(dst_path)
+
+
+def process_changes(input_dir: str, since: str = None, staged: bool = False, jobs: int = None,
+                    cache: ResultCache = None, options: ObfuscationOptions = None, output_root: str = None,
+                    walk_options: WalkOptions = None) -> None:
+    """
+    Update the mirror of a directory with the files git reports as changed (--changed-since, --staged).
+    
+    Added and modified files are obfuscated or passed through, outputs of deleted
+    files and of the old side of renames are removed, and mirror directories left
+    empty by that are removed too. With staged, files are read from the index, so
+    partially staged files are mirrored as they will be committed. Without an
+    existing mirror the whole directory is processed.
+    
+    @param input_dir: Directory inside a git working tree
+    @param since: Revision to compare the working tree with
+    @param staged: Use the changes staged for the next commit instead
+    @param jobs: Number of worker processes for obfuscation. None means os.cpu_count()
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param output_root: Optional --output-dir root
+    @param walk_options: Ignore rules, size limit and passthrough mode. None uses defaults
+    @return: None
+    """
+    from src.git_changes import DELETED, RENAMED, changed_paths, checkout_staged
+
+    input_dir = os.path.abspath(input_dir)
+    output_dir = directory_output_path(input_dir, output_root)
+    if not os.path.isdir(output_dir):
+        print(f"No output directory yet, processing all of {input_dir}")
+        process_directory(input_dir, jobs=jobs, cache=cache, options=options, output_root=output_root,
+                          walk_options=walk_options)
+        return
+    
+    try:
+        changes = changed_paths(input_dir, since=since, staged=staged)
+    except RuntimeError as e:
+        print(f"Error: Unable to list changes in {input_dir}: {e}")
+        return
+    
+    paths = set()
+    for status, path, old_path in changes:
+        paths.add(os.path.join(input_dir, path))
+        if status == RENAMED:
+            paths.add(os.path.join(input_dir, old_path))
+    print(f"Processing {len(paths)} changed path(s) in: {input_dir}")
+    print(f"Output directory: {output_dir}")
+    
+    tasks = []
+    walker = TreeWalker(input_dir, walk_options, skip=(output_dir,))
+    snapshot_dir = tempfile.mkdtemp(prefix="shittier-staged-") if staged else None
+    try:
+        staged_dir = None
+        if staged:
+            staged_paths = [path for status, path, _ in changes if status != DELETED]
+            try:
+                staged_dir = checkout_staged(input_dir, staged_paths, snapshot_dir)
+            except RuntimeError as e:
+                print(f"Error: Unable to read staged files in {input_dir}: {e}")
+                return
+        for path in sorted(paths):
+            mirror_changed_path(path, input_dir, output_dir, tasks, walker, staged_dir)
+            parent = os.path.dirname(path)
+            while parent != input_dir and not os.path.isdir(parent):
+                with contextlib.suppress(OSError):
+                    os.rmdir(os.path.join(output_dir, os.path.relpath(parent, input_dir)))
+                parent = os.path.dirname(parent)
+        if tasks:
+            failures = run_file_tasks(tasks, jobs, cache=cache, options=options)
+            if failures:
+                print(f"\n{failures} of {len(tasks)} file(s) could not be obfuscated.")
+    finally:
+        if snapshot_dir is not None:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+    print(f"\n✓ Changed files processed: {output_dir}")
 
 
-def handle_directory_or_file(path_to_handle: str, recursive_mode: bool = False) -> None:
+def watch_directories(input_dirs: list, jobs: int = None, cache: ResultCache = None,
+                      options: ObfuscationOptions = None, output_root: str = None,
+                      polling: bool = False, walk_options: WalkOptions = None) -> None:
+    """
+    Keep the shittified mirrors of directories up to date until interrupted (--watch).
+    
+    After the initial full pass, changes are picked up by inotify (or stat polling
+    where inotify is unavailable), debounced into batches, and only the affected
+    paths are re-obfuscated, copied or removed from the mirror.
+    
+    @param input_dirs: Directories to watch, already processed once
+    @param jobs: Number of worker processes per batch. None means os.cpu_count()
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param output_root: Optional --output-dir root
+    @param polling: Force the stat-polling watcher
+    @param walk_options: Ignore rules, size limit and passthrough mode. None uses defaults
+    @return: None
+    """
+    from src.watcher import create_watcher
+
+    mirrors = {os.path.abspath(input_dir): directory_output_path(input_dir, output_root) for input_dir in input_dirs}
+    output_dirs = tuple(mirrors.values())
+    walkers = {input_dir: TreeWalker(input_dir, walk_options, skip=output_dirs) for input_dir in mirrors}
+
+    def ignore(path: str) -> bool:
+        if any(path == output_dir or path.startswith(output_dir + os.sep) for output_dir in output_dirs):
+            return True
+        return any(walker.is_ignored(path) for walker in walkers.values())
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    watcher = create_watcher(list(mirrors), ignore=ignore, polling=polling)
+    print(f"Watching {len(mirrors)} director{'y' if len(mirrors) == 1 else 'ies'} "
+          f"({type(watcher).__name__}). Press Ctrl+C to stop.")
+    try:
+        while True:
+            changes = watcher.wait_for_changes()
+            if any(os.path.basename(path) in IGNORE_FILE_NAMES for path in changes):
+                for walker in walkers.values():
+                    walker.invalidate()
+            tasks = []
+            for path in sorted(changes):
+                for input_dir, output_dir in mirrors.items():
+                    if path != input_dir and not path.startswith(input_dir + os.sep):
+                        continue
+                    mirror_changed_path(path, input_dir, output_dir, tasks, walkers[input_dir])
+            # A new directory and the files inside it can arrive in the same batch.
+            tasks = list({task[1]: task for task in tasks}.values())
+            if tasks:
+                failures = run_file_tasks(tasks, jobs, cache=cache, options=options)
+                if failures:
+                    print(f"{failures} of {len(tasks)} file(s) could not be obfuscated.")
+                if options is not None and options.name_map:
+                    save_name_map(options)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+
+
+def process_archive(archive_path: str, output_path: str = None, cache: ResultCache = None,
+                    options: ObfuscationOptions = None) -> bool:
+    """
+    Obfuscate the supported members of a .tar, .tar.gz or .zip archive into a new archive.
+    
+    Members are handled like the files of an extracted directory: code becomes
+    name.shittified.ext, other files pass through unchanged, and symbolic links
+    and Rust files are left out. Nothing is extracted to disk.
+    
+    @param archive_path: Path to the input archive
+    @param output_path: Output archive. If None, creates name.shittified.<suffix> next to the input
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @return: True if the output archive was written, False otherwise
+    """
+    import tarfile
+    import zipfile
+    from src.archive import COPY, REWRITE, SKIP, rewrite_archive, shittified_archive_path
+
+    if output_path is None:
+        output_path = shittified_archive_path(archive_path)
+    failures = 0
+    
+    def plan(name: str, kind: str) -> str:
+        member = f"{archive_path}:{name}"
+        if kind == "link":
+            print(f"Skipping link: {member}")
+            return SKIP
+        language = get_file_language(name) if kind == "file" else None
+        if language == 'rust':
+            from src.language_transformers import handle_rust
+            print(f"\nRust file detected: {member}")
+            print(handle_rust())
+            print(f"Rust is already shittified beyond repair. Skipping.\n")
+            return SKIP
+        return REWRITE if language else COPY
+    
+    def rewrite(name: str, data: bytes):
+        nonlocal failures
+        member = f"{archive_path}:{name}"
+        try:
+            source_code = data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            print(f"Error: Unable to decode file {member}: {e}")
+            failures += 1
+            return None
+        if not source_code.strip():
+            print(f"Warning: File is empty: {member}")
+            return None
+        language = get_file_language(name)
+        try:
+            with profile_file(member, language, name, options):
+                obfuscated_code = obfuscate_source(source_code, language, cache=cache, options=options, rng_key=name)
+        except Exception as e:
+            print(f"Error processing {member}: {e}")
+            failures += 1
+            return None
+        return shittified_path(name), obfuscated_code.encode("utf-8")
+    
+    try:
+        rewrite_archive(archive_path, output_path, plan, rewrite)
+    except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile) as e:
+        print(f"Error: Unable to process archive {archive_path}: {e}")
+        return False
+    if failures:
+        print(f"{failures} member(s) of {archive_path} could not be obfuscated.")
+    print(f"Processed: {archive_path} -> {output_path}")
+    return True
+
+
+def handle_directory_or_file(path_to_handle: str, recursive_mode: bool = False, jobs: int = None,
+                             cache: ResultCache = None, options: ObfuscationOptions = None,
+                             output_root: str = None, walk_options: WalkOptions = None,
+                             project: bool = False, since: str = None, staged: bool = False,
+                             shard: tuple = None, index_root: str = None) -> None:
     """
     Process a given path (file or directory) and obfuscate supported files.
     
     @param path_to_handle: Path to file or directory
     @param recursive_mode: If True, recursively process subdirectories (for single file mode)
+    @param jobs: Number of worker processes for directory mode. None means os.cpu_count()
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param output_root: Optional root to mirror outputs under instead of writing next to the input
+    @param walk_options: Ignore rules, size limit and passthrough mode for directories. None uses defaults
+    @param project: Name identifiers consistently across the files of a directory
+    @param since: Only update a directory's mirror with the files changed since this git revision
+    @param staged: Only update a directory's mirror with the files staged in git
+    @param shard: (shard number, shard count) to process only one slice of a directory
+    @param index_root: Directory to keep project symbol indexes in until the caller removes it
     @return: None
     """
-    if os.path.isfile(path_to_handle):
-        process_single_file(path_to_handle)
+    if os.path.isfile(path_to_handle) and is_archive(path_to_handle):
+        output_file_path = None
+        if output_root is not None:
+            from src.archive import shittified_archive_path
+            output_file_path = mirror_path(shittified_archive_path(path_to_handle), output_root)
+        process_archive(path_to_handle, output_file_path, cache=cache, options=options)
+    elif os.path.isfile(path_to_handle):
+        output_file_path = None
+        if output_root is not None:
+            output_file_path = mirror_path(shittified_path(path_to_handle), output_root)
+        process_single_file(path_to_handle, output_file_path, cache=cache, options=options)
+    elif os.path.isdir(path_to_handle) and (since is not None or staged):
+        process_changes(path_to_handle, since=since, staged=staged, jobs=jobs, cache=cache, options=options,
+                        output_root=output_root, walk_options=walk_options)
     elif os.path.isdir(path_to_handle):
-        process_directory(path_to_handle)
+        process_directory(path_to_handle, jobs=jobs, cache=cache, options=options, output_root=output_root,
+                          walk_options=walk_options, project=project, shard=shard, index_root=index_root)
     else:
         print(f"Path not found: {path_to_handle}")
 
 
-def main_program_entry() -> None:
+def merge_shard_outputs(shard_roots: list, output_dir: str, report_path: str = None,
+                        passthrough: str = "copy") -> int:
     """
-    Main entry point for the CLI. Parses arguments and processes input files.
+    Merge the outputs of a --shard run into one tree (--merge-shards).
+    
+    @param shard_roots: Output roots of all shards: their --output-dir, or their shittified_<dirname> mirrors
+    @param output_dir: Directory to merge into
+    @param report_path: File to write the combined JSON report to ('-' for stdout), or None
+    @param passthrough: How files reach output_dir; skip is treated as copy
+    @return: Exit status: 0 on success, 1 if a shard had failures, 2 if the shards cannot be merged
+    """
+    import json
+    from src.shards import merge_shards
+
+    if not shard_roots:
+        print("Error: --merge-shards needs the output directories of the shards\n", file=sys.stderr)
+        return 2
+    try:
+        report = merge_shards(shard_roots, output_dir, mode="copy" if passthrough == "skip" else passthrough)
+    except (OSError, ValueError) as e:
+        print(f"Error: Unable to merge shards: {e}\n", file=sys.stderr)
+        return 2
+    if report_path == "-":
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+    elif report_path is not None:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+    print(f"Merged {report['shards']} shard(s), {len(report['files'])} file(s) into {output_dir}",
+          file=sys.stderr if report_path == "-" else sys.stdout)
+    if report["failed"]:
+        print(f"{len(report['failed'])} file(s) could not be obfuscated: {', '.join(report['failed'])}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+def warm_up_backends() -> None:
+    """
+    Import every backend and run the Python engines once, so the daemon's first request is fast.
+    
+    @return: None
+    """
+    for language in LANGUAGE_BACKENDS:
+        load_backend(language)
+    from src.transformer import LIBCST_AVAILABLE
+    for engine in PYTHON_ENGINES:
+        if engine == "ast" or LIBCST_AVAILABLE:
+            load_backend('python')("x = 1\n", engine=engine)
+
+
+def serve_daemon(socket_path: str, cache: ResultCache = None) -> int:
+    """
+    Run the obfuscation daemon in the foreground (--serve).
+    
+    @param socket_path: Path of the Unix domain socket
+    @param cache: Optional result cache shared by all requests
+    @return: Exit status
+    """
+    from src.daemon import serve
+
+    def obfuscate(source_code, language, seed, engine, rng_key, transform_profile, symbol_index):
+        options = ObfuscationOptions(seed=seed, engine=engine, transform_profile=transform_profile,
+                                     symbol_index=symbol_index)
+        return obfuscate_source(source_code, language, cache=cache, options=options, rng_key=rng_key)
+
+    print(f"Serving on {socket_path}", file=sys.stderr)
+    try:
+        serve(socket_path, obfuscate, warm_up=warm_up_backends)
+    except KeyboardInterrupt:
+        pass
+    except (RuntimeError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if cache is not None:
+            cache.prune()
+    return 0
+
+
+def process_stdin(language: str, cache: ResultCache = None, options: ObfuscationOptions = None) -> bool:
+    """
+    Obfuscate source code read from stdin and write the result to stdout.
+    
+    Diagnostics go to stderr so that stdout only ever carries code.
+    
+    @param language: Language name from SUPPORTED_EXTENSIONS
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @return: True if code was written to stdout, False otherwise
+    """
+    try:
+        source_code = sys.stdin.buffer.read().decode("utf-8")
+    except UnicodeDecodeError as e:
+        print(f"Error: Unable to decode stdin: {e}", file=sys.stderr)
+        return False
+    if not source_code.strip():
+        print("Warning: stdin is empty", file=sys.stderr)
+        return False
+    try:
+        with profile_file("<stdin>", language, "<stdin>", options):
+            obfuscated_code = obfuscate_source(source_code, language, cache=cache, options=options, rng_key="<stdin>")
+    except Exception as e:
+        print(f"Error processing stdin: {e}", file=sys.stderr)
+        return False
+    sys.stdout.buffer.write(obfuscated_code.encode("utf-8"))
+    sys.stdout.flush()
+    return True
+
+
+def process_file_list(list_path: str, jobs: int = None, cache: ResultCache = None,
+                      options: ObfuscationOptions = None, output_root: str = None) -> int:
+    """
+    Process every file named in a NUL- or newline-delimited list, streaming the list.
+    
+    Directories in the list are skipped (find lists them alongside their files) and
+    unsupported files are reported but do not count as failures.
+    
+    @param list_path: Path of the list file, or '-' for stdin
+    @param jobs: Number of worker processes. None means os.cpu_count()
+    @param cache: Optional result cache for unchanged sources
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param output_root: Optional root to mirror outputs under instead of writing next to the inputs
+    @return: Number of listed files that could not be obfuscated
+    """
+    def iter_tasks(stream):
+        for file_path in iter_file_list(stream):
+            if os.path.isdir(file_path):
+                continue
+            if get_file_language(file_path) in (None, 'rust'):
+                print(f"Skipping unsupported file type: {file_path}")
+                continue
+            output_file_path = shittified_path(file_path)
+            if output_root is not None:
+                output_file_path = mirror_path(output_file_path, output_root)
+            yield file_path, output_file_path, os.path.normpath(file_path).replace(os.sep, "/")
+
+    if list_path == "-":
+        return run_file_tasks(iter_tasks(sys.stdin.buffer), jobs, cache=cache, options=options)
+    try:
+        with open(list_path, "rb") as stream:
+            return run_file_tasks(iter_tasks(stream), jobs, cache=cache, options=options)
+    except OSError as e:
+        print(f"Error: Unable to read file list {list_path}: {e}")
+        return 1
+
+
+def save_name_map(options: ObfuscationOptions, stream=None) -> None:
+    """
+    Record the names derived for new identifiers in the --name-map file.
     
+    @param options: Obfuscation options of the run, with name_map set
+    @param stream: Where to report how many names were added. None means stdout
     @return: None
     """
+    from src.name_map import take_additions, update_name_map
+
+    try:
+        added = update_name_map(options.name_map, take_additions())
+    except (OSError, ValueError) as e:
+        print(f"Error: Unable to update name map {options.name_map}: {e}", file=sys.stderr)
+        return
+    if added:
+        print(f"Name map: {added} new name(s) added to {options.name_map}", file=stream or sys.stdout)
+
+
+def report_profile(options: ObfuscationOptions = None, dump_dir: str = None, top: int = 5) -> None:
+    """
+    Print the --profile report to stderr: one line per file, then a summary table per language and stage.
+    
+    @param options: Obfuscation options of the run, used to re-run files profiled without their own
+    @param dump_dir: If given, write cProfile/pstats dumps of the slowest files to this directory
+    @param top: Number of slowest files to dump
+    @return: None
+    """
+    records = profiling.take_records()
+    if not records:
+        print("\nProfile: no files were obfuscated.", file=sys.stderr)
+        return
+    print("\nProfile per file (ms):", file=sys.stderr)
+    for line in profiling.format_file_breakdown(records):
+        print(line, file=sys.stderr)
+    print("\nProfile summary:", file=sys.stderr)
+    for line in profiling.format_summary(records):
+        print(line, file=sys.stderr)
+    if dump_dir is None:
+        return
+    
+    def rerun(record):
+        with open(record.path, "r", encoding="utf-8") as f:
+            source_code = f.read()
+        run_backend(source_code, record.language, record.options or options, record.rng_key)
+    
+    print(f"\ncProfile dumps of the {top} slowest file(s) (inspect with python -m pstats FILE):", file=sys.stderr)
+    for record, dump_path in profiling.dump_slowest(records, top, dump_dir, rerun):
+        print(f"{record.total * 1000:9.2f} ms  {record.path} -> {dump_path}", file=sys.stderr)
+
+
+def main_program_entry() -> int:
+    """
+    Main entry point for the CLI. Parses arguments and processes input files.
+    
+    @return: Exit status: 0 on success, 1 if stdin or a listed file failed, 2 on usage errors
+    """
+    global _daemon_socket
     parser = argparse.ArgumentParser(
         description="Obfuscate code files (Python, C/C++, JavaScript/TypeScript, Go, Rust).",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -219,6 +1028,33 @@ Examples:
   python main.py file.py                    Process a single file
   python main.py /path/to/project           Process entire directory
   python main.py file1.py file2.js          Process multiple files
+  python main.py -j 8 /path/to/project      Process a directory with 8 worker processes
+  python main.py --no-cache file.py         Re-obfuscate even if a cached result exists
+  python main.py --seed 42 /path/to/project Reproducible output across runs
+  python main.py --engine ast /path/to/gen  Faster Python engine (comments and formatting are not kept)
+  python main.py --transform-profile perf-neutral app.py
+                                            Only transforms without run-time cost in the obfuscated Python
+  python main.py --project /path/to/project Same name for an identifier in every file, so imports and headers still match
+  python main.py --name-map names.idx /path/to/project
+                                            Keep identifier names across runs, so output diffs follow input diffs
+  cat app.js | python main.py - --lang javascript > out.js
+                                            Read code from stdin, write the result to stdout
+  find src -name '*.go' -print0 | python main.py --files-from - --output-dir out
+                                            Process a streamed file list into a mirrored tree
+  python main.py pkg-1.0.tar.gz             Write pkg-1.0.shittified.tar.gz without extracting (.tar, .zip too)
+  python main.py --passthrough hardlink --exclude '*.csv' /path/to/project
+                                            Link non-code files instead of copying them, leave out CSVs
+  python main.py --watch /path/to/project   Keep shittified_project up to date while you edit
+  python main.py --changed-since origin/main /path/to/project
+                                            Only update shittified_project with the files git reports as changed
+  python main.py --no-cache --profile /path/to/project
+                                            Show where the time goes, per file and per pipeline stage
+  python main.py --seed 1 --shard 2/4 -o out2 /path/to/project
+                                            Process the second of four size-balanced slices (one per CI job)
+  python main.py --merge-shards merged out1 out2 out3 out4
+                                            Combine the shard outputs and their reports into one tree
+  python main.py --serve &                  Start a daemon that keeps the engines loaded
+  python main.py --use-daemon file.py       Use the daemon if it is running, else work in-process
   python main.py --help                     Show this help message
 
 Supported file types:
@@ -233,7 +1069,27 @@ Supported file types:
     parser.add_argument(
         "input_paths",
         nargs="*",
-        help="File(s) or directory to process. Supported: .py, .c, .cpp, .h, .js, .ts, .go, .rs",
+        help="File(s), archive(s) or directory to process. Supported: .py, .c, .cpp, .h, .js, .ts, .go, .rs, "
+             "and .tar, .tar.gz, .tgz, .tar.bz2, .tar.xz, .zip archives. "
+             "'-' reads code from stdin and writes the result to stdout (requires --lang).",
+    )
+    parser.add_argument(
+        "--lang",
+        choices=sorted(LANGUAGE_BACKENDS),
+        default=None,
+        help="Language of the code read from stdin with '-'.",
+    )
+    parser.add_argument(
+        "--files-from",
+        metavar="FILE",
+        default=None,
+        help="Read paths to process from FILE ('-' for stdin), NUL- or newline-delimited.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=None,
+        help="Write outputs under this directory, mirroring the input paths, instead of next to the inputs.",
     )
     parser.add_argument(
         "-r",
@@ -241,26 +1097,335 @@ Supported file types:
         action="store_true",
         help="Recursively process directories (deprecated: directories are always processed recursively).",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes used for directories (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--seed",
+        default=None,
+        help="Seed for deterministic output. Each file's RNG is derived from the seed and its path.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=PYTHON_ENGINES,
+        default=None,
+        help="Python engine: libcst keeps comments and formatting, ast is several times faster "
+             "but re-renders the code (default: libcst if installed, otherwise ast).",
+    )
+    parser.add_argument(
+        "--transform-profile",
+        choices=TRANSFORM_PROFILES,
+        default="default",
+        help="Python transforms: perf-neutral only adds decoys that the compiler removes or that run once "
+             "at import, so obfuscated hot paths run as fast as the original (default: default).",
+    )
+    parser.add_argument(
+        "--project",
+        action="store_true",
+        help="Treat each input directory as one project: pre-scan all its files into a symbol index so that "
+             "identifiers shared between files (imports, header declarations) get the same name everywhere.",
+    )
+    parser.add_argument(
+        "--name-map",
+        metavar="FILE",
+        default=None,
+        help="Take identifier names from this name-map file and add the names of new identifiers to it "
+             "(created if missing), so unchanged identifiers keep their names across runs. Without --seed, "
+             "decoys are derived from the map's salt, so unchanged files give unchanged output, and each "
+             "decoy from the line it follows, so an edit only changes the decoys of the edited lines.",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Leave out paths matching this gitignore-style pattern, relative to each directory (repeatable).",
+    )
+    parser.add_argument(
+        "--no-ignore",
+        action="store_true",
+        help="Do not read .gitignore/.shittierignore files and do not skip .git, .hg and .svn directories.",
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=parse_size,
+        default=None,
+        metavar="SIZE",
+        help="Leave out files larger than SIZE (e.g. 512K, 10M) when processing directories.",
+    )
+    parser.add_argument(
+        "--passthrough",
+        choices=PASSTHROUGH_MODES,
+        default="copy",
+        help="How files that are not obfuscated reach the output directory: copy them, hardlink or "
+             "reflink them (falling back to a copy where unsupported), or skip them (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REV",
+        default=None,
+        help="For directories, only update the existing mirror with the files added, modified, deleted or "
+             "renamed since git revision REV (including uncommitted and untracked files).",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="For directories, only update the existing mirror with the changes staged in git, "
+             "reading the staged content (for pre-commit hooks).",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_spec,
+        default=None,
+        metavar="I/N",
+        help="Split the files of each directory into N size-balanced slices and only process slice I (1-based). "
+             "Every shard of a run must see the same tree; merge the outputs with --merge-shards.",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        metavar="DIR",
+        default=None,
+        help="Merge the shard outputs given as inputs (the --output-dir of each --shard run, or its "
+             "shittified_<dirname> mirror) into DIR, keeping the paths below them.",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        default=None,
+        help="With --merge-shards, write the combined JSON run report to FILE ('-' for stdout).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After processing, watch the input directories and keep their mirrors up to date.",
+    )
+    parser.add_argument(
+        "--watch-polling",
+        action="store_true",
+        help="Use stat polling instead of inotify in --watch mode.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a daemon on a Unix domain socket that keeps the engines loaded between requests.",
+    )
+    parser.add_argument(
+        "--use-daemon",
+        action="store_true",
+        help="Send work to the daemon; falls back to in-process work if none is listening.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Daemon socket path (default: $XDG_RUNTIME_DIR/shittier.sock or a per-user file in the temp dir).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report wall time and allocated blocks per pipeline stage, per file and per language, on stderr. "
+             "Combine with --no-cache to time the engines rather than cache lookups.",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Like --profile, and also trace peak memory per stage with tracemalloc (slows the run down).",
+    )
+    parser.add_argument(
+        "--profile-dump",
+        metavar="DIR",
+        default=None,
+        help="Like --profile, and re-run the slowest files under cProfile, writing pstats dumps to DIR.",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=5,
+        metavar="N",
+        help="Number of slowest files dumped by --profile-dump (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for the result cache (default: $XDG_CACHE_HOME/shittier or ~/.cache/shittier).",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+        help="Maximum result cache size in MiB; least recently used entries are evicted (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the result cache and always re-obfuscate.",
+    )
     
     try:
         args = parser.parse_args()
-    except SystemExit:
-        return
+    except SystemExit as e:
+        return e.code
 
-    if not args.input_paths:
+    if args.cache_size < 1:
+        print("Error: --cache-size must be at least 1\n")
+        parser.print_help()
+        return 2
+
+    if args.serve:
+        from src.daemon import default_socket_path
+        cache = None
+        if not args.no_cache:
+            cache = ResultCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024)
+        return serve_daemon(args.socket or default_socket_path(), cache=cache)
+
+    if args.merge_shards is not None:
+        return merge_shard_outputs(args.input_paths, args.merge_shards, report_path=args.report,
+                                   passthrough=args.passthrough)
+
+    if not args.input_paths and args.files_from is None:
         parser.print_help()
         return
 
+    use_stdin = "-" in args.input_paths
+    if use_stdin:
+        if len(args.input_paths) > 1 or args.files_from == "-":
+            print("Error: '-' cannot be combined with other inputs or --files-from -\n", file=sys.stderr)
+            return 2
+        if args.lang is None:
+            print("Error: reading code from stdin requires --lang\n", file=sys.stderr)
+            return 2
+
+    if args.jobs is not None and args.jobs < 1:
+        print("Error: --jobs must be at least 1\n")
+        parser.print_help()
+        return 2
+
+    if args.project and args.watch:
+        print("Error: --project cannot be combined with --watch\n")
+        return 2
+
+    if args.changed_since is not None and args.staged:
+        print("Error: --changed-since cannot be combined with --staged\n")
+        return 2
+
+    if args.project and (args.changed_since is not None or args.staged):
+        print("Error: --project needs every file; use --name-map to keep names stable with "
+              "--changed-since or --staged\n")
+        return 2
+
+    if args.shard is not None:
+        if args.watch or args.changed_since is not None or args.staged:
+            print("Error: --shard cannot be combined with --watch, --changed-since or --staged\n")
+            return 2
+        if args.files_from is not None or not all(os.path.isdir(path) for path in args.input_paths):
+            print("Error: --shard only splits directories; pass each directory to process\n")
+            return 2
+        if args.project and args.seed is None and args.name_map is None:
+            print("Error: --shard with --project needs --seed (or --name-map), so that every shard names "
+                  "identifiers alike\n")
+            return 2
+
+    if args.engine == "libcst" and importlib.util.find_spec("libcst") is None:
+        print("Error: --engine libcst requires libcst (pip install libcst)\n")
+        return 2
+
     for input_path in args.input_paths:
+        if input_path == "-":
+            continue
         if input_path.lower() in ('help', '--help', '-h'):
             parser.print_help()
             return
         if not os.path.exists(input_path):
             print(f"Error: Path not found: {input_path}\n")
             parser.print_help()
-            return
-        handle_directory_or_file(input_path, recursive_mode=args.recursive)
+            return 2
+        if (args.changed_since is not None or args.staged) and os.path.isdir(input_path):
+            from src.git_changes import run_git, verify_revision
+            try:
+                if args.staged:
+                    run_git(input_path, "rev-parse", "--show-toplevel")
+                else:
+                    verify_revision(input_path, args.changed_since)
+            except RuntimeError as e:
+                print(f"Error: Unable to use git in {input_path}: {e}\n")
+                return 2
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024)
+
+    name_map_path = None
+    if args.name_map is not None:
+        name_map_path = os.path.abspath(args.name_map)
+        try:
+            from src.name_map import create_name_map, name_map_salt
+            create_name_map(name_map_path, seed=args.seed)
+            name_map_salt(name_map_path)
+        except (OSError, ValueError) as e:
+            print(f"Error: Unable to use name map {args.name_map}: {e}\n", file=sys.stderr)
+            return 2
+    options = ObfuscationOptions(seed=args.seed, engine=args.engine, transform_profile=args.transform_profile,
+                                 name_map=name_map_path)
+    walk_options = WalkOptions(exclude=args.exclude, use_ignore_files=not args.no_ignore,
+                               max_file_size=args.max_file_size, passthrough=args.passthrough)
+
+    if args.use_daemon:
+        from src.daemon import default_socket_path
+        _daemon_socket = args.socket or default_socket_path()
+
+    profile_mode = None
+    if args.profile_memory:
+        profile_mode = "memory"
+    elif args.profile or args.profile_dump is not None:
+        profile_mode = "time"
+    if profile_mode is not None:
+        profiling.enable(profile_mode)
+
+    # --profile-dump re-runs project files after their directories are done, so their symbol indexes must survive.
+    index_root = None
+    if args.project and args.profile_dump is not None:
+        index_root = tempfile.mkdtemp(prefix="shittier-index-")
+    try:
+        status = 0
+        if use_stdin:
+            if not process_stdin(args.lang, cache=cache, options=options):
+                status = 1
+        else:
+            for input_path in args.input_paths:
+                handle_directory_or_file(input_path, recursive_mode=args.recursive, jobs=args.jobs, cache=cache,
+                                         options=options, output_root=args.output_dir, walk_options=walk_options,
+                                         project=args.project, since=args.changed_since, staged=args.staged,
+                                         shard=args.shard, index_root=index_root)
+        if args.files_from is not None:
+            if process_file_list(args.files_from, jobs=args.jobs, cache=cache, options=options,
+                                 output_root=args.output_dir):
+                status = 1
+
+        if options.name_map:
+            save_name_map(options, stream=sys.stderr if use_stdin else None)
+
+        if args.watch:
+            watched = [input_path for input_path in args.input_paths if os.path.isdir(input_path)]
+            if watched:
+                watch_directories(watched, jobs=args.jobs, cache=cache, options=options,
+                                  output_root=args.output_dir, polling=args.watch_polling, walk_options=walk_options)
+            else:
+                print("Error: --watch needs at least one directory")
+                status = 2
+
+        if profile_mode is not None:
+            report_profile(options, dump_dir=args.profile_dump, top=args.profile_top)
+    finally:
+        if index_root is not None:
+            shutil.rmtree(index_root, ignore_errors=True)
+
+    if cache is not None:
+        cache.prune()
+    return status
 
 
 if __name__ == "__main__":
-    main_program_entry()
+    sys.exit(main_program_entry())
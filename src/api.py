@@ -0,0 +1,289 @@
+import collections
+import functools
+import importlib
+import itertools
+import os
+import time
+
+from src.options import ObfuscationOptions
+from src.profiling import stage
+
+
+SUPPORTED_EXTENSIONS = {
+    '.py': 'python',
+    '.c': 'c',
+    '.cpp': 'cpp',
+    '.cc': 'cpp',
+    '.cxx': 'cpp',
+    '.h': 'c',
+    '.hpp': 'cpp',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'typescript',
+    '.go': 'go',
+    '.rs': 'rust',
+}
+
+# Backends are imported on first use, so a run that only touches C or Go files
+# never pays for importing libcst.
+LANGUAGE_BACKENDS = {
+    'python': ('src.transformer', 'obfuscate_code_with_ast'),
+    'c': ('src.language_transformers', 'shittify_c_cpp'),
+    'cpp': ('src.language_transformers', 'shittify_c_cpp'),
+    'javascript': ('src.language_transformers', 'shittify_javascript_typescript'),
+    'typescript': ('src.language_transformers', 'shittify_javascript_typescript'),
+    'go': ('src.language_transformers', 'shittify_go'),
+}
+
+# Items in flight per worker in obfuscate_many(), which bounds memory for endless inputs.
+ITEMS_IN_FLIGHT_PER_JOB = 16
+
+
+def get_file_language(file_path: str) -> str:
+    """
+    Determine the programming language based on file extension.
+    
+    @param file_path: Path to the file
+    @return: Language name or None if unsupported
+    """
+    _, ext = os.path.splitext(file_path)
+    ext_lower = ext.lower()
+    return SUPPORTED_EXTENSIONS.get(ext_lower)
+
+
+@functools.lru_cache(maxsize=None)
+def load_backend(language: str):
+    """
+    Import and return the backend function for a language.
+    
+    @param language: Language name from SUPPORTED_EXTENSIONS
+    @return: Backend callable
+    """
+    if language not in LANGUAGE_BACKENDS:
+        raise ValueError(f"Unsupported language: {language}")
+    module_name, function_name = LANGUAGE_BACKENDS[language]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def run_backend(source_code: str, language: str, options: ObfuscationOptions = None, rng_key: str = "",
+                names=None) -> str:
+    """
+    Obfuscate source code with the backend for a language, without cache or daemon.
+    
+    @param source_code: Source code as a string
+    @param language: Language name from LANGUAGE_BACKENDS
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param rng_key: Stable identifier of the file, mixed into the seed to derive its RNG
+    @param names: Optional NameTable that receives the identifier mapping. None uses options.name_table()
+    @return: Obfuscated source code
+    """
+    options = options or ObfuscationOptions()
+    if names is None:
+        names = options.name_table(language)
+    with stage("load backend"):
+        backend = load_backend(language)
+    decoy_key = options.decoy_key(rng_key)
+    if language == 'python':
+        return backend(source_code, rng=options.rng_for(rng_key), engine=options.python_engine(), names=names,
+                       transform_profile=options.transform_profile, decoy_key=decoy_key)
+    return backend(source_code, rng=options.rng_for(rng_key), names=names, decoy_key=decoy_key)
+
+
+class ObfuscationResult:
+    """
+    Outcome of obfuscating one item.
+    
+    Attributes:
+        path: Path or name the item was submitted under
+        language: Language name, or None if it could not be determined
+        output: Obfuscated code, or None on failure
+        error: Error message, or None on success
+        seconds: Time spent obfuscating (excluding reading the file)
+        identifier_map: Dict of original identifier to obfuscated name, or None if the
+                        output came from the cache or obfuscation failed
+    """
+
+    def __init__(self, path: str, language: str = None, output: str = None, error: str = None,
+                 seconds: float = 0.0, identifier_map: dict = None):
+        """
+        Initialize a result.
+        
+        @param path: Path or name of the item
+        @param language: Language name
+        @param output: Obfuscated code
+        @param error: Error message
+        @param seconds: Obfuscation time
+        @param identifier_map: Original to obfuscated identifier names
+        @return: None
+        """
+        self.path = path
+        self.language = language
+        self.output = output
+        self.error = error
+        self.seconds = seconds
+        self.identifier_map = identifier_map
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether obfuscation succeeded.
+        
+        @return: True if output is available
+        """
+        return self.error is None
+
+    def __repr__(self) -> str:
+        """
+        Return a short description for debugging.
+        
+        @return: Representation string
+        """
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"ObfuscationResult({self.path!r}, {self.language!r}, {status}, {self.seconds:.4f}s)"
+
+
+def obfuscate(source_code: str, language: str, options: ObfuscationOptions = None, rng_key: str = "",
+              cache=None, path: str = "<string>") -> ObfuscationResult:
+    """
+    Obfuscate one string of code.
+    
+    Errors are reported in the result instead of being raised, so a failing item
+    never interrupts a batch.
+    
+    @param source_code: Source code as a string
+    @param language: Language name from LANGUAGE_BACKENDS
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param rng_key: Stable identifier of the item, mixed into the seed to derive its RNG
+    @param cache: Optional ResultCache consulted before running the backend
+    @param path: Name reported in the result
+    @return: ObfuscationResult
+    """
+    if language not in LANGUAGE_BACKENDS:
+        message = "Rust is already shittified beyond repair" if language == 'rust' else "Unsupported language"
+        return ObfuscationResult(path, language, error=f"{message}: {language}")
+    options = options or ObfuscationOptions()
+    names = options.name_table(language)
+    computed = []
+
+    def compute() -> str:
+        computed.append(True)
+        return run_backend(source_code, language, options, rng_key, names)
+
+    start = time.perf_counter()
+    try:
+        if cache is None:
+            output = compute()
+        else:
+            output = cache.get_or_compute(source_code, language, options.cache_config(rng_key, language), compute)
+    except Exception as e:
+        return ObfuscationResult(path, language, error=f"{type(e).__name__}: {e}",
+                                 seconds=time.perf_counter() - start)
+    return ObfuscationResult(path, language, output, seconds=time.perf_counter() - start,
+                             identifier_map=dict(names.forward) if computed else None)
+
+
+def _obfuscate_item(item, language: str, options: ObfuscationOptions, cache) -> ObfuscationResult:
+    """
+    Read (if needed) and obfuscate one item of obfuscate_many().
+    
+    @param item: Path, or (path, source) pair
+    @param language: Language override, or None to use the extension
+    @param options: Obfuscation options
+    @param cache: Optional ResultCache
+    @return: ObfuscationResult
+    """
+    if isinstance(item, (str, os.PathLike)):
+        path, source_code = os.fspath(item), None
+    else:
+        path, source_code = item
+        path = os.fspath(path)
+    item_language = language or get_file_language(path)
+    if source_code is None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                source_code = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            return ObfuscationResult(path, item_language, error=f"{type(e).__name__}: {e}")
+    rng_key = os.path.normpath(path).replace(os.sep, "/")
+    return obfuscate(source_code, item_language, options, rng_key, cache=cache, path=path)
+
+
+_worker_settings = None
+
+
+def _init_worker(language: str, options: ObfuscationOptions, cache) -> None:
+    """
+    Process pool initializer: install the settings shared by every item.
+    
+    @param language: Language override
+    @param options: Obfuscation options
+    @param cache: Optional ResultCache
+    @return: None
+    """
+    global _worker_settings
+    _worker_settings = (language, options, cache)
+
+
+def _obfuscate_item_in_worker(item) -> ObfuscationResult:
+    """
+    Worker entry point for obfuscate_many().
+    
+    @param item: Path, or (path, source) pair
+    @return: ObfuscationResult
+    """
+    return _obfuscate_item(item, *_worker_settings)
+
+
+def obfuscate_many(items, language: str = None, options: ObfuscationOptions = None, jobs: int = 1,
+                   cache=None, executor=None):
+    """
+    Obfuscate a stream of files, yielding results lazily in input order.
+    
+    Items are paths (read with UTF-8) or (path, source) pairs; the path selects
+    the language from its extension unless language is given, and seeds the
+    item's RNG. The input is consumed as results are requested, with at most
+    ITEMS_IN_FLIGHT_PER_JOB items per worker submitted ahead, so generators of any
+    length work. Workers keep their loaded backends for the whole run.
+    
+    @param items: Iterable of paths or (path, source) pairs
+    @param language: Language of every item, or None to use the file extensions
+    @param options: Obfuscation options. None uses defaults (unseeded)
+    @param jobs: Number of worker processes; 1 works in the calling process
+    @param cache: Optional ResultCache for unchanged sources
+    @param executor: Optional concurrent.futures.Executor to use instead of creating a pool
+    @return: Generator of ObfuscationResult
+    """
+    options = options or ObfuscationOptions()
+    if executor is not None:
+        yield from _iter_results(executor, functools.partial(_obfuscate_item, language=language, options=options,
+                                                             cache=cache), items, jobs)
+        return
+    if jobs <= 1:
+        for item in items:
+            yield _obfuscate_item(item, language, options, cache)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(language, options, cache)) as pool:
+        yield from _iter_results(pool, _obfuscate_item_in_worker, items, jobs)
+
+
+def _iter_results(executor, function, items, jobs: int):
+    """
+    Submit items to an executor with a bounded number in flight and yield results in order.
+    
+    @param executor: concurrent.futures.Executor
+    @param function: Picklable callable applied to each item
+    @param items: Iterable of items
+    @param jobs: Number of workers, used to size the window
+    @return: Generator of results
+    """
+    window = max(1, jobs) * ITEMS_IN_FLIGHT_PER_JOB
+    items = iter(items)
+    pending = collections.deque(executor.submit(function, item) for item in itertools.islice(items, window))
+    while pending:
+        result = pending.popleft().result()
+        for item in itertools.islice(items, 1):
+            pending.append(executor.submit(function, item))
+        yield result
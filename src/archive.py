@@ -0,0 +1,203 @@
+import io
+import os
+import shutil
+
+
+# Archive suffix -> compression passed to tarfile, or "zip".
+ARCHIVE_SUFFIXES = {
+    '.tar.gz': 'gz',
+    '.tgz': 'gz',
+    '.tar.bz2': 'bz2',
+    '.tar.xz': 'xz',
+    '.tar': '',
+    '.zip': 'zip',
+}
+
+# Member actions returned by the plan callback of rewrite_archive().
+COPY = "copy"
+REWRITE = "rewrite"
+SKIP = "skip"
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# tarfile and zipfile are imported when an archive is processed: checking a
+# path with archive_suffix() must not slow down CLI start-up.
+
+
+def archive_suffix(path: str) -> str:
+    """
+    Return the archive suffix of a path.
+    
+    @param path: File path
+    @return: Matching key of ARCHIVE_SUFFIXES, or None if the path is not a supported archive
+    """
+    lower = path.lower()
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if lower.endswith(suffix):
+            return suffix
+    return None
+
+
+def shittified_archive_path(path: str) -> str:
+    """
+    Return the output name for an archive: name.tar.gz becomes name.shittified.tar.gz.
+    
+    @param path: Path to the input archive
+    @return: Path with .shittified inserted before the archive suffix
+    """
+    suffix = archive_suffix(path)
+    if suffix is None:
+        raise ValueError(f"Not a supported archive: {path}")
+    cut = len(path) - len(suffix)
+    return f"{path[:cut]}.shittified{path[cut:]}"
+
+
+def _member_kind_tar(member: "tarfile.TarInfo") -> str:
+    """
+    Classify a tar member.
+    
+    @param member: Tar member
+    @return: "file", "dir" or "link" (links, devices and FIFOs)
+    """
+    if member.isreg():
+        return "file"
+    if member.isdir():
+        return "dir"
+    return "link"
+
+
+def _member_kind_zip(info: "zipfile.ZipInfo") -> str:
+    """
+    Classify a zip member, using the Unix mode bits where the archiver stored them.
+    
+    @param info: Zip member
+    @return: "file", "dir" or "link"
+    """
+    if info.is_dir():
+        return "dir"
+    mode = info.external_attr >> 16
+    if mode and (mode & 0o170000) not in (0, 0o100000):
+        return "link"
+    return "file"
+
+
+def _rewrite_tar(input_path: str, output_path: str, compression: str, plan, rewrite) -> None:
+    """
+    Stream a tar archive into a new tar archive with the same compression.
+    
+    Both archives are opened in stream mode, so members are read and written in
+    order and only a rewritten member is held in memory.
+    
+    @param input_path: Input archive
+    @param output_path: Output archive
+    @param compression: Compression from ARCHIVE_SUFFIXES ('' for none)
+    @param plan: See rewrite_archive()
+    @param rewrite: See rewrite_archive()
+    @return: None
+    """
+    import tarfile
+    with tarfile.open(input_path, "r|*") as tar_in, tarfile.open(output_path, f"w|{compression}") as tar_out:
+        for member in tar_in:
+            action = plan(member.name, _member_kind_tar(member))
+            if action == SKIP:
+                continue
+            if action == COPY or not member.isreg():
+                tar_out.addfile(member, tar_in.extractfile(member) if member.isreg() else None)
+                continue
+            result = rewrite(member.name, tar_in.extractfile(member).read())
+            if result is None:
+                continue
+            name, data = result
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = member.mode
+            info.mtime = member.mtime
+            info.uid, info.gid = member.uid, member.gid
+            info.uname, info.gname = member.uname, member.gname
+            tar_out.addfile(info, io.BytesIO(data))
+
+
+def _rewrite_zip(input_path: str, output_path: str, plan, rewrite) -> None:
+    """
+    Copy a zip archive member by member into a new zip archive.
+    
+    Copied members are streamed in COPY_BUFFER_SIZE blocks with their original
+    compression method; only a rewritten member is held in memory.
+    
+    @param input_path: Input archive
+    @param output_path: Output archive
+    @param plan: See rewrite_archive()
+    @param rewrite: See rewrite_archive()
+    @return: None
+    """
+    import zipfile
+    with zipfile.ZipFile(input_path) as zip_in, zipfile.ZipFile(output_path, "w") as zip_out:
+        for info in zip_in.infolist():
+            kind = _member_kind_zip(info)
+            action = plan(info.filename, kind)
+            if action == SKIP:
+                continue
+            if action == COPY or kind != "file":
+                out_info = _zip_info_like(info, info.filename)
+                out_info.file_size = info.file_size
+                with zip_in.open(info) as src, zip_out.open(out_info, "w") as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                continue
+            result = rewrite(info.filename, zip_in.read(info))
+            if result is None:
+                continue
+            name, data = result
+            zip_out.writestr(_zip_info_like(info, name), data)
+
+
+def _zip_info_like(info: "zipfile.ZipInfo", name: str) -> "zipfile.ZipInfo":
+    """
+    Create a fresh ZipInfo carrying over the metadata of an input member.
+    
+    @param info: Input member
+    @param name: Name of the output member
+    @return: New ZipInfo
+    """
+    import zipfile
+    out_info = zipfile.ZipInfo(name, info.date_time)
+    out_info.compress_type = info.compress_type
+    out_info.comment = info.comment
+    out_info.create_system = info.create_system
+    out_info.external_attr = info.external_attr
+    return out_info
+
+
+def rewrite_archive(input_path: str, output_path: str, plan, rewrite) -> None:
+    """
+    Write a copy of an archive in which selected members are rewritten, without extracting it.
+    
+    Members are visited in archive order. Copied members are streamed straight from
+    the input archive to the output archive, so memory use is bounded by the
+    largest rewritten member rather than by the archive. The output uses the same
+    format and compression as the input. If anything fails, the partial output is removed.
+    
+    @param input_path: Input archive (.tar, .tar.gz, .tgz, .tar.bz2, .tar.xz or .zip)
+    @param output_path: Output archive, written with the same format
+    @param plan: Callable (member name, kind) -> COPY, REWRITE or SKIP, where kind is
+                 "file", "dir" or "link". Only "file" members can be rewritten
+    @param rewrite: Callable (member name, contents as bytes) -> (new member name, new bytes),
+                    or None to leave the member out of the output
+    @return: None
+    """
+    suffix = archive_suffix(input_path)
+    if suffix is None:
+        raise ValueError(f"Not a supported archive: {input_path}")
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    try:
+        if ARCHIVE_SUFFIXES[suffix] == 'zip':
+            _rewrite_zip(input_path, output_path, plan, rewrite)
+        else:
+            _rewrite_tar(input_path, output_path, ARCHIVE_SUFFIXES[suffix], plan, rewrite)
+    except BaseException:
+        try:
+            os.unlink(output_path)
+        except OSError:
+            pass
+        raise
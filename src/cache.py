@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from src import __version__
+
+
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_cache_dir() -> str:
+    """
+    Return the default on-disk cache location, honouring XDG_CACHE_HOME.
+    
+    @return: Path to the cache directory
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "shittier")
+
+
+class ResultCache:
+    """
+    Persistent content-addressed cache of obfuscation results.
+    
+    Entries are keyed by the source text, language, obfuscation config and tool
+    version, and stored one file per entry. Reads bump the entry's mtime so that
+    prune() can evict least-recently-used entries once the size budget is exceeded.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Initialize the cache rooted at cache_dir.
+        
+        @param cache_dir: Directory holding cache entries. None uses default_cache_dir()
+        @param max_bytes: Size budget enforced by prune()
+        @return: None
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(source_code: str, language: str, config: dict = None) -> str:
+        """
+        Build the cache key for a source text under a given language and config.
+        
+        @param source_code: Source code to be obfuscated
+        @param language: Language name from SUPPORTED_EXTENSIONS
+        @param config: Obfuscation options that influence the output
+        @return: Hex digest identifying the result
+        """
+        digest = hashlib.sha256()
+        header = json.dumps(
+            {"version": __version__, "language": language, "config": config or {}},
+            sort_keys=True,
+        )
+        digest.update(header.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(source_code.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        """
+        Map a key to its entry file, sharded by the first two hex digits.
+        
+        @param key: Cache key
+        @return: Path of the entry file
+        """
+        return os.path.join(self.cache_dir, key[:2], key[2:])
+
+    def get(self, key: str) -> str:
+        """
+        Return the cached result for key and mark it as recently used.
+        
+        @param key: Cache key
+        @return: Cached obfuscated code, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = f.read()
+            os.utime(path, None)
+        except (OSError, UnicodeDecodeError):
+            return None
+        return result
+
+    def put(self, key: str, result: str) -> None:
+        """
+        Store a result atomically. Failures to write are ignored.
+        
+        @param key: Cache key
+        @param result: Obfuscated code to store
+        @return: None
+        """
+        path = self._entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(result)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
+
+    def get_or_compute(self, source_code: str, language: str, config: dict, compute) -> str:
+        """
+        Return the cached result, or compute, store and return it.
+        
+        @param source_code: Source code to be obfuscated
+        @param language: Language name from SUPPORTED_EXTENSIONS
+        @param config: Obfuscation options that influence the output
+        @param compute: Zero-argument callable producing the obfuscated code
+        @return: Obfuscated code
+        """
+        key = self.make_key(source_code, language, config)
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def prune(self) -> int:
+        """
+        Evict least-recently-used entries until the cache fits in max_bytes.
+        
+        @return: Number of entries removed
+        """
+        entries = []
+        total = 0
+        try:
+            shards = list(os.scandir(self.cache_dir))
+        except OSError:
+            return 0
+        for shard in shards:
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            try:
+                for entry in os.scandir(shard.path):
+                    if entry.name.startswith(".tmp-") or not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            except OSError:
+                continue
+
+        removed = 0
+        if total <= self.max_bytes:
+            return removed
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,284 @@
+import json
+import os
+import socket
+import socketserver
+import struct
+import tempfile
+
+
+HEADER = struct.Struct(">I")
+
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+# Clients give up quickly on a stuck daemon and do the work in-process instead.
+CONNECT_TIMEOUT = 1.0
+CLIENT_TIMEOUT = 30.0
+
+
+def default_socket_path() -> str:
+    """
+    Return the default daemon socket location.
+    
+    Uses $XDG_RUNTIME_DIR, which is private to the user, and falls back to a
+    per-user name in the temporary directory.
+    
+    @return: Path of the Unix domain socket
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "shittier.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"shittier-{uid}.sock")
+
+
+def send_message(sock: socket.socket, message: dict) -> None:
+    """
+    Send one message: a 4-byte big-endian length followed by UTF-8 JSON.
+    
+    @param sock: Connected socket
+    @param message: JSON-serialisable dict
+    @return: None
+    """
+    payload = json.dumps(message).encode("utf-8", "surrogatepass")
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """
+    Read exactly size bytes.
+    
+    @param sock: Connected socket
+    @param size: Number of bytes to read
+    @return: The bytes, or b"" if the peer closed the connection before sending any
+    """
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            if remaining == size:
+                return b""
+            raise ConnectionError("Connection closed in the middle of a message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> dict:
+    """
+    Receive one message sent by send_message().
+    
+    @param sock: Connected socket
+    @return: Decoded dict, or None if the peer closed the connection
+    """
+    header = _recv_exactly(sock, HEADER.size)
+    if not header:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ConnectionError(f"Message of {size} bytes exceeds the limit")
+    payload = _recv_exactly(sock, size)
+    if len(payload) != size:
+        raise ConnectionError("Connection closed in the middle of a message")
+    return json.loads(payload.decode("utf-8", "surrogatepass"))
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """
+    Serve requests on one connection until the client closes it.
+    """
+
+    def handle(self) -> None:
+        """
+        Read requests, dispatch them and send back one response per request.
+        
+        @return: None
+        """
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (OSError, ValueError):
+                return
+            if request is None:
+                return
+            response = self.server.dispatch(request)
+            try:
+                send_message(self.request, response)
+            except OSError:
+                return
+            if request.get("op") == "shutdown":
+                self.server.shutdown()
+                return
+
+
+class ObfuscationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix domain socket server that keeps the obfuscation engines loaded between requests.
+    
+    Requests are JSON objects with an "op" field:
+    
+    - {"op": "ping"} returns {"ok": true, "pid": ...}
+    - {"op": "obfuscate", "language": ..., "source": ... or "path": ..., "seed": ...,
+      "engine": ..., "transform_profile": ..., "symbol_index": ..., "rng_key": ...} returns {"ok": true, "output": ...}
+    - {"op": "shutdown"} returns {"ok": true} and stops the server
+    
+    Failures are returned as {"ok": false, "error": message}.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, obfuscate):
+        """
+        Bind the socket, readable and writable by the current user only.
+        
+        @param socket_path: Path of the Unix domain socket
+        @param obfuscate: Callable (source, language, seed, engine, rng_key, transform_profile, symbol_index) -> obfuscated code
+        @return: None
+        """
+        self.socket_path = socket_path
+        self.obfuscate = obfuscate
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def dispatch(self, request: dict) -> dict:
+        """
+        Execute one request.
+        
+        @param request: Decoded request message
+        @return: Response message
+        """
+        op = request.get("op")
+        if op in ("ping", "shutdown"):
+            return {"ok": True, "pid": os.getpid()}
+        if op != "obfuscate":
+            return {"ok": False, "error": f"Unknown op: {op}"}
+        try:
+            source = request.get("source")
+            if source is None:
+                with open(request["path"], "r", encoding="utf-8") as f:
+                    source = f.read()
+            output = self.obfuscate(
+                source,
+                request["language"],
+                request.get("seed"),
+                request.get("engine"),
+                request.get("rng_key", ""),
+                request.get("transform_profile", "default"),
+                request.get("symbol_index"),
+            )
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"ok": True, "output": output}
+
+    def server_close(self) -> None:
+        """
+        Close the listening socket and remove the socket file.
+        
+        @return: None
+        """
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+def daemon_is_running(socket_path: str) -> bool:
+    """
+    Check whether a daemon answers on socket_path.
+    
+    @param socket_path: Path of the Unix domain socket
+    @return: True if a ping succeeded
+    """
+    try:
+        return bool(request(socket_path, {"op": "ping"}, timeout=1.0).get("ok"))
+    except (OSError, ValueError):
+        return False
+
+
+def serve(socket_path: str, obfuscate, warm_up=None) -> None:
+    """
+    Run the daemon in the foreground until interrupted or asked to shut down.
+    
+    @param socket_path: Path of the Unix domain socket
+    @param obfuscate: Callable (source, language, seed, engine, rng_key, transform_profile, symbol_index) -> obfuscated code
+    @param warm_up: Optional zero-argument callable run once before accepting requests
+    @return: None
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix domain sockets are not supported on this platform")
+    if os.path.exists(socket_path):
+        if daemon_is_running(socket_path):
+            raise RuntimeError(f"A daemon is already listening on {socket_path}")
+        os.unlink(socket_path)
+    if warm_up is not None:
+        warm_up()
+    server = ObfuscationServer(socket_path, obfuscate)
+    try:
+        server.serve_forever(poll_interval=0.2)
+    finally:
+        server.server_close()
+
+
+def request(socket_path: str, message: dict, timeout: float = CLIENT_TIMEOUT) -> dict:
+    """
+    Send one request to the daemon and wait for its response.
+    
+    @param socket_path: Path of the Unix domain socket
+    @param message: Request message
+    @param timeout: Socket timeout in seconds for sending and receiving
+    @return: Response message
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(min(timeout, CONNECT_TIMEOUT))
+        sock.connect(socket_path)
+        sock.settimeout(timeout)
+        send_message(sock, message)
+        response = recv_message(sock)
+    if response is None:
+        raise ConnectionError("Daemon closed the connection without a response")
+    if not isinstance(response, dict):
+        raise ValueError(f"Malformed daemon response: {response!r:.80}")
+    return response
+
+
+def obfuscate_remote(socket_path: str, source_code: str, language: str, seed=None,
+                     engine: str = None, rng_key: str = "", transform_profile: str = "default",
+                     symbol_index: str = None) -> str:
+    """
+    Obfuscate source code in a running daemon.
+    
+    @param socket_path: Path of the Unix domain socket
+    @param source_code: Source code as a string
+    @param language: Language name from SUPPORTED_EXTENSIONS
+    @param seed: Run seed, or None
+    @param engine: Python engine, or None for the default
+    @param rng_key: Stable identifier of the file
+    @param transform_profile: Python transform profile
+    @param symbol_index: Path of a project symbol index, or None
+    @return: Obfuscated code, or None if no daemon is reachable or the exchange failed
+             (timeout, reset connection, malformed response); the caller then works in-process
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    message = {
+        "op": "obfuscate",
+        "language": language,
+        "source": source_code,
+        "seed": seed,
+        "engine": engine,
+        "rng_key": rng_key,
+        "transform_profile": transform_profile,
+        "symbol_index": symbol_index,
+    }
+    try:
+        response = request(socket_path, message)
+    except (OSError, ValueError):
+        return None
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "Daemon request failed"))
+    output = response.get("output")
+    return output if isinstance(output, str) else None
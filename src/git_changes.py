@@ -0,0 +1,114 @@
+import os
+import subprocess
+
+
+# Statuses of git diff --name-status; a rename also reports the old path, which no longer exists.
+ADDED = "A"
+COPIED = "C"
+DELETED = "D"
+RENAMED = "R"
+
+# Paths per git checkout-index call, to stay well below the command-line length limit.
+CHECKOUT_CHUNK = 500
+
+
+def run_git(directory: str, *args: str) -> bytes:
+    """
+    Run a local git command in a directory.
+    
+    @param directory: Directory to run git in (git -C)
+    @param args: git subcommand and arguments
+    @return: Standard output of the command
+    """
+    try:
+        result = subprocess.run(["git", "-C", directory, *args], capture_output=True)
+    except OSError as e:
+        raise RuntimeError(f"Unable to run git: {e}") from e
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise RuntimeError(message[-1] if message else f"git {args[0]} failed in {directory}")
+    return result.stdout
+
+
+def verify_revision(directory: str, revision: str) -> str:
+    """
+    Resolve a revision of the repository a directory belongs to.
+    
+    @param directory: Directory inside a git working tree
+    @param revision: Commit, branch, tag or any other revision git understands
+    @return: Full commit hash
+    """
+    run_git(directory, "rev-parse", "--show-toplevel")
+    try:
+        output = run_git(directory, "rev-parse", "--verify", "--quiet", "--end-of-options", f"{revision}^{{commit}}")
+    except RuntimeError:
+        raise RuntimeError(f"Unknown revision: {revision}") from None
+    return output.decode("ascii").strip()
+
+
+def parse_name_status(output: bytes) -> list:
+    """
+    Parse the output of git diff --name-status -z.
+    
+    @param output: NUL-delimited status letters and paths
+    @return: List of (status letter, path, old path or None) triples
+    """
+    fields = output.split(b"\0")
+    changes = []
+    position = 0
+    while position < len(fields) and fields[position]:
+        status = fields[position].decode("ascii")[0]
+        if status in (RENAMED, COPIED):
+            old_path, path = fields[position + 1], fields[position + 2]
+            changes.append((status, os.fsdecode(path), os.fsdecode(old_path)))
+            position += 3
+        else:
+            changes.append((status, os.fsdecode(fields[position + 1]), None))
+            position += 2
+    return changes
+
+
+def changed_paths(directory: str, since: str = None, staged: bool = False) -> list:
+    """
+    Ask the local git repository which files below a directory changed.
+    
+    With since, the working tree is compared with that revision, and untracked
+    files that are not ignored count as added, so committed, uncommitted and new
+    files are all reported. With staged, only changes staged in the index are
+    reported (as a pre-commit hook sees them). Renames are detected (-M).
+    
+    @param directory: Directory inside a git working tree
+    @param since: Revision to compare with
+    @param staged: Report the changes staged for the next commit instead
+    @return: Sorted list of (status letter, path, old path or None), paths relative to directory
+    """
+    diff_args = ["diff", "--name-status", "-z", "-M", "--relative", "--no-ext-diff", "--ignore-submodules"]
+    if staged:
+        diff_args.append("--cached")
+    else:
+        diff_args.append(verify_revision(directory, since))
+    changes = parse_name_status(run_git(directory, *diff_args, "--"))
+    if not staged:
+        untracked = run_git(directory, "ls-files", "-z", "--others", "--exclude-standard", "--", ".")
+        changes.extend((ADDED, os.fsdecode(path), None) for path in untracked.split(b"\0") if path)
+    return sorted((status, os.path.normpath(path), old_path and os.path.normpath(old_path))
+                  for status, path, old_path in changes)
+
+
+def checkout_staged(directory: str, paths: list, destination: str) -> str:
+    """
+    Write the staged (index) version of files below a directory to another directory.
+    
+    Partially staged files get the content that will be committed, not the one
+    in the working tree.
+    
+    @param directory: Directory inside a git working tree
+    @param paths: Paths relative to directory, all present in the index
+    @param destination: Directory to write to, keeping paths relative to the repository root
+    @return: Directory below destination that corresponds to directory
+    """
+    prefix = os.fsdecode(run_git(directory, "rev-parse", "--show-prefix").rstrip(b"\n"))
+    for start in range(0, len(paths), CHECKOUT_CHUNK):
+        run_git(directory, "checkout-index", "--force", f"--prefix={os.path.join(destination, '')}", "--",
+                *paths[start:start + CHECKOUT_CHUNK])
+    return os.path.normpath(os.path.join(destination, prefix))
@@ -1,19 +1,58 @@
 import re
 import random
-from src.utils import generate_random_variable_name
+from src.utils import NamePool, decoy_source
+from src.name_table import NameTable
+from src.profiling import stage
+from src.lexers import (
+    C_TOKEN_PATTERN,
+    GO_TOKEN_PATTERN,
+    LineAssembler,
+    iter_javascript_tokens,
+    iter_tokens,
+    normalize_newlines,
+)
 
 
-def shittify_c_cpp(code: str) -> str:
+C_INCLUDE_PATTERN = re.compile(r'^[ \t]*#include\s*[<"]([^>"]+)[>"]', re.MULTILINE)
+C_COMPARISON_OPERATORS = frozenset({'==', '!=', '<=', '>='})
+C_DUMMY_DECLARATIONS = ("int {} = 0;", "int {} = 42;", "void* {} = NULL;")
+
+# Decoy comments of C/C++ and JavaScript/TypeScript; {} is replaced by a random name.
+DECOY_COMMENTS = ("// {}", "// TODO: {}", "/* {} */")
+
+JS_IMPORT_PATTERN = re.compile(
+    r'\bimport\b\s*(?:type\s+)?(?:(?:\*\s*as\s+)?([A-Za-z_$][\w$]*)\s*,?\s*)?(?:\{([^}]*)\})?'
+    r'|\b(?:const|let|var)\s+(?:([A-Za-z_$][\w$]*)|\{([^}]*)\})\s*=\s*require\b'
+)
+# Module specifier following an import matched by JS_IMPORT_PATTERN.
+JS_IMPORT_SOURCE_PATTERN = re.compile(r'\s*(?:from\s*)?\(?\s*([\'"])([^\'"\n]*)\1')
+JS_COMPARISON_OPERATORS = frozenset({'==', '!=', '===', '!==', '<=', '>='})
+JS_DUMMY_DECLARATIONS = ("const {} = 0;", "let {} = null;", "var {} = undefined;", "let {} = {{}};")
+
+GO_MAJOR_VERSION_PATTERN = re.compile(r'^v[0-9]+$')
+GO_COMPARISON_OPERATORS = frozenset({'==', '!=', '<=', '>='})
+GO_DUMMY_DECLARATIONS = ("var {} = 0", "var {} = nil", "{} := 42")
+GO_COMMENTS = ("// {}", "// TODO: {}")
+
+
+def shittify_c_cpp(code: str, rng: random.Random = None, names: NameTable = None, decoy_key: str = None) -> str:
     """
     Obfuscate C/C++ code by renaming identifiers, adding dummy code, and inserting includes.
     
+    The source is lexed once with C_TOKEN_PATTERN; identifiers are renamed as they
+    are reached, while string/char literals, comments and preprocessor lines are
+    copied through untouched.
+    
     @param code: C/C++ source code as a string
+    @param rng: Random generator for names and decoys. None uses the global random module
+    @param names: Table that receives the identifier mapping. None uses a fresh table
+    @param decoy_key: Key to derive each decoy from the line it follows (see src.utils.decoy_source()),
+                      or None to draw decoys from rng in sequence
     @return: Obfuscated C/C++ source code as a string
     """
-    lines = code.splitlines()
-    identifier_map = {}
-    included_headers = set()
-    std_namespace_used = False
+    rng = rng or random
+    code = normalize_newlines(code)
+    names = names if names is not None else NameTable()
     
     builtin_keywords = {
         'int', 'char', 'float', 'double', 'void', 'return', 'if', 'else', 'for', 'while',
@@ -24,17 +63,14 @@ def shittify_c_cpp(code: str) -> str:
         'NULL', 'true', 'false', 'bool'
     }
     
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith('#include'):
-            include_match = re.search(r'#include\s*[<"]([^>"]+)[>"]', stripped)
-            if include_match:
-                header = include_match.group(1)
-                included_headers.add(header)
-                if not header.startswith('.'):
-                    std_namespace_used = True
-        elif 'std::' in line or 'using namespace std' in line:
+    std_namespace_used = 'std::' in code or 'using namespace std' in code
+    for include_match in C_INCLUDE_PATTERN.finditer(code):
+        if not include_match.group(1).startswith('.'):
             std_namespace_used = True
+            break
+    std_names = {'cout', 'cin', 'endl', 'string', 'vector', 'map', 'set'} if std_namespace_used else set()
+    pool = NamePool(rng, taken=names.is_taken, reserved=builtin_keywords)
+    decoys = decoy_source(pool, decoy_key)
     
     def get_random_name(original: str) -> str:
         """
@@ -45,106 +81,98 @@ def shittify_c_cpp(code: str) -> str:
         """
         if (original in builtin_keywords or 
             original.startswith('__') or 
-            original.startswith('std::') or
             original == 'std' or
-            (std_namespace_used and original in ['cout', 'cin', 'endl', 'string', 'vector', 'map', 'set'])):
+            original in std_names):
             return original
-        if original not in identifier_map:
-            identifier_map[original] = generate_random_variable_name()
-        return identifier_map[original]
-    
-    identifier_pattern = r'\b[a-zA-Z_][a-zA-Z0-9_]*\b'
-    
-    result_lines = []
-    
-    for line in lines:
-        original_line = line
-        stripped = line.strip()
-        
-        if stripped.startswith('#') or stripped.startswith('//') or stripped.startswith('/*'):
-            result_lines.append(line)
-            continue
-        
-        string_pattern = r'"[^"]*"|\'[^\']*\''
-        strings = {}
-        string_counter = 0
-        for match in re.finditer(string_pattern, line):
-            placeholder = f"__STRING_{string_counter}__"
-            strings[placeholder] = match.group(0)
-            line = line[:match.start()] + placeholder + line[match.end():]
-            string_counter += 1
-        
-        words = re.findall(identifier_pattern, line)
-        for word in words:
-            if word not in builtin_keywords and not word.startswith('__') and word not in strings.values():
-                new_name = get_random_name(word)
-                line = re.sub(r'\b' + re.escape(word) + r'\b', new_name, line)
-        
-        for placeholder, string_literal in strings.items():
-            line = line.replace(placeholder, string_literal)
+        if original not in names:
+            names.assign(original, pool.take())
+        return names.get(original)
+    
+    lines = LineAssembler(C_COMPARISON_OPERATORS)
+    
+    with stage("lex+rename"):
+        for kind, text in iter_tokens(code, C_TOKEN_PATTERN):
+            if kind == 'identifier':
+                lines.append_token(get_random_name(text), text)
+            elif kind == 'newline':
+                if lines.end_line():
+                    line = lines.lines[-1]
+                    indent = len(line) - len(line.lstrip())
+                    decoy_rng = decoys.at("declaration", line)
+                    lines.add_line(' ' * indent + decoy_rng.choice(C_DUMMY_DECLARATIONS).format(decoys.name(decoy_rng)))
+            elif kind in ('space', 'line_comment'):
+                lines.append(text)
+            elif kind == 'block_comment':
+                lines.append_multiline(text, significant=False)
+            elif kind == 'directive':
+                lines.append_multiline(text)
+                lines.last_token = '#'
+            else:
+                lines.append_multiline(text)
+        lines.finish()
+    result_lines, line_is_safe = lines.lines, lines.line_is_safe
+    
+    with stage("decoy includes"):
+        random_includes = [
+            "#include <cstdio>",
+            "#include <cstdlib>",
+            "#include <cstring>",
+            "#include <cmath>",
+            "#include <ctime>",
+            "#include <iostream>",
+            "#include <vector>",
+            "#include <map>",
+            "#include <algorithm>"
+        ]
         
-        result_lines.append(line)
+        insert_pos = 0
+        for i, line in enumerate(result_lines):
+            if line.strip().startswith('#include'):
+                insert_pos = i + 1
+            elif line.strip() and not line.strip().startswith('//') and not line.strip().startswith('/*'):
+                break
         
-        if '=' in line and '==' not in line and '!=' not in line and '<=' not in line and '>=' not in line:
-            if not stripped.startswith(('//', '/*', '#')):
-                indent = len(original_line) - len(original_line.lstrip())
-                dummy_vars = [
-                    f"{' ' * indent}int {generate_random_variable_name()} = 0;",
-                    f"{' ' * indent}int {generate_random_variable_name()} = 42;",
-                    f"{' ' * indent}void* {generate_random_variable_name()} = NULL;"
-                ]
-                result_lines.append(random.choice(dummy_vars))
-    
-    random_includes = [
-        "#include <cstdio>",
-        "#include <cstdlib>",
-        "#include <cstring>",
-        "#include <cmath>",
-        "#include <ctime>",
-        "#include <iostream>",
-        "#include <vector>",
-        "#include <map>",
-        "#include <algorithm>"
-    ]
-    
-    insert_pos = 0
-    for i, line in enumerate(result_lines):
-        if line.strip().startswith('#include'):
-            insert_pos = i + 1
-        elif line.strip() and not line.strip().startswith('//') and not line.strip().startswith('/*'):
-            break
-    
-    for _ in range(random.randint(2, 3)):
-        include = random.choice(random_includes)
-        if include not in result_lines[:insert_pos]:
-            result_lines.insert(insert_pos, include)
-            insert_pos += 1
-    
-    final_lines = []
-    for line in result_lines:
-        final_lines.append(line)
-        if random.random() < 0.15 and line.strip() and not line.strip().startswith('//'):
-            indent = len(line) - len(line.lstrip())
-            comments = [
-                f"{' ' * indent}// {generate_random_variable_name()}",
-                f"{' ' * indent}// TODO: {generate_random_variable_name()}",
-                f"{' ' * indent}/* {generate_random_variable_name()} */"
-            ]
-            final_lines.append(random.choice(comments))
+        include_rng = decoys.at("include")
+        for _ in range(include_rng.randint(2, 3)):
+            include = include_rng.choice(random_includes)
+            if include not in result_lines[:insert_pos]:
+                result_lines.insert(insert_pos, include)
+                line_is_safe.insert(insert_pos, True)
+                insert_pos += 1
+    
+    with stage("comments"):
+        final_lines = []
+        for line, safe in zip(result_lines, line_is_safe):
+            final_lines.append(line)
+            comment_rng = decoys.at("comment", line)
+            if comment_rng.random() < 0.15 and safe and line.strip() and not line.strip().startswith('//'):
+                indent = len(line) - len(line.lstrip())
+                final_lines.append(' ' * indent + comment_rng.choice(DECOY_COMMENTS).format(decoys.name(comment_rng)))
     
     return '\n'.join(final_lines)
 
 
-def shittify_javascript_typescript(code: str) -> str:
+def shittify_javascript_typescript(code: str, rng: random.Random = None, names: NameTable = None,
+                                   decoy_key: str = None) -> str:
     """
     Obfuscate JavaScript/TypeScript code by renaming identifiers and adding dummy code.
     
+    The source is tokenized once with iter_javascript_tokens, which understands
+    template literals (including nested substitutions), regex literals and
+    multi-line comments, so the cost stays linear even for single-line bundles.
+    
     @param code: JavaScript/TypeScript source code as a string
+    @param rng: Random generator for names and decoys. None uses the global random module
+    @param names: Table that receives the identifier mapping. None uses a fresh table
+    @param decoy_key: Key to derive each decoy from the line it follows (see src.utils.decoy_source()),
+                      or None to draw decoys from rng in sequence
     @return: Obfuscated JavaScript/TypeScript source code as a string
     """
-    lines = code.splitlines()
-    identifier_map = {}
+    rng = rng or random
+    code = normalize_newlines(code)
+    names = names if names is not None else NameTable()
     imported_modules = set()
+    project_imports = set()
     
     builtin_keywords = {
         'let', 'const', 'var', 'function', 'class', 'return', 'if', 'else', 'for', 'while',
@@ -162,18 +190,25 @@ def shittify_javascript_typescript(code: str) -> str:
         'timeLog', 'profile', 'profileEnd', 'timeStamp', 'memory'
     }
     
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith('import'):
-            import_match = re.search(r'import\s+(?:\*\s+as\s+)?(\w+)|import\s*\{([^}]+)\}|const\s+(\w+)\s*=\s*require', stripped)
-            if import_match:
-                if import_match.group(1):
-                    imported_modules.add(import_match.group(1))
-                elif import_match.group(2):
-                    for name in import_match.group(2).split(','):
-                        imported_modules.add(name.strip().split(' as ')[0].strip())
-                elif import_match.group(3):
-                    imported_modules.add(import_match.group(3))
+    global_names = {'console', 'document', 'window', 'navigator', 'location', 'require'}
+    pool = NamePool(rng, taken=names.is_taken, reserved=builtin_keywords)
+    decoys = decoy_source(pool, decoy_key)
+    
+    for import_match in JS_IMPORT_PATTERN.finditer(code):
+        default_name, named_imports, required_name, required_names = import_match.groups()
+        source_match = JS_IMPORT_SOURCE_PATTERN.match(code, import_match.end())
+        from_project = source_match is not None and source_match.group(2).startswith(('./', '../'))
+        for name in (default_name, required_name):
+            if name:
+                imported_modules.add(name)
+                if from_project:
+                    project_imports.add(name)
+        for group in (named_imports, required_names):
+            if group:
+                for name in group.split(','):
+                    name = name.strip().split(' as ')[0].split(':')[0].strip()
+                    if name and not (from_project and names.shared(name)):
+                        imported_modules.add(name)
     
     def get_random_name(original: str) -> str:
         """
@@ -182,148 +217,121 @@ def shittify_javascript_typescript(code: str) -> str:
         @param original: Original identifier name
         @return: Random name or original if preserved
         """
-        if original in builtin_keywords or original.startswith('__') or original in imported_modules:
+        if (original in builtin_keywords or original.startswith('__') or original == '$' or
+                original in imported_modules or original in global_names):
             return original
-        if original not in identifier_map:
-            identifier_map[original] = generate_random_variable_name()
-        return identifier_map[original]
-    
-    identifier_pattern = r'\b[a-zA-Z_$][a-zA-Z0-9_$]*\b'
-    
-    result_lines = []
-    
-    for line in lines:
-        original_line = line
-        stripped = line.strip()
-        
-        if stripped.startswith('//') or stripped.startswith('/*') or stripped.startswith('*'):
-            result_lines.append(line)
-            continue
-        
-        template_string_pattern = r'`([^`]*)`'
-        template_strings = {}
-        template_counter = [0]
-        
-        def process_template_string(match) -> str:
-            """
-            Process template string and rename variables inside expressions.
-            
-            @param match: Regex match object for template string
-            @return: Placeholder string
-            """
-            template_content = match.group(0)
-            expr_pattern = r'\$\{([^}]+)\}'
-            processed_template = template_content
-            for expr_match in re.finditer(expr_pattern, template_content):
-                expr = expr_match.group(1)
-                expr_words = re.findall(identifier_pattern, expr)
-                for word in expr_words:
-                    if (word not in builtin_keywords and 
-                        not word.startswith('__') and 
-                        word != '$' and
-                        word not in builtin_methods):
-                        new_name = get_random_name(word)
-                        expr = re.sub(r'\b' + re.escape(word) + r'\b', new_name, expr)
-                processed_template = processed_template.replace(expr_match.group(0), f"${{{expr}}}")
-            placeholder = f"__TEMPLATE_{template_counter[0]}__"
-            template_strings[placeholder] = processed_template
-            template_counter[0] += 1
-            return placeholder
-        
-        line = re.sub(template_string_pattern, process_template_string, line)
-        
-        string_pattern = r'"[^"]*"|\'[^\']*\''
-        strings = {}
-        string_counter = 0
-        for match in re.finditer(string_pattern, line):
-            placeholder = f"__STRING_{string_counter}__"
-            strings[placeholder] = match.group(0)
-            line = line[:match.start()] + placeholder + line[match.end():]
-            string_counter += 1
-        
-        method_call_pattern = r'([a-zA-Z_$][a-zA-Z0-9_$]*)\s*\.\s*([a-zA-Z_$][a-zA-Z0-9_$]*)'
-        protected_attributes = set()
-        protected_modules = set()
-        protected_globals = set()
-        for match in re.finditer(method_call_pattern, line):
-            module_name = match.group(1)
-            method_name = match.group(2)
-            if module_name in imported_modules:
-                protected_attributes.add(method_name)
-                protected_modules.add(module_name)
-            elif method_name in builtin_methods:
-                protected_attributes.add(method_name)
-                protected_globals.add(module_name)
-            elif module_name in ['console', 'document', 'window', 'navigator', 'location']:
-                protected_attributes.add(method_name)
-                protected_globals.add(module_name)
-        
-        words = re.findall(identifier_pattern, line)
-        for word in words:
-            if (word not in builtin_keywords and 
-                not word.startswith('__') and 
-                word != '$' and 
-                word not in strings.values() and
-                word not in protected_attributes and
-                word not in protected_modules and
-                word not in protected_globals and
-                not word.startswith('__TEMPLATE_') and
-                not word.startswith('__STRING_')):
-                new_name = get_random_name(word)
-                line = re.sub(r'\b' + re.escape(word) + r'\b', new_name, line)
-        
-        for placeholder, template_string in template_strings.items():
-            line = line.replace(placeholder, template_string)
-        
-        for placeholder, string_literal in strings.items():
-            line = line.replace(placeholder, string_literal)
-        
-        result_lines.append(line)
-        
-        if '=' in line and '==' not in line and '!=' not in line and '<=' not in line and '>=' not in line:
-            if not stripped.startswith(('//', '/*', '*', 'import', 'export')):
-                indent = len(original_line) - len(original_line.lstrip())
-                dummy_vars = [
-                    f"{' ' * indent}const {generate_random_variable_name()} = 0;",
-                    f"{' ' * indent}let {generate_random_variable_name()} = null;",
-                    f"{' ' * indent}var {generate_random_variable_name()} = undefined;",
-                    f"{' ' * indent}let {generate_random_variable_name()} = {{}};"
-                ]
-                result_lines.append(random.choice(dummy_vars))
-    
-    if not any('import' in line or 'export' in line for line in result_lines[:10]):
-        random_imports = [
-            "import * as _ from 'lodash';",
-            "import { random } from 'math';",
-            "const _ = require('underscore');"
-        ]
-        result_lines.insert(0, random.choice(random_imports))
-    
-    final_lines = []
-    for line in result_lines:
-        final_lines.append(line)
-        if random.random() < 0.15 and line.strip() and not line.strip().startswith('//'):
-            indent = len(line) - len(line.lstrip())
-            comments = [
-                f"{' ' * indent}// {generate_random_variable_name()}",
-                f"{' ' * indent}// TODO: {generate_random_variable_name()}",
-                f"{' ' * indent}/* {generate_random_variable_name()} */"
+        if original not in names:
+            names.assign(original, pool.take())
+        return names.get(original)
+    
+    lines = LineAssembler(JS_COMPARISON_OPERATORS)
+    previous_kind = None
+    previous_text = None
+    member_object = None
+    
+    with stage("lex+rename"):
+        for kind, text in iter_javascript_tokens(code):
+            if kind == 'identifier':
+                if previous_text in ('.', '?.') and (
+                        (member_object in imported_modules and
+                         not (member_object in project_imports and names.shared(text))) or
+                        member_object in global_names or
+                        text in builtin_methods):
+                    lines.append_token(text)
+                else:
+                    lines.append_token(get_random_name(text), text)
+            elif kind == 'newline':
+                first_token = lines.first_token
+                if lines.end_line() and first_token not in ('import', 'export'):
+                    line = lines.lines[-1]
+                    indent = len(line) - len(line.lstrip())
+                    decoy_rng = decoys.at("declaration", line)
+                    declaration = decoy_rng.choice(JS_DUMMY_DECLARATIONS).format(decoys.name(decoy_rng))
+                    lines.add_line(' ' * indent + declaration)
+                continue
+            elif kind in ('space', 'line_comment'):
+                lines.append(text)
+                continue
+            elif kind == 'block_comment':
+                lines.append_multiline(text, significant=False)
+                continue
+            else:
+                lines.append_multiline(text)
+            if text in ('.', '?.'):
+                member_object = previous_text if previous_kind == 'identifier' else None
+            previous_kind, previous_text = kind, text
+        lines.finish()
+    result_lines, line_is_safe = lines.lines, lines.line_is_safe
+    
+    with stage("decoy imports"):
+        if not any('import' in line or 'export' in line for line in result_lines[:10]):
+            random_imports = [
+                "import * as _ from 'lodash';",
+                "import { random } from 'math';",
+                "const _ = require('underscore');"
             ]
-            final_lines.append(random.choice(comments))
+            result_lines.insert(0, decoys.at("import").choice(random_imports))
+            line_is_safe.insert(0, True)
+    
+    with stage("comments"):
+        final_lines = []
+        for line, safe in zip(result_lines, line_is_safe):
+            final_lines.append(line)
+            comment_rng = decoys.at("comment", line)
+            if comment_rng.random() < 0.15 and safe and line.strip() and not line.strip().startswith('//'):
+                indent = len(line) - len(line.lstrip())
+                final_lines.append(' ' * indent + comment_rng.choice(DECOY_COMMENTS).format(decoys.name(comment_rng)))
     
     return '\n'.join(final_lines)
 
 
-def shittify_go(code: str) -> str:
+def go_package_name(import_path: str) -> str:
+    """
+    Derive the package name a Go import path is referred to by, ignoring version suffixes.
+    
+    @param import_path: Import path without quotes, e.g. "github.com/x/yaml/v2"
+    @return: Package name, e.g. "yaml"
+    """
+    elements = [element for element in import_path.split('/') if element]
+    if not elements:
+        return import_path
+    name = elements[-1]
+    if GO_MAJOR_VERSION_PATTERN.match(name) and len(elements) > 1:
+        name = elements[-2]
+    return name.split('.')[0]
+
+
+def _go_ends_statement(token: str) -> bool:
+    """
+    Apply Go's semicolon insertion rule to the last token of a line.
+    
+    @param token: Last significant token on the line
+    @return: True if a statement ends after this token
+    """
+    return token in ('++', '--') or token[-1].isalnum() or token[-1] in '_"\'`)]}'
+
+
+def shittify_go(code: str, rng: random.Random = None, names: NameTable = None, decoy_key: str = None) -> str:
     """
     Obfuscate Go code by renaming identifiers and adding dummy code.
     
+    The source is lexed once with GO_TOKEN_PATTERN. Import declarations, including
+    grouped "import ( ... )" blocks, are recognised during the same traversal;
+    Go requires them before any other declaration, so every package name is known
+    before it is used.
+    
     @param code: Go source code as a string
+    @param rng: Random generator for names and decoys. None uses the global random module
+    @param names: Table that receives the identifier mapping. None uses a fresh table
+    @param decoy_key: Key to derive each decoy from the line it follows (see src.utils.decoy_source()),
+                      or None to draw decoys from rng in sequence
     @return: Obfuscated Go source code as a string
     """
-    lines = code.splitlines()
-    identifier_map = {}
+    rng = rng or random
+    code = normalize_newlines(code)
+    names = names if names is not None else NameTable()
     imported_packages = set()
+    project_packages = set()
     
     builtin_keywords = {
         'package', 'import', 'func', 'var', 'const', 'type', 'struct', 'interface',
@@ -333,20 +341,8 @@ def shittify_go(code: str) -> str:
         'int', 'int8', 'int16', 'int32', 'int64', 'uint', 'uint8', 'uint16', 'uint32',
         'uint64', 'float32', 'float64', 'string', 'bool', 'byte', 'rune', 'error', 'main'
     }
-    
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith('import'):
-            import_match = re.search(r'import\s+(?:\.\s+)?(?:"([^"]+)"|(\w+)\s+"[^"]+"|(\w+))', stripped)
-            if import_match:
-                if import_match.group(1):
-                    pkg_path = import_match.group(1)
-                    pkg_name = pkg_path.split('/')[-1]
-                    imported_packages.add(pkg_name)
-                elif import_match.group(2):
-                    imported_packages.add(import_match.group(2))
-                elif import_match.group(3):
-                    imported_packages.add(import_match.group(3))
+    pool = NamePool(rng, taken=names.is_taken, reserved=builtin_keywords)
+    decoys = decoy_source(pool, decoy_key)
     
     def get_random_name(original: str) -> str:
         """
@@ -357,98 +353,105 @@ def shittify_go(code: str) -> str:
         """
         if original in builtin_keywords or original.startswith('__') or original in imported_packages:
             return original
-        if original not in identifier_map:
-            identifier_map[original] = generate_random_variable_name()
-        return identifier_map[original]
-    
-    identifier_pattern = r'\b[a-zA-Z_][a-zA-Z0-9_]*\b'
-    
-    result_lines = []
-    
-    for line in lines:
-        original_line = line
-        stripped = line.strip()
-        
-        if stripped.startswith('//') or stripped.startswith('/*'):
-            result_lines.append(line)
-            continue
-        
-        string_pattern = r'`[^`]*`|"[^"]*"|\'[^\']*\''
-        strings = {}
-        string_counter = 0
-        for match in re.finditer(string_pattern, line):
-            placeholder = f"__STRING_{string_counter}__"
-            strings[placeholder] = match.group(0)
-            line = line[:match.start()] + placeholder + line[match.end():]
-            string_counter += 1
-        
-        method_call_pattern = r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\.\s*([A-Z][a-zA-Z0-9_]*)'
-        protected_methods = set()
-        protected_packages = set()
-        for match in re.finditer(method_call_pattern, line):
-            pkg_name = match.group(1)
-            method_name = match.group(2)
-            if pkg_name in imported_packages:
-                protected_methods.add(method_name)
-                protected_packages.add(pkg_name)
-        
-        words = re.findall(identifier_pattern, line)
-        for word in words:
-            if (word not in builtin_keywords and 
-                not word.startswith('__') and 
-                word not in strings.values() and
-                word not in protected_methods and
-                word not in protected_packages):
-                new_name = get_random_name(word)
-                line = re.sub(r'\b' + re.escape(word) + r'\b', new_name, line)
-        
-        for placeholder, string_literal in strings.items():
-            line = line.replace(placeholder, string_literal)
+        if original not in names:
+            names.assign(original, pool.take())
+        return names.get(original)
+    
+    lines = LineAssembler(GO_COMPARISON_OPERATORS, ends_statement=_go_ends_statement)
+    import_state = None
+    import_alias = None
+    imports_end = None
+    package_end = None
+    previous_kind = None
+    previous_text = None
+    member_object = None
+    
+    with stage("lex+rename"):
+        for kind, text in iter_tokens(code, GO_TOKEN_PATTERN):
+            if kind == 'newline':
+                first_token = lines.first_token
+                if lines.end_line() and first_token not in ('package', 'import'):
+                    line = lines.lines[-1]
+                    indent = line[:len(line) - len(line.lstrip())]
+                    decoy_rng = decoys.at("declaration", line)
+                    lines.add_line(indent + decoy_rng.choice(GO_DUMMY_DECLARATIONS).format(decoys.name(decoy_rng)))
+                continue
+            if kind == 'space' or kind == 'line_comment':
+                lines.append(text)
+                continue
+            if kind == 'block_comment':
+                lines.append_multiline(text, significant=False)
+                continue
+            
+            if import_state is not None:
+                if kind == 'string' or kind == 'raw_string':
+                    package_name = go_package_name(text[1:-1])
+                    bound_name = package_name if import_alias is None else import_alias
+                    if bound_name not in ('.', '_'):
+                        imported_packages.add(bound_name)
+                        if names.is_project_module(package_name):
+                            project_packages.add(bound_name)
+                    import_alias = None
+                    if import_state == 'single':
+                        import_state = None
+                        imports_end = len(lines.lines) + 1
+                elif text == '(' and import_state == 'single':
+                    import_state = 'group'
+                elif text == ')' and import_state == 'group':
+                    import_state = None
+                    imports_end = len(lines.lines) + 1
+                elif kind == 'identifier' or text == '.':
+                    import_alias = text
+                lines.append_multiline(text)
+            elif kind == 'identifier':
+                if text == 'import' and lines.nesting == 0:
+                    import_state = 'single'
+                    lines.append_token(text)
+                elif text == 'package' and package_end is None:
+                    package_end = len(lines.lines) + 1
+                    lines.append_token(text)
+                elif (previous_text == '.' and member_object in imported_packages and text[:1].isupper() and
+                      not (member_object in project_packages and names.shared(text))):
+                    lines.append_token(text)
+                else:
+                    lines.append_token(get_random_name(text), text)
+            else:
+                lines.append_multiline(text)
+            
+            if text == '.':
+                member_object = previous_text if previous_kind == 'identifier' else None
+            previous_kind, previous_text = kind, text
+        lines.finish()
+    result_lines, line_is_safe = lines.lines, lines.line_is_safe
+    
+    with stage("decoy imports"):
+        insert_pos = imports_end or package_end or 0
         
-        result_lines.append(line)
+        random_imports = [
+            'import "fmt"',
+            'import "os"',
+            'import "time"',
+            'import "math"',
+            'import "strings"',
+            'import "strconv"'
+        ]
         
-        if ':=' in line or ('=' in line and '==' not in line and '!=' not in line):
-            if not stripped.startswith(('//', '/*', 'package', 'import')):
-                indent = len(original_line) - len(original_line.lstrip())
-                dummy_vars = [
-                    f"{' ' * indent}var {generate_random_variable_name()} = 0",
-                    f"{' ' * indent}var {generate_random_variable_name()} = nil",
-                    f"{' ' * indent}{generate_random_variable_name()} := 42"
-                ]
-                result_lines.append(random.choice(dummy_vars))
-    
-    insert_pos = 0
-    for i, line in enumerate(result_lines):
-        if line.strip().startswith('import'):
-            insert_pos = i + 1
-        elif line.strip() and not line.strip().startswith('//') and not line.strip().startswith('package'):
-            break
-    
-    random_imports = [
-        'import "fmt"',
-        'import "os"',
-        'import "time"',
-        'import "math"',
-        'import "strings"',
-        'import "strconv"'
-    ]
-    
-    for _ in range(random.randint(1, 2)):
-        imp = random.choice(random_imports)
-        if imp not in result_lines[:insert_pos]:
-            result_lines.insert(insert_pos, imp)
-            insert_pos += 1
-    
-    final_lines = []
-    for line in result_lines:
-        final_lines.append(line)
-        if random.random() < 0.15 and line.strip() and not line.strip().startswith('//'):
-            indent = len(line) - len(line.lstrip())
-            comments = [
-                f"{' ' * indent}// {generate_random_variable_name()}",
-                f"{' ' * indent}// TODO: {generate_random_variable_name()}"
-            ]
-            final_lines.append(random.choice(comments))
+        import_rng = decoys.at("import")
+        for _ in range(import_rng.randint(1, 2)):
+            imp = import_rng.choice(random_imports)
+            if imp not in result_lines[:insert_pos]:
+                result_lines.insert(insert_pos, imp)
+                line_is_safe.insert(insert_pos, True)
+                insert_pos += 1
+    
+    with stage("comments"):
+        final_lines = []
+        for line, safe in zip(result_lines, line_is_safe):
+            final_lines.append(line)
+            comment_rng = decoys.at("comment", line)
+            if comment_rng.random() < 0.15 and safe and line.strip() and not line.strip().startswith('//'):
+                indent = line[:len(line) - len(line.lstrip())]
+                final_lines.append(indent + comment_rng.choice(GO_COMMENTS).format(decoys.name(comment_rng)))
     
     return '\n'.join(final_lines)
 
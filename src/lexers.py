@@ -0,0 +1,281 @@
+import re
+
+
+C_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<directive>^[ \t]*\#(?:[^\n\\]|\\[\s\S])*)
+    | (?P<newline>\n)
+    | (?P<space>[ \t\f\v]+)
+    | (?P<line_comment>//[^\n]*)
+    | (?P<block_comment>/\*[\s\S]*?(?:\*/|\Z))
+    | (?P<raw_string>(?:u8|[uUL])?R"(?P<delimiter>[^()\\\s]{0,16})\([\s\S]*?\)(?P=delimiter)")
+    | (?P<string>(?:u8|[uUL])?"(?:[^"\\\n]|\\[\s\S])*"?)
+    | (?P<char>(?:u8|[uUL])?'(?:[^'\\\n]|\\[\s\S])*'?)
+    | (?P<number>\.?\d(?:[eEpP][+-]|[\w.'])*)
+    | (?P<identifier>[A-Za-z_]\w*)
+    | (?P<operator>>>=|<<=|->\*|\.\.\.|::|->|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^]=|\#\#)
+    | (?P<punct>[\s\S])
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+
+def normalize_newlines(code: str) -> str:
+    """
+    Convert CRLF and lone CR line endings to LF.
+    
+    @param code: Source code string
+    @return: Source code with LF line endings
+    """
+    if "\r" not in code:
+        return code
+    return code.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def iter_tokens(code: str, pattern: re.Pattern = C_TOKEN_PATTERN):
+    """
+    Split source code into (kind, text) tokens in a single left-to-right scan.
+    
+    The pattern must match every character, so concatenating the texts gives back
+    the input exactly. Kinds are the names of the pattern's outer groups.
+    
+    @param code: Source code string with LF line endings
+    @param pattern: Compiled token pattern with one named group per token kind
+    @return: Generator of (kind, text) tuples
+    """
+    for match in pattern.finditer(code):
+        yield match.lastgroup, match.group()
+
+
+JS_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<newline>\n)
+    | (?P<space>[ \t\f\v ﻿]+)
+    | (?P<line_comment>//[^\n]*)
+    | (?P<block_comment>/\*[\s\S]*?(?:\*/|\Z))
+    | (?P<string>"(?:[^"\\\n]|\\[\s\S])*"?|'(?:[^'\\\n]|\\[\s\S])*'?)
+    | (?P<number>\.?\d(?:[eE][+-]|[\w.])*)
+    | (?P<identifier>[A-Za-z_$][\w$]*)
+    | (?P<operator>>>>=|===|!==|\*\*=|\.\.\.|<<=|>>=|>>>|\?\?=|&&=|\|\|=|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\+\+|--|<<|>>|\*\*|[-+*/%&|^]=)
+    | (?P<punct>[\s\S])
+    """,
+    re.VERBOSE,
+)
+
+JS_TEMPLATE_CHUNK_PATTERN = re.compile(r"(?:[^`\\$]|\\[\s\S]|\$(?!\{))*(?:`|\$\{|\Z)")
+
+JS_REGEX_PATTERN = re.compile(r"/(?![*/])(?:[^/\\\[\n]|\\[^\n]|\[(?:[^\]\\\n]|\\[^\n])*\])+/[A-Za-z]*")
+
+JS_REGEX_PRECEDING_KEYWORDS = frozenset({
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await',
+})
+
+
+def iter_javascript_tokens(code: str):
+    """
+    Split JavaScript/TypeScript into (kind, text) tokens in a single left-to-right scan.
+    
+    Template literals are emitted as 'template' chunks: the text from a backtick or
+    the closing brace of a substitution up to the next '${' or closing backtick.
+    Substitution expressions between chunks are tokenized normally, so nested
+    templates work. A '/' starts a 'regex' token when the previous significant
+    token cannot end an expression.
+    
+    @param code: Source code string with LF line endings
+    @return: Generator of (kind, text) tuples
+    """
+    pos = 0
+    end = len(code)
+    brace_stack = []
+    previous_kind = None
+    previous_text = None
+
+    if code.startswith('#!'):
+        pos = code.find('\n')
+        if pos < 0:
+            pos = end
+        yield 'line_comment', code[:pos]
+
+    while pos < end:
+        char = code[pos]
+        if char == '`' or (char == '}' and brace_stack and brace_stack[-1] == 'template'):
+            if char == '}':
+                brace_stack.pop()
+            match = JS_TEMPLATE_CHUNK_PATTERN.match(code, pos + 1)
+            kind, text = 'template', char + match.group()
+            if text.endswith('${'):
+                brace_stack.append('template')
+                previous_kind, previous_text = 'punct', '{'
+            else:
+                previous_kind, previous_text = kind, text
+            pos = match.end()
+            yield kind, text
+            continue
+
+        if char == '/' and previous_text != '<' and (
+                previous_kind is None
+                or (previous_kind in ('punct', 'operator') and previous_text not in (')', ']'))
+                or (previous_kind == 'identifier' and previous_text in JS_REGEX_PRECEDING_KEYWORDS)):
+            match = JS_REGEX_PATTERN.match(code, pos)
+            if match:
+                kind, text = 'regex', match.group()
+                previous_kind, previous_text = kind, text
+                pos = match.end()
+                yield kind, text
+                continue
+
+        match = JS_TOKEN_PATTERN.match(code, pos)
+        kind, text = match.lastgroup, match.group()
+        pos = match.end()
+        if kind == 'punct':
+            if text == '{':
+                brace_stack.append('brace')
+            elif text == '}' and brace_stack:
+                brace_stack.pop()
+        if kind not in ('space', 'newline', 'line_comment', 'block_comment'):
+            previous_kind, previous_text = kind, text
+        yield kind, text
+
+
+GO_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<newline>\n)
+    | (?P<space>[ \t\f\v]+)
+    | (?P<line_comment>//[^\n]*)
+    | (?P<block_comment>/\*[\s\S]*?(?:\*/|\Z))
+    | (?P<raw_string>`[^`]*`?)
+    | (?P<string>"(?:[^"\\\n]|\\[^\n])*"?)
+    | (?P<rune>'(?:[^'\\\n]|\\[^\n])*'?)
+    | (?P<number>\.?\d(?:[eEpP][+-]|[\w.])*)
+    | (?P<identifier>[^\W\d]\w*)
+    | (?P<operator>&\^=|<<=|>>=|\.\.\.|&&|\|\||<-|\+\+|--|==|!=|<=|>=|:=|<<|>>|&\^|[-+*/%&|^]=)
+    | (?P<punct>[\s\S])
+    """,
+    re.VERBOSE,
+)
+
+
+class LineAssembler:
+    """
+    Collect output tokens into lines and track the facts decoy insertion relies on.
+    
+    A line is "safe" when it does not end inside a multi-line comment, literal or
+    preprocessor continuation, so text can be inserted after it without changing
+    the meaning of the code.
+    """
+
+    def __init__(self, comparison_operators: frozenset, ends_statement=None):
+        """
+        Initialize an empty assembler.
+        
+        @param comparison_operators: Operators ending in '=' that are comparisons, not assignments
+        @param ends_statement: Callable telling whether a line's last token completes a statement.
+                               None means the token must be ';'
+        @return: None
+        """
+        self.comparison_operators = comparison_operators
+        self.ends_statement = ends_statement or (lambda token: token == ';')
+        self.lines = []
+        self.line_is_safe = []
+        self.parts = []
+        self.nesting = 0
+        self._reset_line()
+
+    def _reset_line(self) -> None:
+        """
+        Clear the per-line facts.
+        
+        @return: None
+        """
+        self.parts = []
+        self.has_assignment = False
+        self.has_comparison = False
+        self.first_token = None
+        self.last_token = None
+
+    def append(self, text: str) -> None:
+        """
+        Append text that carries no meaning for decoy insertion (spaces, comments).
+        
+        @param text: Text without newlines
+        @return: None
+        """
+        self.parts.append(text)
+
+    def append_token(self, text: str, source_text: str = None) -> None:
+        """
+        Append a significant token such as an identifier, literal or operator.
+        
+        @param text: Text to emit (possibly a renamed identifier)
+        @param source_text: Original token text, if different from text
+        @return: None
+        """
+        source_text = source_text or text
+        if source_text in self.comparison_operators:
+            self.has_comparison = True
+        elif source_text.endswith('=') and not source_text[0].isalnum():
+            self.has_assignment = True
+        elif source_text in ('(', '['):
+            self.nesting += 1
+        elif source_text in (')', ']'):
+            self.nesting = max(0, self.nesting - 1)
+        if self.first_token is None:
+            self.first_token = source_text
+        self.last_token = source_text
+        self.parts.append(text)
+
+    def append_multiline(self, text: str, significant: bool = True) -> None:
+        """
+        Append a token that may span lines; every line it leaves open is marked unsafe.
+        
+        @param text: Token text, possibly containing newlines
+        @param significant: Whether the token counts as the last token of its final line
+        @return: None
+        """
+        if '\n' in text:
+            pieces = text.split('\n')
+            self.parts.append(pieces[0])
+            self.end_line(safe=False)
+            for piece in pieces[1:-1]:
+                self.lines.append(piece)
+                self.line_is_safe.append(False)
+            text = pieces[-1]
+        if significant:
+            self.append_token(text)
+        else:
+            self.append(text)
+
+    def end_line(self, safe: bool = True) -> bool:
+        """
+        Finish the current line.
+        
+        @param safe: False if the line ends inside a multi-line token
+        @return: True if the line is a complete assignment statement outside any brackets
+        """
+        line = ''.join(self.parts)
+        self.lines.append(line)
+        self.line_is_safe.append(safe)
+        is_assignment = (safe and self.has_assignment and not self.has_comparison and self.nesting == 0
+                         and self.last_token is not None and self.ends_statement(self.last_token))
+        self._reset_line()
+        return is_assignment
+
+    def add_line(self, line: str) -> None:
+        """
+        Add a complete generated line (dummy code) after the current one.
+        
+        @param line: Generated line
+        @return: None
+        """
+        self.lines.append(line)
+        self.line_is_safe.append(True)
+
+    def finish(self) -> None:
+        """
+        Flush the last line if the source did not end with a newline.
+        
+        @return: None
+        """
+        if self.parts:
+            self.end_line()
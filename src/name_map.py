@@ -0,0 +1,192 @@
+import os
+import secrets
+
+from src.name_table import NameTable
+from src.symbol_index import SymbolIndex, open_symbol_index, shared_name, write_symbol_index
+
+
+# Entry holding the salt new names are derived from; "meta" is not a language family.
+SALT_KEY = ("meta", "salt")
+
+# Names derived in this process that are not in the loaded map yet.
+_additions = {}
+
+
+def create_name_map(path: str, seed=None) -> bool:
+    """
+    Create an empty name-map file unless one exists.
+    
+    @param path: Name-map file
+    @param seed: Run seed used as the salt. None draws a random salt, which is kept in the file
+    @return: True if the file was created
+    """
+    if os.path.exists(path):
+        return False
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    salt = secrets.token_hex(16) if seed is None else str(seed)
+    write_symbol_index(path, {SALT_KEY: salt})
+    return True
+
+
+def name_map_salt(path: str) -> str:
+    """
+    Read the salt of a name-map file.
+    
+    @param path: Name-map file
+    @return: Salt new names are derived from
+    """
+    index = SymbolIndex(path)
+    try:
+        return index.get(*SALT_KEY)
+    finally:
+        index.close()
+
+
+def take_additions() -> dict:
+    """
+    Return and forget the names derived in this process for identifiers missing from the map.
+    
+    @return: Dict of (family, identifier) to name
+    """
+    additions = dict(_additions)
+    _additions.clear()
+    return additions
+
+
+def add_additions(additions: dict) -> None:
+    """
+    Merge names derived in a worker process into this process's additions.
+    
+    @param additions: Dict returned by take_additions() in the worker
+    @return: None
+    """
+    _additions.update(additions)
+
+
+def update_name_map(path: str, additions: dict) -> int:
+    """
+    Add newly derived names to a name-map file.
+    
+    The file is only rewritten when there is something to add, so its digest
+    (part of the result cache key) stays the same between runs that introduce
+    no new identifiers. After a rewrite, the indexes mapped by open_symbol_index()
+    are dropped: they still map the replaced file, which --watch would keep using.
+    
+    @param path: Name-map file
+    @param additions: Dict of (family, identifier) to name
+    @return: Number of entries added
+    """
+    index = SymbolIndex(path)
+    try:
+        entries = dict(index.items())
+    finally:
+        index.close()
+    added = {key: name for key, name in additions.items() if key not in entries}
+    if added:
+        entries.update(added)
+        entries.update(((f"{family}-taken", name), "") for (family, _), name in added.items())
+        write_symbol_index(path, entries)
+        open_symbol_index.cache_clear()
+    return len(added)
+
+
+class NameMapTable(NameTable):
+    """
+    Name table that reuses the names of a persisted name map (--name-map).
+    
+    Identifiers missing from the map get a name derived from the map's salt
+    and the identifier alone, never from the file's random generator, so every
+    file and every worker agrees on it. Decoys do not use the file's generator
+    either when a name map is given: each is derived from the line it follows
+    (see src.utils.KeyedDecoySource), so an edit only changes the decoys of the
+    edited lines. Derived names are recorded for take_additions().
+    """
+
+    def __init__(self, name_map: SymbolIndex, family: str, index: SymbolIndex = None):
+        """
+        Initialize an empty table backed by a name map.
+        
+        @param name_map: Loaded name-map file
+        @param family: Language family of the file, from src.symbol_index.LANGUAGE_FAMILIES
+        @param index: Project symbol index, or None outside project mode
+        @return: None
+        """
+        super().__init__()
+        self.name_map = name_map
+        self.family = family
+        self.index = index
+        self.salt = name_map.get(*SALT_KEY)
+
+    def __contains__(self, original_name: str) -> bool:
+        """
+        Check whether an original identifier has a name. Every identifier has one.
+        
+        @param original_name: Original identifier
+        @return: True
+        """
+        return self.get(original_name) is not None
+
+    def get(self, original_name: str, default: str = None) -> str:
+        """
+        Return the name of an identifier, recording it as an addition if the map does not have it.
+        
+        Module and package names pinned by the project index keep their own name;
+        otherwise the map wins over the project index, which wins over a derived name.
+        
+        @param original_name: Original identifier
+        @param default: Unused; every identifier has a name
+        @return: Obfuscated name
+        """
+        new_name = self.forward.get(original_name)
+        if new_name is not None:
+            return new_name
+        shared = self.index.get(self.family, original_name) if self.index is not None else None
+        if shared == original_name:
+            return self.assign(original_name, shared)
+        new_name = self.name_map.get(self.family, original_name)
+        if new_name is None:
+            new_name = shared
+            if new_name is None:
+                new_name = shared_name(self.salt, self.family, original_name, taken=self.is_taken)
+            _additions[(self.family, original_name)] = new_name
+        return self.assign(original_name, new_name)
+
+    def shared(self, original_name: str) -> bool:
+        """
+        Check whether an identifier has a project-wide name.
+        
+        @param original_name: Original identifier
+        @return: True if the project index names the identifier
+        """
+        return self.index is not None and self.index.get(self.family, original_name) is not None
+
+    def is_project_module(self, module_name: str) -> bool:
+        """
+        Check whether a module or package is one of the project's own.
+        
+        @param module_name: Python module name or Go package name
+        @return: True if the project pre-scan found it
+        """
+        return self.index is not None and self.index.get(f"{self.family}-module", module_name) is not None
+
+    def is_project_parameter(self, name: str) -> bool:
+        """
+        Check whether a name is a parameter of a function defined anywhere in the project.
+        
+        @param name: Keyword argument name
+        @return: True if the project pre-scan found such a parameter
+        """
+        return self.index is not None and self.index.get(f"{self.family}-parameter", name) is not None
+
+    def is_taken(self, name: str) -> bool:
+        """
+        Check whether a new name would clash with a name used in this file, the name map or the project.
+        
+        @param name: Candidate obfuscated name
+        @return: True if the name is in use
+        """
+        if name in self.reverse or self.name_map.get(f"{self.family}-taken", name) is not None:
+            return True
+        return self.index is not None and self.index.get(f"{self.family}-taken", name) is not None
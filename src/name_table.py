@@ -0,0 +1,175 @@
+import ast
+import builtins
+import keyword
+
+
+BUILTIN_IDENTIFIERS = frozenset(dir(builtins)) | frozenset({
+    'print', 'len', 'range', 'str', 'int', 'float', 'list', 'dict', 'tuple', 'set',
+    'bool', 'type', 'isinstance', 'hasattr', 'getattr', 'setattr', 'delattr',
+    'callable', 'iter', 'next', 'enumerate', 'zip', 'map', 'filter', 'sorted',
+    'reversed', 'sum', 'max', 'min', 'abs', 'round', 'divmod', 'pow', 'all', 'any',
+    'bin', 'hex', 'oct', 'ord', 'chr', 'ascii', 'repr', 'eval', 'exec', 'compile',
+    'open', 'input', 'exit', 'quit'
+})
+
+# Names a generated Python identifier must never be.
+PYTHON_RESERVED_WORDS = BUILTIN_IDENTIFIERS | frozenset(keyword.kwlist) | frozenset(keyword.softkwlist)
+
+STDLIB_MODULES = frozenset({
+    'math', 'os', 'sys', 'random', 'time', 'collections', 'functools', 'string', 'json', 're',
+    'datetime', 'itertools', 'operator', 'heapq', 'bisect', 'array', 'copy', 'pickle', 'sqlite3',
+    'csv', 'xml', 'html', 'urllib', 'http', 'socket', 'ssl', 'email', 'base64', 'hashlib', 'hmac',
+    'secrets', 'zlib', 'gzip', 'bz2', 'lzma', 'shutil', 'glob', 'fnmatch', 'linecache', 'shlex',
+    'configparser', 'argparse', 'getopt', 'logging', 'warnings', 'traceback', 'pdb', 'profile',
+    'pstats', 'timeit', 'doctest', 'unittest', 'test', 'lib2to3', 'typing', 'dataclasses', 'enum',
+    'numbers', 'decimal', 'fractions', 'statistics', 'cmath', 'collections.abc', 'weakref', 'types',
+    'pprint', 'reprlib', 'unicodedata', 'stringprep', 'readline', 'rlcompleter'
+})
+
+BUILTIN_METHODS = frozenset({
+    'append', 'extend', 'insert', 'remove', 'pop', 'clear', 'index', 'count', 'sort', 'reverse',
+    'copy', 'keys', 'values', 'items', 'get', 'setdefault', 'popitem', 'update', 'join', 'split',
+    'strip', 'replace', 'find', 'startswith', 'endswith', 'upper', 'lower', 'capitalize', 'title',
+    'swapcase', 'isalnum', 'isalpha', 'isdigit', 'islower', 'isupper', 'isspace', 'istitle',
+    'ljust', 'rjust', 'center', 'zfill', 'expandtabs', 'translate', 'partition', 'rpartition',
+    'rsplit', 'splitlines', 'format', 'format_map'
+})
+
+
+def is_reserved_name(name: str) -> bool:
+    """
+    Check whether an identifier must keep its name wherever it appears.
+    
+    Builtins, common container/string method names and dunder names are shared
+    with code outside the file, so renaming them would break the program.
+    
+    @param name: Identifier to check
+    @return: True if the identifier must not be renamed
+    """
+    return name in BUILTIN_IDENTIFIERS or name in BUILTIN_METHODS or name.startswith("__")
+
+
+def parameter_names(tree: ast.AST) -> frozenset:
+    """
+    Collect the names of every parameter defined in a module.
+    
+    Keyword arguments at call sites are only renamed when they match one of these,
+    so calls into builtins and libraries (print(end=...), sorted(key=...)) keep working.
+    
+    @param tree: Parsed module
+    @return: Frozenset of parameter names
+    """
+    return frozenset(node.arg for node in ast.walk(tree) if isinstance(node, ast.arg))
+
+
+class NameTable:
+    """
+    Bidirectional mapping between original identifiers and their obfuscated names.
+    
+    Both directions are dicts, so forward lookups, "is this already an obfuscated
+    name?" checks and reverse lookups are all O(1) regardless of table size.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty table.
+        
+        @return: None
+        """
+        self.forward = {}
+        self.reverse = {}
+
+    def __len__(self) -> int:
+        """
+        Return the number of mapped identifiers.
+        
+        @return: Number of entries
+        """
+        return len(self.forward)
+
+    def __contains__(self, original_name: str) -> bool:
+        """
+        Check whether an original identifier already has an obfuscated name.
+        
+        @param original_name: Original identifier
+        @return: True if mapped
+        """
+        return original_name in self.forward
+
+    def get(self, original_name: str, default: str = None) -> str:
+        """
+        Return the obfuscated name for an original identifier.
+        
+        @param original_name: Original identifier
+        @param default: Value returned when the identifier is not mapped
+        @return: Obfuscated name or default
+        """
+        return self.forward.get(original_name, default)
+
+    def assign(self, original_name: str, new_name: str) -> str:
+        """
+        Record a mapping from original_name to new_name in both directions.
+        
+        @param original_name: Original identifier
+        @param new_name: Obfuscated name
+        @return: new_name
+        """
+        self.forward[original_name] = new_name
+        self.reverse[new_name] = original_name
+        return new_name
+
+    def is_generated(self, name: str) -> bool:
+        """
+        Check whether a name is one of the obfuscated names handed out by this table.
+        
+        @param name: Identifier to check
+        @return: True if name was produced by the table
+        """
+        return name in self.reverse
+
+    def is_taken(self, name: str) -> bool:
+        """
+        Check whether a new name would clash with a name already in use (see src.utils.NamePool).
+        
+        @param name: Candidate obfuscated name
+        @return: True if this table, or a project index or name map behind it, uses the name
+        """
+        return name in self.reverse
+
+    def original_of(self, new_name: str) -> str:
+        """
+        Return the original identifier an obfuscated name was created for.
+        
+        @param new_name: Obfuscated name
+        @return: Original identifier, or None if new_name is not generated
+        """
+        return self.reverse.get(new_name)
+
+    def shared(self, original_name: str) -> bool:
+        """
+        Check whether an identifier has a project-wide name that every file must use.
+        
+        Plain tables name each file on its own; see src.symbol_index.ProjectNameTable.
+        
+        @param original_name: Original identifier
+        @return: True if the identifier's name is fixed by a project symbol index
+        """
+        return False
+
+    def is_project_module(self, module_name: str) -> bool:
+        """
+        Check whether a module or package is part of the project being obfuscated.
+        
+        @param module_name: Python module name or Go package name
+        @return: True if names imported from it are renamed like the project's own
+        """
+        return False
+
+    def is_project_parameter(self, name: str) -> bool:
+        """
+        Check whether a name is a parameter of a function defined in another file of the project.
+        
+        @param name: Keyword argument name
+        @return: True if keyword arguments with this name are renamed at call sites
+        """
+        return False
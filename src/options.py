@@ -0,0 +1,148 @@
+from src.utils import make_file_rng
+
+
+PYTHON_ENGINES = ("libcst", "ast")
+
+# perf-neutral keeps only the Python transforms that cost nothing at run time:
+# code that may run more than once only gets decoys the compiler removes.
+TRANSFORM_PROFILES = ("default", "perf-neutral")
+
+
+class ObfuscationOptions:
+    """
+    Settings that influence obfuscation output, shared by every file in a run.
+    """
+
+    def __init__(self, seed=None, engine: str = None, transform_profile: str = "default",
+                 symbol_index: str = None, name_map: str = None):
+        """
+        Initialize obfuscation options.
+        
+        @param seed: Run seed for deterministic output, or None for fresh randomness on every run
+        @param engine: Python engine, 'libcst' or 'ast'. None picks libcst when it is installed
+        @param transform_profile: Python transform profile from TRANSFORM_PROFILES
+        @param symbol_index: Path of a project symbol index (see src.symbol_index), or None to name each file on its own
+        @param name_map: Path of a name-map file (see src.name_map) to take identifier names from, or None
+        @return: None
+        """
+        self.seed = seed
+        self.engine = engine
+        self.transform_profile = transform_profile
+        self.symbol_index = symbol_index
+        self.name_map = name_map
+
+    def python_engine(self) -> str:
+        """
+        Resolve the Python engine used for this run.
+        
+        @return: 'libcst' or 'ast'
+        """
+        if self.engine is not None:
+            return self.engine
+        from src.transformer import default_engine
+        return default_engine()
+
+    def run_seed(self):
+        """
+        Resolve the seed file generators are derived from.
+        
+        Without a seed, a name map's salt is used, so that decoys stay put across
+        runs just like the names do (see decoy_key()).
+        
+        @return: Seed, name-map salt, or None for fresh randomness
+        """
+        if self.seed is not None or self.name_map is None:
+            return self.seed
+        from src.name_map import SALT_KEY
+        from src.symbol_index import open_symbol_index
+        return open_symbol_index(self.name_map).get(*SALT_KEY)
+
+    def rng_for(self, rng_key: str):
+        """
+        Create the random generator for one file.
+        
+        @param rng_key: Stable identifier of the file, normally its path relative to the processed root
+        @return: random.Random instance
+        """
+        return make_file_rng(self.run_seed(), rng_key)
+
+    def decoy_key(self, rng_key: str) -> str:
+        """
+        Return the key the decoys of one file are anchored with, when they must survive edits.
+        
+        With a name map, identifier names stay the same when the input is edited,
+        so decoys are derived from the code they follow instead of drawn from the
+        file's generator in sequence (see src.utils.KeyedDecoySource).
+        
+        @param rng_key: Stable identifier of the file
+        @return: Key, or None to draw decoys in sequence
+        """
+        if self.name_map is None:
+            return None
+        return f"{self.run_seed()}\0{rng_key}"
+
+    def name_table(self, language: str):
+        """
+        Create the name table for one file.
+        
+        @param language: Language of the file
+        @return: NameMapTable with a name map, ProjectNameTable with only a symbol index, or a plain NameTable
+        """
+        if self.symbol_index is None and self.name_map is None:
+            from src.name_table import NameTable
+            return NameTable()
+        from src.symbol_index import LANGUAGE_FAMILIES, ProjectNameTable, open_symbol_index
+        index = open_symbol_index(self.symbol_index) if self.symbol_index is not None else None
+        if self.name_map is None:
+            return ProjectNameTable(index, LANGUAGE_FAMILIES[language])
+        from src.name_map import NameMapTable
+        return NameMapTable(open_symbol_index(self.name_map), LANGUAGE_FAMILIES[language], index)
+
+    def cache_config(self, rng_key: str, language: str = None) -> dict:
+        """
+        Describe the options that affect the output of one file, for use in cache keys.
+        
+        @param rng_key: Stable identifier of the file
+        @param language: Language of the file; the engine choice only matters for 'python'
+        @return: JSON-serialisable dict
+        """
+        config = {}
+        seed = self.run_seed()
+        if seed is not None:
+            config.update(seed=str(seed), path=rng_key)
+        if self.symbol_index is not None:
+            from src.symbol_index import open_symbol_index
+            config["symbol_index"] = open_symbol_index(self.symbol_index).digest
+        if self.name_map is not None:
+            from src.symbol_index import open_symbol_index
+            config["name_map"] = open_symbol_index(self.name_map).digest
+        if language == "python":
+            config["engine"] = self.python_engine()
+            if self.transform_profile != "default":
+                config["transform_profile"] = self.transform_profile
+        return config
+
+
+PASSTHROUGH_MODES = ("copy", "hardlink", "reflink", "skip")
+
+
+class WalkOptions:
+    """
+    Settings that decide which files of a directory are processed and how the others are mirrored.
+    """
+
+    def __init__(self, exclude=(), use_ignore_files: bool = True, max_file_size: int = None,
+                 passthrough: str = "copy"):
+        """
+        Initialize walk options.
+        
+        @param exclude: Extra gitignore-style patterns, relative to the processed directory
+        @param use_ignore_files: Honour .gitignore and .shittierignore files and skip VCS directories
+        @param max_file_size: Files larger than this many bytes are left out, or None for no limit
+        @param passthrough: How files that are not obfuscated reach the output, from PASSTHROUGH_MODES
+        @return: None
+        """
+        self.exclude = tuple(exclude)
+        self.use_ignore_files = use_ignore_files
+        self.max_file_size = max_file_size
+        self.passthrough = passthrough
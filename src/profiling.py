@@ -0,0 +1,299 @@
+import contextlib
+import os
+import sys
+import time
+
+
+# Stage recording is off unless enable() is called, and stage() is then close to
+# free, so the engines can stay instrumented permanently.
+_mode = None
+_current = None
+_records = []
+
+
+class FileProfile:
+    """
+    Wall time and allocations per pipeline stage for one file.
+    
+    Stages are recorded in the order they first ran. blocks is the net change in
+    allocated memory blocks (sys.getallocatedblocks) and peak_bytes the highest
+    traced memory during the stage, which is only known in "memory" mode.
+    """
+
+    def __init__(self, path: str, language: str, rng_key: str = None, options=None):
+        """
+        Initialize an empty profile.
+        
+        @param path: File path or name shown in reports
+        @param language: Language name
+        @param rng_key: Identifier the file's RNG was derived from, for re-running it
+        @param options: ObfuscationOptions the file was obfuscated with, for re-running it
+        @return: None
+        """
+        self.path = path
+        self.language = language
+        self.rng_key = rng_key
+        self.options = options
+        self.stages = {}
+        self.total = 0.0
+
+    def add(self, name: str, seconds: float, blocks: int, peak_bytes: int = None) -> None:
+        """
+        Add one run of a stage.
+        
+        @param name: Stage name
+        @param seconds: Wall time
+        @param blocks: Net allocated blocks
+        @param peak_bytes: Peak traced memory, or None
+        @return: None
+        """
+        entry = self.stages.setdefault(name, [0.0, 0, None])
+        entry[0] += seconds
+        entry[1] += blocks
+        if peak_bytes is not None:
+            entry[2] = max(entry[2] or 0, peak_bytes)
+
+    def other_seconds(self) -> float:
+        """
+        Return the time not covered by any stage (cache lookups, dispatch, ...).
+        
+        @return: Seconds
+        """
+        return max(0.0, self.total - sum(entry[0] for entry in self.stages.values()))
+
+
+def enable(mode: str = "time") -> None:
+    """
+    Turn stage recording on in this process.
+    
+    @param mode: "time" for wall time and allocated blocks, "memory" to also trace
+                 peak memory per stage with tracemalloc (slower, so times are inflated)
+    @return: None
+    """
+    global _mode
+    _mode = mode
+    if mode == "memory":
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def current_mode() -> str:
+    """
+    Return the recording mode, to enable the same mode in worker processes.
+    
+    @return: "time", "memory", or None if recording is off
+    """
+    return _mode
+
+
+@contextlib.contextmanager
+def profile_file(path: str, language: str, rng_key: str = None, options=None):
+    """
+    Record the stages run inside the block as one file's profile.
+    
+    Does nothing when recording is off. Finished profiles are kept until take_records().
+    
+    @param path: File path or name shown in reports
+    @param language: Language name
+    @param rng_key: Identifier the file's RNG was derived from
+    @param options: ObfuscationOptions the file is obfuscated with
+    @return: Context manager
+    """
+    global _current
+    if _mode is None:
+        yield
+        return
+    previous = _current
+    _current = FileProfile(path, language, rng_key, options)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current.total = time.perf_counter() - start
+        _records.append(_current)
+        _current = previous
+
+
+class _Stage:
+    """
+    Context manager that times one stage and adds it to a FileProfile.
+    """
+
+    def __init__(self, profile: FileProfile, name: str):
+        """
+        Initialize the stage.
+        
+        @param profile: Profile of the file being processed
+        @param name: Stage name
+        @return: None
+        """
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        """
+        Take the starting measurements.
+        
+        @return: None
+        """
+        self.tracing = _mode == "memory"
+        if self.tracing:
+            import tracemalloc
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> bool:
+        """
+        Record the stage, also when it raised.
+        
+        @return: False, so exceptions propagate
+        """
+        seconds = time.perf_counter() - self.start
+        blocks = sys.getallocatedblocks() - self.blocks
+        peak = None
+        if self.tracing:
+            import tracemalloc
+            peak = tracemalloc.get_traced_memory()[1] - self.base
+        self.profile.add(self.name, seconds, blocks, peak)
+        return False
+
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+def stage(name: str):
+    """
+    Time one pipeline stage of the file being profiled.
+    
+    When no file is being profiled this returns a shared no-op context manager,
+    so instrumented code pays a function call and nothing else.
+    
+    @param name: Stage name, e.g. "parse" or "transform"
+    @return: Context manager
+    """
+    profile = _current
+    if profile is None:
+        return _NO_STAGE
+    return _Stage(profile, name)
+
+
+def take_records() -> list:
+    """
+    Return and forget the profiles finished in this process.
+    
+    @return: List of FileProfile
+    """
+    records = list(_records)
+    _records.clear()
+    return records
+
+
+def add_records(records: list) -> None:
+    """
+    Keep profiles recorded in another process (a pool worker) for the report.
+    
+    @param records: List of FileProfile
+    @return: None
+    """
+    _records.extend(records)
+
+
+def _format_bytes(size: int) -> str:
+    """
+    Format a byte count for the report.
+    
+    @param size: Bytes
+    @return: Human-readable size
+    """
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def format_file_breakdown(records: list) -> list:
+    """
+    Render one line per file: total time, then every stage.
+    
+    @param records: List of FileProfile
+    @return: List of lines
+    """
+    lines = []
+    for record in records:
+        parts = [f"{name} {entry[0] * 1000:.2f}" for name, entry in record.stages.items()]
+        parts.append(f"other {record.other_seconds() * 1000:.2f}")
+        lines.append(f"{record.total * 1000:9.2f} ms  {record.path} [{record.language}]: " + ", ".join(parts))
+    return lines
+
+
+def format_summary(records: list) -> list:
+    """
+    Render the aggregate table: time, share and allocations per language and stage.
+    
+    @param records: List of FileProfile
+    @return: List of lines
+    """
+    by_language = {}
+    for record in records:
+        summary = by_language.setdefault(record.language, {"files": 0, "total": 0.0, "stages": {}})
+        summary["files"] += 1
+        summary["total"] += record.total
+        stages = list(record.stages.items()) + [("other", [record.other_seconds(), 0, None])]
+        for name, (seconds, blocks, peak) in stages:
+            entry = summary["stages"].setdefault(name, [0.0, 0, None])
+            entry[0] += seconds
+            entry[1] += blocks
+            if peak is not None:
+                entry[2] = max(entry[2] or 0, peak)
+
+    show_peak = any(record.stages and any(entry[2] is not None for entry in record.stages.values())
+                    for record in records)
+    header = f"{'language':12} {'stage':14} {'total s':>9} {'ms/file':>9} {'share':>7} {'net blocks':>11}"
+    if show_peak:
+        header += f" {'peak':>10}"
+    lines = [header, "-" * len(header)]
+    for language in sorted(by_language, key=str):
+        summary = by_language[language]
+        total = summary["total"] or 1e-12
+        for name, (seconds, blocks, peak) in sorted(summary["stages"].items(), key=lambda item: -item[1][0]):
+            line = (f"{str(language):12} {name:14} {seconds:9.3f} {seconds * 1000 / summary['files']:9.2f} "
+                    f"{seconds / total:7.1%} {blocks:11d}")
+            if show_peak:
+                line += f" {_format_bytes(peak) if peak is not None else '-':>10}"
+            lines.append(line)
+        lines.append(f"{str(language):12} {'(all)':14} {summary['total']:9.3f} "
+                     f"{summary['total'] * 1000 / summary['files']:9.2f} {'':7} {summary['files']:>6} files")
+    return lines
+
+
+def dump_slowest(records: list, count: int, dump_dir: str, rerun) -> list:
+    """
+    Re-run the slowest files under cProfile and write one pstats file each.
+    
+    @param records: List of FileProfile
+    @param count: Number of files
+    @param dump_dir: Directory for the .prof files
+    @param rerun: Callable (FileProfile) -> None that obfuscates the file again, or
+                  raises if the file cannot be re-run (e.g. stdin)
+    @return: List of (FileProfile, written path) pairs
+    """
+    import cProfile
+
+    os.makedirs(dump_dir, exist_ok=True)
+    written = []
+    slowest = sorted(records, key=lambda record: record.total, reverse=True)[:count]
+    for rank, record in enumerate(slowest, 1):
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(rerun, record)
+        except Exception:
+            continue
+        name = os.path.basename(record.path.replace(":", "_")) or "input"
+        dump_path = os.path.join(dump_dir, f"{rank:02d}-{name}.prof")
+        profiler.dump_stats(dump_path)
+        written.append((record, dump_path))
+    return written
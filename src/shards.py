@@ -0,0 +1,196 @@
+import filecmp
+import hashlib
+import heapq
+import json
+import os
+import re
+
+from src.utils import stable_name_hash
+from src.walker import passthrough_file
+
+
+# Written to the root of each directory's mirror in a shard run; --merge-shards reads it and leaves it out.
+SHARD_REPORT_NAME = ".shittier-shard.json"
+
+# Fixed cost of a file in the size balance, so thousands of tiny files are not treated as free.
+FILE_OVERHEAD_BYTES = 4096
+
+
+def parse_shard(text: str) -> tuple:
+    """
+    Parse a shard specification such as 2/8.
+    
+    @param text: I/N with 1 <= I <= N
+    @return: Tuple of (shard number, shard count)
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", text)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"Invalid shard: {text}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def passthrough_shard(rng_key: str, count: int) -> int:
+    """
+    Return the shard that passes through a file that is not obfuscated.
+    
+    Copies are cheap, so they are spread by a stable hash of the path rather than by size.
+    
+    @param rng_key: Path of the file relative to the processed directory, with forward slashes
+    @param count: Shard count
+    @return: Shard number, 1-based
+    """
+    return stable_name_hash(rng_key) % count + 1
+
+
+def assign_shards(weights: dict, count: int) -> dict:
+    """
+    Split files into size-balanced shards.
+    
+    Files are taken largest first and each goes to the currently lightest shard
+    (ties broken by path and shard number), so every machine that sees the same
+    tree computes the same split.
+    
+    @param weights: Dict of rng key to weight in bytes
+    @param count: Shard count
+    @return: Dict of rng key to shard number, 1-based
+    """
+    loads = [(0, shard) for shard in range(1, count + 1)]
+    assignment = {}
+    for rng_key in sorted(weights, key=lambda key: (-weights[key], key)):
+        load, shard = heapq.heappop(loads)
+        assignment[rng_key] = shard
+        heapq.heappush(loads, (load + weights[rng_key], shard))
+    return assignment
+
+
+def select_shard(tasks: list, shard: tuple) -> tuple:
+    """
+    Keep the obfuscation tasks of one shard.
+    
+    @param tasks: (input path, output path, rng key) triples of every file of the directory
+    @param shard: Tuple of (shard number, shard count)
+    @return: Tuple of (tasks of the shard, digest of the whole split, bytes of the shard)
+    """
+    number, count = shard
+    weights = {}
+    for src_path, _, rng_key in tasks:
+        try:
+            weights[rng_key] = os.path.getsize(src_path) + FILE_OVERHEAD_BYTES
+        except OSError:
+            weights[rng_key] = FILE_OVERHEAD_BYTES
+    assignment = assign_shards(weights, count)
+    plan = hashlib.sha256(f"{count}\n".encode("utf-8"))
+    for rng_key in sorted(weights):
+        plan.update(f"{rng_key}\t{weights[rng_key]}\n".encode("utf-8", "surrogateescape"))
+    selected = [task for task in tasks if assignment[task[2]] == number]
+    return selected, plan.hexdigest(), sum(weights[rng_key] for _, _, rng_key in selected)
+
+
+def write_shard_report(output_dir: str, report: dict) -> str:
+    """
+    Write the run report of a shard to the root of its output directory.
+    
+    @param output_dir: Output directory of the shard
+    @param report: JSON-serializable report
+    @return: Path of the report
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, SHARD_REPORT_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def read_shard_report(shard_dir: str) -> dict:
+    """
+    Read the run report of a shard output directory.
+    
+    @param shard_dir: Output directory of one --shard run
+    @return: Report written by write_shard_report()
+    """
+    try:
+        with open(os.path.join(shard_dir, SHARD_REPORT_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Not a shard output directory: {shard_dir} ({e})") from e
+
+
+def merge_shards(shard_roots: list, output_dir: str, mode: str = "copy") -> dict:
+    """
+    Combine the output trees of all shards of a run into one tree.
+    
+    Each shard root is what one --shard run wrote: its --output-dir, or the
+    shittified_<dirname> mirror itself. Every mirror below a root carries a
+    shard report; for each mirror, the reports must come from the same split
+    (same tree and shard count) and cover every shard exactly once. Files
+    present in several shards, such as directories every shard creates, must
+    be identical. Nothing is written before the reports have been checked.
+    
+    @param shard_roots: Output roots of the --shard runs
+    @param output_dir: Directory to merge into; paths below each root are kept
+    @param mode: How files reach output_dir, from PASSTHROUGH_MODES except skip
+    @return: Combined report
+    """
+    files = []
+    reports = {}
+    for shard_root in shard_roots:
+        if not os.path.isdir(shard_root):
+            raise ValueError(f"Not a directory: {shard_root}")
+        found = False
+        for root, dirs, names in os.walk(shard_root):
+            dirs.sort()
+            relative_root = os.path.relpath(root, shard_root)
+            files.append((relative_root, None))
+            for name in sorted(names):
+                if name == SHARD_REPORT_NAME:
+                    reports.setdefault(relative_root, []).append((shard_root, read_shard_report(root)))
+                    found = True
+                else:
+                    files.append((os.path.normpath(os.path.join(relative_root, name)), os.path.join(root, name)))
+        if not found:
+            raise ValueError(f"No shard report ({SHARD_REPORT_NAME}) below {shard_root}")
+
+    count = None
+    for mirror, mirror_reports in sorted(reports.items()):
+        plan = mirror_reports[0][1]["plan"]
+        for shard_root, report in mirror_reports:
+            count = report["shards"] if count is None else count
+            if report["shards"] != count or report["plan"] != plan:
+                raise ValueError(f"Shard {shard_root} comes from a different split of {mirror}")
+        numbers = sorted(report["shard"] for _, report in mirror_reports)
+        if numbers != list(range(1, count + 1)):
+            missing = sorted(set(range(1, count + 1)) - set(numbers))
+            duplicates = sorted({number for number in numbers if numbers.count(number) > 1})
+            raise ValueError(f"Incomplete set of {count} shards for {mirror}: "
+                             f"missing {missing}, duplicated {duplicates}")
+
+    sources = {}
+    for relative_path, src_path in files:
+        dst_path = os.path.normpath(os.path.join(output_dir, relative_path))
+        if src_path is None:
+            os.makedirs(dst_path, exist_ok=True)
+        elif relative_path in sources:
+            if not filecmp.cmp(sources[relative_path], src_path, shallow=False):
+                raise ValueError(f"Shards disagree on {relative_path}")
+        else:
+            sources[relative_path] = src_path
+            passthrough_file(src_path, dst_path, mode)
+
+    merged = {"shards": count, "plans": {}, "files": [], "failed": [], "per_shard": []}
+    per_shard = {number: {"shard": number, "files": 0, "bytes": 0, "seconds": 0.0} for number in range(1, count + 1)}
+    for mirror, mirror_reports in sorted(reports.items()):
+        prefix = "" if mirror == os.curdir else mirror.replace(os.sep, "/") + "/"
+        merged["plans"][prefix.rstrip("/") or "."] = mirror_reports[0][1]["plan"]
+        for _, report in mirror_reports:
+            merged["files"].extend(prefix + path for path in report["files"])
+            merged["failed"].extend(prefix + path for path in report["failed"])
+            totals = per_shard[report["shard"]]
+            totals["files"] += len(report["files"])
+            totals["bytes"] += report["bytes"]
+            totals["seconds"] = round(totals["seconds"] + report["seconds"], 3)
+    merged["files"].sort()
+    merged["failed"].sort()
+    merged["per_shard"] = [per_shard[number] for number in range(1, count + 1)]
+    merged["seconds"] = max(totals["seconds"] for totals in merged["per_shard"])
+    return merged
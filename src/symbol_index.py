@@ -0,0 +1,434 @@
+import ast
+import functools
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+
+from src.lexers import C_TOKEN_PATTERN, GO_TOKEN_PATTERN, iter_javascript_tokens, iter_tokens
+from src.name_table import NameTable, is_reserved_name, parameter_names
+from src.utils import NamePool, make_file_rng, stable_name_hash
+
+
+# Files share names with the other files of their family: C headers are
+# included by C++ sources, and TypeScript imports JavaScript modules.
+LANGUAGE_FAMILIES = {
+    'python': 'python',
+    'c': 'c',
+    'cpp': 'c',
+    'javascript': 'javascript',
+    'typescript': 'javascript',
+    'go': 'go',
+}
+
+INDEX_MAGIC = b"SHSYMIX1"
+INDEX_HEADER = struct.Struct("<8sI16s")
+INDEX_OFFSET = struct.Struct("<I")
+
+# Index files opened per process. Bounded so a long-running daemon does not keep
+# the indexes of finished runs mapped.
+OPEN_INDEXES = 8
+
+
+def module_names(rng_key: str) -> set:
+    """
+    Return every name a Python file may be imported by, relative to any directory above it.
+    
+    @param rng_key: Path of the file relative to the project root, with '/' separators
+    @return: Set of dotted module and package names, e.g. {'pkg.util', 'util', 'pkg'} for pkg/util.py
+    """
+    parts = rng_key[:-len(".py")].split("/") if rng_key.endswith(".py") else rng_key.split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    names = set()
+    for end in range(1, len(parts) + 1):
+        for start in range(end):
+            names.add(".".join(parts[start:end]))
+    return names
+
+
+def python_identifiers(tree: ast.AST) -> set:
+    """
+    Collect the identifiers of a Python module that the Python engines may rename.
+    
+    @param tree: Parsed module
+    @return: Set of identifiers
+    """
+    identifiers = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            identifiers.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            identifiers.add(node.attr)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            identifiers.add(node.name)
+        elif isinstance(node, ast.arg):
+            identifiers.add(node.arg)
+        elif isinstance(node, ast.keyword) and node.arg:
+            identifiers.add(node.arg)
+        elif isinstance(node, ast.alias):
+            identifiers.update(node.name.split("."))
+            if node.asname:
+                identifiers.add(node.asname)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            identifiers.update(node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            identifiers.add(node.name)
+    return {name for name in identifiers if not is_reserved_name(name)}
+
+
+def scan_file(task: tuple) -> tuple:
+    """
+    Pre-scan one file: collect its identifiers, the module names it defines and its parameter names.
+    
+    @param task: (path, rng key) pair; the rng key is the path relative to the project root
+    @return: (family, identifiers, markers) triple, where markers holds ('module', name) and
+             ('parameter', name) pairs, or None for unsupported or unreadable files
+    """
+    from src.api import get_file_language
+
+    path, rng_key = task
+    family = LANGUAGE_FAMILIES.get(get_file_language(path))
+    if family is None:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            source_code = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+    markers = set()
+    if family == 'python':
+        try:
+            tree = ast.parse(source_code)
+        except (SyntaxError, ValueError):
+            tree = ast.Module(body=[], type_ignores=[])
+        identifiers = python_identifiers(tree)
+        markers.update(('module', name) for name in module_names(rng_key))
+        markers.update(('parameter', name) for name in parameter_names(tree))
+    elif family == 'javascript':
+        identifiers = {text for kind, text in iter_javascript_tokens(source_code) if kind == 'identifier'}
+    else:
+        pattern = GO_TOKEN_PATTERN if family == 'go' else C_TOKEN_PATTERN
+        identifiers = set()
+        previous_text = None
+        for kind, text in iter_tokens(source_code, pattern):
+            if kind != 'identifier':
+                if kind not in ('space', 'newline', 'line_comment', 'block_comment'):
+                    previous_text = text
+                continue
+            identifiers.add(text)
+            if family == 'go' and previous_text == 'package':
+                markers.add(('module', text))
+            previous_text = text
+    return family, frozenset(identifiers), frozenset(markers)
+
+
+def shared_name(seed, family: str, original_name: str, taken=None) -> str:
+    """
+    Derive the project-wide name of an identifier from the run seed and the identifier alone.
+    
+    The name is drawn from a NamePool whose generator is keyed by the identifier
+    rather than by a file, so every worker derives the same name without
+    coordination, and the same identifier keeps its name when other identifiers
+    come and go. Candidates that clash are skipped by the pool.
+    
+    @param seed: Run seed, never None (unseeded runs draw one per project)
+    @param family: Language family from LANGUAGE_FAMILIES
+    @param original_name: Original identifier
+    @param taken: Optional callable name -> bool for names already given to other identifiers
+    @return: Obfuscated name in the style of the family's backend
+    """
+    pool = NamePool(make_file_rng(seed, f"symbol\0{family}\0{original_name}"), taken=taken, batch=1)
+    if family == 'python':
+        return pool.take(str(stable_name_hash(original_name) % 1000))
+    return pool.take()
+
+
+def collect_symbols(scans, seed) -> dict:
+    """
+    Merge pre-scan results into index entries.
+    
+    Identifiers found in more than one file of a family get a shared name.
+    Module and package names keep their own name wherever they appear as an
+    identifier, because file and package names are never renamed. Markers are
+    recorded as '<family>-<kind>' entries with an empty name, and every name
+    handed out as a '<family>-taken' entry, so name pools can avoid it.
+    
+    @param scans: Iterable of scan_file() results
+    @param seed: Run seed used to derive the shared names
+    @return: Dict of (family, identifier) to name
+    """
+    file_counts = {}
+    markers = set()
+    for scan in scans:
+        if scan is None:
+            continue
+        family, identifiers, file_markers = scan
+        for identifier in identifiers:
+            key = (family, identifier)
+            file_counts[key] = file_counts.get(key, 0) + 1
+        markers.update((family, kind, name) for kind, name in file_markers)
+    entries = {}
+    for family, kind, name in markers:
+        entries[(f"{family}-{kind}", name)] = ""
+        if kind != 'module':
+            continue
+        for component in name.split("."):
+            if (family, component) in file_counts:
+                entries[(family, component)] = component
+    taken = {(family, name) for (family, _), name in entries.items() if name}
+    for (family, identifier), count in sorted(file_counts.items()):
+        if count > 1 and (family, identifier) not in entries:
+            name = shared_name(seed, family, identifier, taken=lambda candidate: (family, candidate) in taken)
+            taken.add((family, name))
+            entries[(family, identifier)] = name
+    for family, name in taken:
+        entries[(f"{family}-taken", name)] = ""
+    return entries
+
+
+def write_symbol_index(path: str, entries: dict) -> str:
+    """
+    Write index entries to a file that SymbolIndex can map.
+    
+    The file holds a header (magic, entry count, digest), a table of record
+    offsets and the records "family:identifier<TAB>name<LF>" sorted by key.
+    It is written to a temporary name first and renamed into place.
+    
+    @param path: Index file to write
+    @param entries: Dict of (family, identifier) to name, see collect_symbols()
+    @return: Hex digest of the entries
+    """
+    records = sorted(
+        (f"{family}:{identifier}".encode("utf-8", "surrogatepass"), name.encode("utf-8", "surrogatepass"))
+        for (family, identifier), name in entries.items()
+    )
+    offsets = bytearray()
+    body = bytearray()
+    for key, name in records:
+        offsets += INDEX_OFFSET.pack(len(body))
+        body += key + b"\t" + name + b"\n"
+    digest = hashlib.sha256(bytes(body)).digest()[:16]
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(records), digest))
+        f.write(offsets)
+        f.write(body)
+    os.replace(temporary_path, path)
+    return digest.hex()
+
+
+def build_symbol_index(files, path: str, seed=None, jobs: int = None) -> int:
+    """
+    Pre-scan a project's files in parallel and write its symbol index (--project).
+    
+    Identifiers that occur in more than one file of the same language family
+    (a function defined in a.py and imported in b.py, a declaration in x.h used
+    in x.c) get one project-wide name, derived from the run seed and the
+    identifier alone. In the transform phase every worker maps the index file
+    read-only (see SymbolIndex), so it is shared through the page cache instead
+    of being pickled to each worker or task.
+    
+    @param files: List of (path, rng key) pairs, rng keys relative to the project root
+    @param path: Index file to write
+    @param seed: Run seed. None draws a random one, so every file of this run still agrees
+    @param jobs: Number of worker processes. None means os.cpu_count()
+    @return: Number of identifiers with a project-wide name
+    """
+    if seed is None:
+        seed = secrets.token_hex(16)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(files)))
+    if jobs == 1:
+        scans = [scan_file(task) for task in files]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            scans = list(executor.map(scan_file, files, chunksize=max(1, len(files) // (jobs * 8))))
+    entries = collect_symbols(scans, seed)
+    write_symbol_index(path, entries)
+    return sum(1 for family, _ in entries if family in LANGUAGE_FAMILIES.values())
+
+
+class SymbolIndex:
+    """
+    Read-only view of an index file written by write_symbol_index().
+    
+    The file is memory-mapped, so worker processes that open the same index
+    share its pages. Lookups are binary searches over the offset table; results
+    are remembered per process because backends ask for the same identifier
+    many times.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map an index file.
+        
+        @param path: Index file
+        @return: None
+        """
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < INDEX_HEADER.size:
+            self._map.close()
+            raise ValueError(f"Not a symbol index: {path}")
+        magic, self.count, digest = INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a symbol index: {path}")
+        self.digest = digest.hex()
+        self._records = INDEX_HEADER.size + self.count * INDEX_OFFSET.size
+        self._lookups = {}
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries.
+        
+        @return: Number of entries
+        """
+        return self.count
+
+    def get(self, family: str, identifier: str) -> str:
+        """
+        Look up the project-wide name of an identifier.
+        
+        @param family: Language family, or '<family>-module' / '<family>-parameter' for markers
+        @param identifier: Original identifier or module name
+        @return: Name ('' for module entries), or None if the index has no entry
+        """
+        lookup_key = (family, identifier)
+        if lookup_key in self._lookups:
+            return self._lookups[lookup_key]
+        key = f"{family}:{identifier}".encode("utf-8", "surrogatepass")
+        found = None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = self._records + INDEX_OFFSET.unpack_from(self._map, INDEX_HEADER.size + middle * INDEX_OFFSET.size)[0]
+            separator = self._map.find(b"\t", start)
+            current = self._map[start:separator]
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                end = self._map.find(b"\n", separator)
+                found = self._map[separator + 1:end].decode("utf-8", "surrogatepass")
+                break
+        self._lookups[lookup_key] = found
+        return found
+
+    def items(self):
+        """
+        Iterate over every entry in key order.
+        
+        @return: Generator of ((family, identifier), name) pairs
+        """
+        for position in range(self.count):
+            start = self._records + INDEX_OFFSET.unpack_from(self._map, INDEX_HEADER.size + position * INDEX_OFFSET.size)[0]
+            end = self._map.find(b"\n", start)
+            key, name = self._map[start:end].decode("utf-8", "surrogatepass").split("\t")
+            family, identifier = key.split(":", 1)
+            yield (family, identifier), name
+
+    def close(self) -> None:
+        """
+        Unmap the index file.
+        
+        @return: None
+        """
+        self._map.close()
+
+
+@functools.lru_cache(maxsize=OPEN_INDEXES)
+def open_symbol_index(path: str) -> SymbolIndex:
+    """
+    Return the process-wide SymbolIndex for an index file, mapping it on first use.
+    
+    @param path: Index file
+    @return: SymbolIndex
+    """
+    return SymbolIndex(path)
+
+
+class ProjectNameTable(NameTable):
+    """
+    Name table that takes the names of shared identifiers from a project symbol index.
+    
+    Identifiers without an index entry are named per file, as with NameTable.
+    """
+
+    def __init__(self, index: SymbolIndex, family: str):
+        """
+        Initialize an empty table backed by an index.
+        
+        @param index: Project symbol index
+        @param family: Language family of the file, from LANGUAGE_FAMILIES
+        @return: None
+        """
+        super().__init__()
+        self.index = index
+        self.family = family
+
+    def __contains__(self, original_name: str) -> bool:
+        """
+        Check whether an original identifier has a name, from this file or from the index.
+        
+        @param original_name: Original identifier
+        @return: True if mapped
+        """
+        return self.get(original_name) is not None
+
+    def get(self, original_name: str, default: str = None) -> str:
+        """
+        Return the obfuscated name for an original identifier, preferring the project-wide name.
+        
+        @param original_name: Original identifier
+        @param default: Value returned when the identifier is not mapped
+        @return: Obfuscated name or default
+        """
+        new_name = self.forward.get(original_name)
+        if new_name is None:
+            new_name = self.index.get(self.family, original_name)
+            if new_name is None:
+                return default
+            self.assign(original_name, new_name)
+        return new_name
+
+    def shared(self, original_name: str) -> bool:
+        """
+        Check whether an identifier has a project-wide name.
+        
+        @param original_name: Original identifier
+        @return: True if the index names the identifier
+        """
+        return self.index.get(self.family, original_name) is not None
+
+    def is_project_module(self, module_name: str) -> bool:
+        """
+        Check whether a module or package is one of the project's own.
+        
+        @param module_name: Python module name or Go package name
+        @return: True if the pre-scan found it in the project
+        """
+        return self.index.get(f"{self.family}-module", module_name) is not None
+
+    def is_project_parameter(self, name: str) -> bool:
+        """
+        Check whether a name is a parameter of a function defined anywhere in the project.
+        
+        @param name: Keyword argument name
+        @return: True if the pre-scan found such a parameter
+        """
+        return self.index.get(f"{self.family}-parameter", name) is not None
+
+    def is_taken(self, name: str) -> bool:
+        """
+        Check whether a new name would clash with a name used in this file or project-wide.
+        
+        @param name: Candidate obfuscated name
+        @return: True if the name is in use
+        """
+        return name in self.reverse or self.index.get(f"{self.family}-taken", name) is not None
@@ -1,41 +1,133 @@
 import ast
+import functools
+import importlib.util
 import random
 from src.utils import (
     select_random_unused_libraries,
-    generate_random_variable_name,
+    NamePool,
     add_random_spacing_to_code,
-    insert_dummy_variable_assignments,
+    decoy_source,
     generate_random_import_statements,
+    preloaded_libraries,
+    dummy_variable_assignments,
+    stable_name_hash,
 )
+from src.name_table import NameTable, BUILTIN_IDENTIFIERS, PYTHON_RESERVED_WORDS, is_reserved_name, parameter_names
+from src.profiling import stage
+from src.options import PYTHON_ENGINES, TRANSFORM_PROFILES
 
-try:
-    from src.transformer_libcst import obfuscate_code_with_libcst
-    LIBCST_AVAILABLE = True
-except ImportError:
-    LIBCST_AVAILABLE = False
+# libcst takes a few hundred milliseconds to import, so it is only located here
+# and imported the first time the libcst engine actually runs.
+LIBCST_AVAILABLE = importlib.util.find_spec("libcst") is not None
 
 
-try:
-    if isinstance(__builtins__, dict):
-        builtin_identifiers = set(__builtins__.keys())
-    else:
-        builtin_identifiers = set(dir(__builtins__))
-except:
-    builtin_identifiers = set(dir(__builtins__))
-builtin_identifiers.update(['print', 'len', 'range', 'str', 'int', 'float', 'list', 'dict', 'tuple', 'set', 'bool', 'type', 'isinstance', 'hasattr', 'getattr', 'setattr', 'delattr', 'callable', 'iter', 'next', 'enumerate', 'zip', 'map', 'filter', 'sorted', 'reversed', 'sum', 'max', 'min', 'abs', 'round', 'divmod', 'pow', 'all', 'any', 'bin', 'hex', 'oct', 'ord', 'chr', 'ascii', 'repr', 'eval', 'exec', 'compile', 'open', 'input', 'exit', 'quit'])
+builtin_identifiers = BUILTIN_IDENTIFIERS
+
+ENGINES = PYTHON_ENGINES
+
+ASSIGNMENT_NODES = (ast.Assign, ast.AugAssign, ast.AnnAssign)
+
+BLOCK_FIELDS = ("body", "orelse", "finalbody")
+
+# Nodes whose body may run more than once per import of the module, see decoy_placement().
+CONTEXT_NODES = {
+    ast.FunctionDef: "function",
+    ast.AsyncFunctionDef: "function",
+    ast.For: "loop",
+    ast.AsyncFor: "loop",
+    ast.While: "loop",
+}
+
+# CPython's compiler does not fold constant int products and powers with more bits than this.
+MAX_FOLDED_INT_BITS = 128
+
+
+@functools.lru_cache(maxsize=None)
+def dummy_assignment_statements(guarded: bool = False) -> tuple:
+    """
+    Parse the dummy assignment templates once; the nodes are only read by ast.unparse.
+    
+    @param guarded: Wrap each assignment in 'if False:', which the compiler removes
+    @return: Tuple of Assign nodes (If nodes if guarded), in template order
+    """
+    prefix = "if False:\n    " if guarded else ""
+    return tuple(ast.parse(prefix + statement).body[0] for statement in dummy_variable_assignments)
+
+
+def folds_to_constant(node: ast.BinOp) -> bool:
+    """
+    Check whether CPython's compiler folds an operation on two numeric constants.
+    
+    Operations that raise or whose int result is too large are left to run time.
+    
+    @param node: BinOp whose operands are int or float constants
+    @return: True if the compiled code only loads the result
+    """
+    left, right = node.left.value, node.right.value
+    if isinstance(node.op, (ast.Div, ast.Mod, ast.FloorDiv)) and right == 0:
+        return False
+    if isinstance(left, int) and isinstance(right, int) and left and right > 0:
+        if isinstance(node.op, ast.Pow):
+            return left.bit_length() * right <= MAX_FOLDED_INT_BITS
+        if isinstance(node.op, ast.Mult):
+            return left.bit_length() + right.bit_length() <= MAX_FOLDED_INT_BITS
+    if isinstance(node.op, ast.Pow):
+        try:
+            left ** right
+        except (OverflowError, ZeroDivisionError):
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def decoy_import_statements() -> tuple:
+    """
+    Parse the decoy import block appended to every module once.
+    
+    @return: Tuple of statement nodes
+    """
+    return tuple(ast.parse(generate_random_import_statements()).body)
+
+
+def default_engine() -> str:
+    """
+    Return the Python engine used when none is requested.
+    
+    @return: 'libcst' if libcst is installed, otherwise 'ast'
+    """
+    return "libcst" if LIBCST_AVAILABLE else "ast"
 
 
 class CodeObfuscatorAST(ast.NodeTransformer):
 
-    def __init__(self):
+    def __init__(self, rng: random.Random = None, names: NameTable = None, parameters: frozenset = frozenset(),
+                 transform_profile: str = "default", decoy_key: str = None):
         """
         Initialize the AST obfuscator with empty identifier map and imported modules set.
         
+        With the perf-neutral profile, decoy statements in function bodies are
+        guarded by 'if False:', loop bodies get none, and constant arithmetic is only
+        wrapped where the compiler folds it, so the obfuscated code runs as fast as the original.
+        
+        @param rng: Random generator for names and decoys. None uses the global random module
+        @param names: Name table to record renames in. None creates a fresh one
+        @param parameters: Parameter names defined in the module, see parameter_names()
+        @param transform_profile: Profile from TRANSFORM_PROFILES
+        @param decoy_key: Key to derive each decoy from the statement it follows (see
+                          src.utils.decoy_source()), or None to draw decoys from rng in sequence
         @return: None
         """
         super().__init__()
-        self.identifier_map = {}
+        self.rng = rng or random
+        self.names = names if names is not None else NameTable()
+        self.identifier_map = self.names.forward
+        self.pool = NamePool(self.rng, taken=self.names.is_taken, reserved=PYTHON_RESERVED_WORDS)
+        self.decoys = decoy_source(self.pool, decoy_key)
         self.imported_modules = set()
+        self.project_imports = set()
+        self.parameters = parameters
+        self.perf_neutral = transform_profile == "perf-neutral"
+        self.contexts = ["module"]
 
     def create_random_identifier(self, original_name: str) -> str:
         """
@@ -44,11 +136,85 @@ class CodeObfuscatorAST(ast.NodeTransformer):
         @param original_name: Original identifier name
         @return: Random identifier string
         """
-        if original_name not in self.identifier_map:
-            noise = generate_random_variable_name()
-            random_name = f"{noise}{hash(original_name) % 1000}"
-            self.identifier_map[original_name] = random_name
-        return self.identifier_map[original_name]
+        new_name = self.names.get(original_name)
+        if new_name is None:
+            new_name = self.names.assign(original_name, self.pool.take(suffix=str(stable_name_hash(original_name) % 1000)))
+        return new_name
+
+    def rename(self, name: str) -> str:
+        """
+        Return the obfuscated form of a defined name, leaving reserved names alone.
+        
+        @param name: Identifier from a definition, parameter or attribute
+        @return: Obfuscated or original identifier
+        """
+        if name is None or is_reserved_name(name):
+            return name
+        return self.create_random_identifier(name)
+
+    def rename_variable(self, name: str) -> str:
+        """
+        Return the obfuscated form of a variable name, following the same rules as visit_Name.
+        
+        @param name: Identifier bound by an except clause, pattern or global/nonlocal statement
+        @return: Obfuscated or original identifier
+        """
+        if name is None or name in self.imported_modules:
+            return name
+        return self.rename(name)
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        """
+        Visit children, then follow assignments in every statement list with dummy assignments.
+        
+        @param node: AST node
+        @return: The node with transformed children
+        """
+        context = CONTEXT_NODES.get(type(node))
+        if context:
+            self.contexts.append(context)
+        super().generic_visit(node)
+        for field in BLOCK_FIELDS:
+            statements = getattr(node, field, None)
+            if isinstance(statements, list) and statements and isinstance(statements[0], ast.stmt):
+                setattr(node, field, self.insert_dummy_assignments(statements))
+        if context:
+            self.contexts.pop()
+        return node
+
+    def decoy_placement(self) -> str:
+        """
+        Decide how decoy statements are added to the block being transformed.
+        
+        The default profile always adds them as they are. perf-neutral only does
+        so in code that runs once (module and class bodies), guards them with
+        'if False:' in function bodies, where the compiler leaves at most a NOP,
+        and leaves loop bodies alone.
+        
+        @return: "plain", "guarded", or None for no decoys
+        """
+        if not self.perf_neutral or self.contexts[-1] == "module":
+            return "plain"
+        return "guarded" if self.contexts[-1] == "function" else None
+
+    def insert_dummy_assignments(self, body: list) -> list:
+        """
+        Follow every assignment statement in a block with a dummy assignment.
+        
+        @param body: Statements of a block
+        @return: New list of statements
+        """
+        placement = self.decoy_placement()
+        if placement is None:
+            return body
+        new_body = []
+        dummy_statements = dummy_assignment_statements(guarded=placement == "guarded")
+        for statement in body:
+            new_body.append(statement)
+            if isinstance(statement, ASSIGNMENT_NODES) and statement.value is not None:
+                anchor = ast.unparse(statement) if self.decoys.keyed else ""
+                new_body.append(self.decoys.at("assignment", anchor).choice(dummy_statements))
+        return new_body
 
     def visit_Name(self, node: ast.Name) -> ast.Name:
         """
@@ -57,61 +223,27 @@ class CodeObfuscatorAST(ast.NodeTransformer):
         @param node: AST Name node
         @return: Modified or original Name node
         """
-        if node.id in builtin_identifiers or node.id.startswith("__") or node.id in self.imported_modules:
-            return node
-        new_id = self.create_random_identifier(node.id)
-        return ast.copy_location(ast.Name(id=new_id, ctx=node.ctx), node)
+        node.id = self.rename_variable(node.id)
+        return node
 
     def visit_Attribute(self, node: ast.Attribute) -> ast.Attribute:
         """
-        Visit Attribute nodes and rename attributes while preserving builtin methods.
+        Visit Attribute nodes and rename attributes while preserving builtin methods and module attributes.
+        
+        Attributes of the project's own modules are renamed if they have a project-wide name.
         
         @param node: AST Attribute node
         @return: Modified or original Attribute node
         """
+        base = node.value
+        while isinstance(base, ast.Attribute):
+            base = base.value
+        base_name = base.id if isinstance(base, ast.Name) else None
+        from_module = base_name in self.imported_modules
         self.generic_visit(node)
-        if node.attr.startswith("__") or node.attr in builtin_identifiers:
-            return node
-        
-        if isinstance(node.value, ast.Name):
-            if node.value.id in ['math', 'os', 'sys', 'random', 'time', 'collections', 'functools', 
-                                 'string', 'json', 're', 'datetime', 'itertools', 'operator', 
-                                 'functools', 'collections', 'heapq', 'bisect', 'array', 'copy',
-                                 'pickle', 'sqlite3', 'csv', 'xml', 'html', 'urllib', 'http',
-                                 'socket', 'ssl', 'email', 'base64', 'hashlib', 'hmac', 'secrets',
-                                 'zlib', 'gzip', 'bz2', 'lzma', 'shutil', 'glob', 'fnmatch',
-                                 'linecache', 'shlex', 'configparser', 'argparse', 'getopt',
-                                 'logging', 'warnings', 'traceback', 'pdb', 'profile', 'pstats',
-                                 'timeit', 'doctest', 'unittest', 'test', 'lib2to3', 'typing',
-                                 'dataclasses', 'enum', 'numbers', 'decimal', 'fractions', 'statistics',
-                                 'cmath', 'array', 'collections', 'collections.abc', 'heapq',
-                                 'bisect', 'weakref', 'types', 'copy', 'pprint', 'reprlib',
-                                 'enum', 'numbers', 'math', 'cmath', 'decimal', 'fractions',
-                                 'statistics', 'unicodedata', 'stringprep', 'readline', 'rlcompleter']:
-                return node
-        
-        builtin_methods = {'append', 'extend', 'insert', 'remove', 'pop', 'clear', 'index', 
-                          'count', 'sort', 'reverse', 'copy', 'keys', 'values', 'items',
-                          'get', 'setdefault', 'popitem', 'update', 'join', 'split', 'strip',
-                          'replace', 'find', 'index', 'count', 'startswith', 'endswith',
-                          'upper', 'lower', 'capitalize', 'title', 'swapcase', 'isalnum',
-                          'isalpha', 'isdigit', 'islower', 'isupper', 'isspace', 'istitle',
-                          'ljust', 'rjust', 'center', 'zfill', 'expandtabs', 'translate',
-                          'partition', 'rpartition', 'rsplit', 'splitlines', 'format', 'format_map'}
-        if node.attr in builtin_methods:
-            return node
-        
-        new_attr = self.create_random_identifier(node.attr)
-        return ast.copy_location(
-            ast.Attribute(
-                value=node.value,
-                attr=new_attr,
-                ctx=node.ctx,
-                lineno=node.lineno,
-                col_offset=node.col_offset,
-            ),
-            node,
-        )
+        if not from_module or (base_name in self.project_imports and self.names.shared(node.attr)):
+            node.attr = self.rename(node.attr)
+        return node
 
     def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.FunctionDef:
         """
@@ -120,22 +252,8 @@ class CodeObfuscatorAST(ast.NodeTransformer):
         @param node: AST FunctionDef node
         @return: Modified or original FunctionDef node
         """
-        self.generic_visit(node)
-        if node.name not in builtin_identifiers and not node.name.startswith("__"):
-            new_name = self.create_random_identifier(node.name)
-            return ast.copy_location(
-                ast.FunctionDef(
-                    name=new_name,
-                    args=node.args,
-                    body=node.body,
-                    decorator_list=node.decorator_list,
-                    returns=node.returns,
-                    lineno=node.lineno,
-                    col_offset=node.col_offset,
-                ),
-                node,
-            )
-        return node
+        node.name = self.rename(node.name)
+        return self.generic_visit(node)
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> ast.AsyncFunctionDef:
         """
@@ -144,22 +262,8 @@ class CodeObfuscatorAST(ast.NodeTransformer):
         @param node: AST AsyncFunctionDef node
         @return: Modified or original AsyncFunctionDef node
         """
-        self.generic_visit(node)
-        if node.name not in builtin_identifiers and not node.name.startswith("__"):
-            new_name = self.create_random_identifier(node.name)
-            return ast.copy_location(
-                ast.AsyncFunctionDef(
-                    name=new_name,
-                    args=node.args,
-                    body=node.body,
-                    decorator_list=node.decorator_list,
-                    returns=node.returns,
-                    lineno=node.lineno,
-                    col_offset=node.col_offset,
-                ),
-                node,
-            )
-        return node
+        node.name = self.rename(node.name)
+        return self.generic_visit(node)
 
     def visit_ClassDef(self, node: ast.ClassDef) -> ast.ClassDef:
         """
@@ -168,22 +272,8 @@ class CodeObfuscatorAST(ast.NodeTransformer):
         @param node: AST ClassDef node
         @return: Modified or original ClassDef node
         """
-        self.generic_visit(node)
-        if node.name not in builtin_identifiers and not node.name.startswith("__"):
-            new_name = self.create_random_identifier(node.name)
-            return ast.copy_location(
-                ast.ClassDef(
-                    name=new_name,
-                    bases=node.bases,
-                    keywords=node.keywords,
-                    body=node.body,
-                    decorator_list=node.decorator_list,
-                    lineno=node.lineno,
-                    col_offset=node.col_offset,
-                ),
-                node,
-            )
-        return node
+        node.name = self.rename(node.name)
+        return self.generic_visit(node)
 
     def visit_arg(self, node: ast.arg) -> ast.arg:
         """
@@ -192,51 +282,114 @@ class CodeObfuscatorAST(ast.NodeTransformer):
         @param node: AST arg node
         @return: Modified or original arg node
         """
-        self.generic_visit(node)
-        if node.arg not in builtin_identifiers and not node.arg.startswith("__"):
-            new_arg = self.create_random_identifier(node.arg)
-            return ast.copy_location(
-                ast.arg(
-                    arg=new_arg,
-                    annotation=node.annotation,
-                    lineno=node.lineno,
-                    col_offset=node.col_offset,
-                ),
-                node,
-            )
+        node.arg = self.rename(node.arg)
+        return self.generic_visit(node)
+
+    def visit_keyword(self, node: ast.keyword) -> ast.keyword:
+        """
+        Rename keyword arguments that refer to a parameter defined in this module (or the project).
+        
+        @param node: AST keyword node
+        @return: Modified or original keyword node
+        """
+        if node.arg is not None and (node.arg in self.parameters or self.names.is_project_parameter(node.arg)):
+            node.arg = self.rename(node.arg)
+        return self.generic_visit(node)
+
+    def visit_Global(self, node: ast.Global) -> ast.Global:
+        """
+        Rename the names listed in a global statement.
+        
+        @param node: AST Global node
+        @return: Modified Global node
+        """
+        node.names = [self.rename_variable(name) for name in node.names]
+        return node
+
+    def visit_Nonlocal(self, node: ast.Nonlocal) -> ast.Nonlocal:
+        """
+        Rename the names listed in a nonlocal statement.
+        
+        @param node: AST Nonlocal node
+        @return: Modified Nonlocal node
+        """
+        node.names = [self.rename_variable(name) for name in node.names]
+        return node
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> ast.ExceptHandler:
+        """
+        Rename the name bound by an except clause.
+        
+        @param node: AST ExceptHandler node
+        @return: Modified ExceptHandler node
+        """
+        node.name = self.rename_variable(node.name)
+        return self.generic_visit(node)
+
+    def visit_MatchAs(self, node: ast.AST) -> ast.AST:
+        """
+        Rename the name bound by a capture pattern.
+        
+        @param node: AST MatchAs node
+        @return: Modified MatchAs node
+        """
+        node.name = self.rename_variable(node.name)
+        return self.generic_visit(node)
+
+    def visit_MatchStar(self, node: ast.AST) -> ast.AST:
+        """
+        Rename the name bound by a star pattern.
+        
+        @param node: AST MatchStar node
+        @return: Modified MatchStar node
+        """
+        node.name = self.rename_variable(node.name)
         return node
 
+    def visit_MatchMapping(self, node: ast.AST) -> ast.AST:
+        """
+        Rename the name bound to the rest of a mapping pattern.
+        
+        @param node: AST MatchMapping node
+        @return: Modified MatchMapping node
+        """
+        node.rest = self.rename_variable(node.rest)
+        return self.generic_visit(node)
+
+    def visit_MatchClass(self, node: ast.AST) -> ast.AST:
+        """
+        Rename the attribute names matched by a class pattern, like other attributes.
+        
+        @param node: AST MatchClass node
+        @return: Modified MatchClass node
+        """
+        node.kwd_attrs = [self.rename(name) for name in node.kwd_attrs]
+        return self.generic_visit(node)
+
     def visit_BinOp(self, node: ast.BinOp) -> ast.BinOp:
         """
-        Visit BinOp nodes and wrap numeric operations with dummy additions.
+        Visit BinOp nodes and wrap arithmetic on numeric constants with dummy additions.
+        
+        Operands of unknown type are left alone: '+ 0' would raise on strings,
+        sequences and most user types. The perf-neutral profile also skips
+        operations the compiler does not fold, which would be computed at run time.
         
         @param node: AST BinOp node
         @return: Modified or original BinOp node
         """
         self.generic_visit(node)
-        if isinstance(node.op, (ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.FloorDiv, ast.Pow)):
+        def is_numeric_constant(n):
+            return (isinstance(n, ast.Constant) and isinstance(n.value, (int, float))
+                    and not isinstance(n.value, bool))
+        if (isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.FloorDiv, ast.Pow))
+                and is_numeric_constant(node.left) and is_numeric_constant(node.right)
+                and (not self.perf_neutral or folds_to_constant(node))):
             new_node = ast.BinOp(
                 left=node,
                 op=ast.Add(),
                 right=ast.Constant(value=0),
             )
             return ast.copy_location(new_node, node)
-        elif isinstance(node.op, ast.Add):
-            def is_numeric_constant(n):
-                if isinstance(n, ast.Constant):
-                    return isinstance(n.value, (int, float))
-                if hasattr(ast, 'Num') and isinstance(n, ast.Num):
-                    return isinstance(n.n, (int, float))
-                return False
-            left_is_num = is_numeric_constant(node.left)
-            right_is_num = is_numeric_constant(node.right)
-            if left_is_num and right_is_num:
-                new_node = ast.BinOp(
-                    left=node,
-                    op=ast.Add(),
-                    right=ast.Constant(value=0),
-                )
-                return ast.copy_location(new_node, node)
         return node
 
     def visit_If(self, node: ast.If) -> ast.If:
@@ -247,117 +400,167 @@ class CodeObfuscatorAST(ast.NodeTransformer):
         @return: Modified If node with fake branch
         """
         self.generic_visit(node)
+        if self.decoy_placement() is None:
+            return node
         fake_branch = ast.If(
             test=ast.Constant(value=False),
             body=[ast.Pass()],
             orelse=[],
         )
-        new_body = [fake_branch] + node.body
-        return ast.copy_location(
-            ast.If(
-                test=node.test,
-                body=new_body,
-                orelse=node.orelse,
-            ),
-            node,
-        )
+        node.body.insert(0, fake_branch)
+        return node
 
     def visit_Import(self, node: ast.Import) -> ast.Import:
         """
-        Visit Import nodes, track imported modules, and add extra unused imports.
+        Visit Import nodes, track imported modules, and add extra imports of preloaded modules.
         
         @param node: AST Import node
         @return: Modified Import node with extra imports
         """
         for alias in node.names:
-            module_name = alias.asname if alias.asname else alias.name
-            self.imported_modules.add(module_name)
-            if alias.asname and alias.name != alias.asname:
-                self.imported_modules.add(alias.name)
-        self.generic_visit(node)
-        existing = {alias.name for alias in node.names} if node.names else set()
-        extra_aliases = [
+            bound_name = alias.asname or alias.name.split(".")[0]
+            self.imported_modules.add(bound_name)
+            self.imported_modules.add(alias.name)
+            if self.names.is_project_module(alias.name):
+                self.project_imports.add(bound_name)
+        existing = {alias.name for alias in node.names}
+        decoy_rng = self.decoys.at("import", ast.unparse(node) if self.decoys.keyed else "")
+        node.names = node.names + [
             ast.alias(name=module, asname=None)
-            for module in select_random_unused_libraries()
+            for module in select_random_unused_libraries(rng=decoy_rng, libraries=preloaded_libraries)
             if module not in existing
         ]
-        new_names = node.names + extra_aliases if node.names else extra_aliases
-        return ast.copy_location(ast.Import(names=new_names), node)
+        return node
 
     def visit_ImportFrom(self, node: ast.ImportFrom) -> ast.ImportFrom:
         """
-        Visit ImportFrom nodes and track imported module names.
+        Visit ImportFrom nodes and track the module and the imported names.
+        
+        Names imported from the project's own modules that have a project-wide
+        name are renamed like everywhere else in the project instead of being kept.
         
         @param node: AST ImportFrom node
-        @return: Original ImportFrom node
+        @return: ImportFrom node
         """
+        from_project = node.level > 0 or (node.module is not None and self.names.is_project_module(node.module))
         if node.module:
             self.imported_modules.add(node.module)
-        self.generic_visit(node)
+            if from_project:
+                self.project_imports.add(node.module)
+        for alias in node.names:
+            if alias.name == "*":
+                continue
+            if from_project and self.names.shared(alias.name):
+                alias.name = self.create_random_identifier(alias.name)
+                if alias.asname:
+                    self.imported_modules.add(alias.asname)
+                    self.project_imports.add(alias.asname)
+                continue
+            self.imported_modules.add(alias.name)
+            if alias.asname:
+                self.imported_modules.add(alias.asname)
         return node
 
     def visit_Module(self, node: ast.Module) -> ast.Module:
         """
-        Visit Module nodes and ensure structure remains intact.
+        Visit Module nodes and append the decoy import block.
         
         @param node: AST Module node
         @return: Modified Module node
         """
         self.generic_visit(node)
+        node.body.extend(decoy_import_statements())
         return node
 
 
-def _obfuscate_code_with_ast_fallback(source_code: str) -> str:
+def _obfuscate_code_with_ast_fallback(source_code: str, rng: random.Random = None, validate: bool = True,
+                                      names: NameTable = None, transform_profile: str = "default",
+                                      decoy_key: str = None) -> str:
     """
-    Fallback AST-based obfuscation when libcst is not available.
+    Obfuscate source code with the standard library ast module.
+    
+    Much faster than the libcst engine, but the output is re-rendered by
+    ast.unparse, so comments and the original formatting are lost.
     
     @param source_code: Python source code as a string
+    @param rng: Random generator for names and decoys. None uses the global random module
+    @param validate: If True, check the result with compile() before returning it
+    @param names: Name table to record renames in. None creates a fresh one
+    @param transform_profile: Profile from TRANSFORM_PROFILES
+    @param decoy_key: Key to anchor decoys to the statements they follow, or None (see CodeObfuscatorAST)
     @return: Obfuscated Python source code as a string
     """
     if not source_code or not source_code.strip():
         raise ValueError("Source code cannot be empty")
     
     try:
-        tree = ast.parse(source_code)
+        with stage("parse"):
+            tree = ast.parse(source_code)
     except SyntaxError as e:
         raise SyntaxError(f"Invalid Python syntax: {e}") from e
     except Exception as e:
         raise RuntimeError(f"Failed to parse source code: {e}") from e
 
-    transformer = CodeObfuscatorAST()
-    transformed_tree = transformer.visit(tree)
+    transformer = CodeObfuscatorAST(rng=rng, names=names, parameters=parameter_names(tree),
+                                    transform_profile=transform_profile, decoy_key=decoy_key)
+    with stage("transform"):
+        transformed_tree = transformer.visit(tree)
     
     try:
-        final_code = ast.unparse(transformed_tree)
+        with stage("render"):
+            final_code = ast.unparse(transformed_tree) + "\n"
     except AttributeError:
         raise RuntimeError(
             "ast.unparse requires Python 3.9+. "
             "Please upgrade Python or install libcst: pip install libcst"
         )
 
-    final_code = insert_dummy_variable_assignments(final_code)
-    final_code += "\n" + generate_random_import_statements()
-    final_code = add_random_spacing_to_code(final_code)
+    with stage("spacing"):
+        final_code = add_random_spacing_to_code(final_code)
 
-    try:
-        ast.parse(final_code)
-    except SyntaxError as e:
-        raise SyntaxError(f"Obfuscation introduced invalid syntax: {e}") from e
+    if validate:
+        try:
+            with stage("validate"):
+                compile(final_code, "<shittified>", "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+        except SyntaxError as e:
+            raise SyntaxError(f"Obfuscation introduced invalid syntax: {e}") from e
 
     return final_code
 
 
-def obfuscate_code_with_ast(source_code: str) -> str:
+def obfuscate_code_with_ast(source_code: str, rng: random.Random = None, engine: str = None,
+                            names: NameTable = None, transform_profile: str = "default",
+                            decoy_key: str = None) -> str:
     """
-    Main obfuscation function using libcst if available, otherwise AST fallback.
+    Main obfuscation function for Python source code.
     
     @param source_code: Python source code as a string
+    @param rng: Random generator for names and decoys. None uses the global random module
+    @param engine: 'libcst' (keeps comments and formatting) or 'ast' (faster, re-rendered
+                   output). None uses default_engine()
+    @param names: Name table to record renames in. None creates a fresh one
+    @param transform_profile: 'default', or 'perf-neutral' to only apply transforms
+                              without run-time cost (see CodeObfuscatorAST)
+    @param decoy_key: Key to derive each decoy from the statement it follows (--name-map), or
+                      None to draw decoys from rng in sequence
     @return: Obfuscated Python source code as a string
     """
-    if LIBCST_AVAILABLE:
-        return obfuscate_code_with_libcst(source_code)
+    if transform_profile not in TRANSFORM_PROFILES:
+        raise ValueError(f"Unknown transform profile: {transform_profile}. "
+                         f"Choose from: {', '.join(TRANSFORM_PROFILES)}")
+    engine = engine or default_engine()
+    if engine == "libcst":
+        if not LIBCST_AVAILABLE:
+            raise RuntimeError("The libcst engine requires libcst: pip install libcst")
+        with stage("load backend"):
+            from src.transformer_libcst import obfuscate_code_with_libcst
+        return obfuscate_code_with_libcst(source_code, rng=rng, names=names, transform_profile=transform_profile,
+                                          decoy_key=decoy_key)
+    elif engine == "ast":
+        return _obfuscate_code_with_ast_fallback(source_code, rng=rng, names=names,
+                                                 transform_profile=transform_profile, decoy_key=decoy_key)
     else:
-        return _obfuscate_code_with_ast_fallback(source_code)
+        raise ValueError(f"Unknown Python engine: {engine}. Choose from: {', '.join(ENGINES)}")
 
 
 shittify_code = obfuscate_code_with_ast
@@ -1,43 +1,150 @@
+import ast
+import functools
 import libcst as cst
+import libcst.helpers
 import random
 from src.utils import (
     select_random_unused_libraries,
-    generate_random_variable_name,
+    NamePool,
     add_random_spacing_to_code,
-    insert_dummy_variable_assignments,
+    decoy_source,
     generate_random_import_statements,
+    preloaded_libraries,
+    dummy_variable_assignments,
+    stable_name_hash,
 )
+from src.name_table import NameTable, BUILTIN_IDENTIFIERS, PYTHON_RESERVED_WORDS, is_reserved_name
+from src.profiling import stage
 
 
-try:
-    if isinstance(__builtins__, dict):
-        builtin_identifiers = set(__builtins__.keys())
-    else:
-        builtin_identifiers = set(dir(__builtins__))
-except:
-    builtin_identifiers = set(dir(__builtins__))
-builtin_identifiers.update([
-    'print', 'len', 'range', 'str', 'int', 'float', 'list', 'dict', 'tuple', 'set',
-    'bool', 'type', 'isinstance', 'hasattr', 'getattr', 'setattr', 'delattr',
-    'callable', 'iter', 'next', 'enumerate', 'zip', 'map', 'filter', 'sorted',
-    'reversed', 'sum', 'max', 'min', 'abs', 'round', 'divmod', 'pow', 'all', 'any',
-    'bin', 'hex', 'oct', 'ord', 'chr', 'ascii', 'repr', 'eval', 'exec', 'compile',
-    'open', 'input', 'exit', 'quit'
-])
+builtin_identifiers = BUILTIN_IDENTIFIERS
+
+ASSIGNMENT_NODES = (cst.Assign, cst.AugAssign, cst.AnnAssign)
+
+# Renders single nodes to code for decoy anchors.
+EMPTY_MODULE = cst.Module(body=())
+
+
+@functools.lru_cache(maxsize=None)
+def dummy_assignment_statements(guarded: bool = False) -> tuple:
+    """
+    Parse the dummy assignment templates once; CST nodes are immutable and can be shared.
+    
+    @param guarded: Wrap each assignment in 'if False:', which the compiler removes
+    @return: Tuple of SimpleStatementLine nodes (If nodes if guarded), in template order
+    """
+    prefix = "if False: " if guarded else ""
+    return tuple(cst.parse_statement(f"{prefix}{statement}\n") for statement in dummy_variable_assignments)
+
+
+@functools.lru_cache(maxsize=None)
+def decoy_import_statements() -> tuple:
+    """
+    Parse the decoy import block appended to every module once.
+    
+    @return: Tuple of statement nodes
+    """
+    return tuple(cst.parse_module(generate_random_import_statements() + "\n").body)
+
+
+# Fields of compound statements that hold nested statements (blocks, else/except/finally clauses, match cases).
+STATEMENT_BLOCK_FIELDS = ("body", "orelse", "handlers", "finalbody", "cases")
+
+
+def def_parameter_names(node: cst.CSTNode, names: set = None) -> set:
+    """
+    Collect the parameter names of every def in a module, walking statements only.
+    
+    Expressions are never entered, so this costs a small fraction of a full
+    traversal or of a second parse. Lambda parameters, which can only appear
+    inside expressions, are collected by CodeObfuscatorCST as it reaches them.
+    
+    @param node: LibCST module, or a statement or block inside it
+    @param names: Set to add to. None starts a new one
+    @return: Set of parameter names
+    """
+    if names is None:
+        names = set()
+    if isinstance(node, cst.FunctionDef):
+        parameters = node.params
+        for param in (*parameters.posonly_params, *parameters.params, *parameters.kwonly_params,
+                      parameters.star_arg, parameters.star_kwarg):
+            if isinstance(param, cst.Param):
+                names.add(param.name.value)
+    elif isinstance(node, (cst.SimpleStatementLine, cst.SimpleStatementSuite)):
+        return names
+    for field in STATEMENT_BLOCK_FIELDS:
+        child = getattr(node, field, None)
+        if isinstance(child, (tuple, list)):
+            for statement in child:
+                def_parameter_names(statement, names)
+        elif isinstance(child, cst.CSTNode):
+            def_parameter_names(child, names)
+    return names
+
+
+class KeywordRenamer(cst.CSTTransformer):
+    """
+    Rename keyword arguments that CodeObfuscatorCST kept because their parameter came later.
+    
+    This only happens for a lambda parameter used as a keyword before the lambda
+    appears in the module, so the extra pass rarely runs.
+    """
+
+    def __init__(self, names: NameTable, keywords: set):
+        """
+        Initialize the renamer.
+        
+        @param names: Name table of the file, which already names the parameters
+        @param keywords: Keywords to rename
+        @return: None
+        """
+        super().__init__()
+        self.names = names
+        self.keywords = keywords
+
+    def leave_Arg(self, original_node: cst.Arg, updated_node: cst.Arg) -> cst.Arg:
+        """
+        Rename one keyword argument if its parameter was found late.
+        
+        @param original_node: Original LibCST Arg node
+        @param updated_node: Updated LibCST Arg node
+        @return: Modified or original Arg node
+        """
+        keyword = updated_node.keyword
+        if keyword is None or keyword.value not in self.keywords:
+            return updated_node
+        return updated_node.with_changes(keyword=keyword.with_changes(value=self.names.get(keyword.value)))
 
 
 class CodeObfuscatorCST(cst.CSTTransformer):
 
-    def __init__(self):
+    def __init__(self, rng: random.Random = None, names: NameTable = None, parameters: frozenset = frozenset(),
+                 transform_profile: str = "default", decoy_key: str = None):
         """
         Initialize the LibCST obfuscator with empty maps and sets.
         
+        @param rng: Random generator for names and decoys. None uses the global random module
+        @param names: Name table to record renames in. None creates a fresh one
+        @param parameters: Parameter names of the module's defs, see def_parameter_names(); lambda
+                           parameters are added as they are reached
+        @param transform_profile: Profile from TRANSFORM_PROFILES, see decoy_placement()
+        @param decoy_key: Key to derive each decoy from the statement it follows (see
+                          src.utils.decoy_source()), or None to draw decoys from rng in sequence
         @return: None
         """
         super().__init__()
-        self.identifier_map = {}
+        self.rng = rng or random
+        self.names = names if names is not None else NameTable()
+        self.identifier_map = self.names.forward
+        self.pool = NamePool(self.rng, taken=self.names.is_taken, reserved=PYTHON_RESERVED_WORDS)
+        self.decoys = decoy_source(self.pool, decoy_key)
         self.imported_modules = set()
-        self.function_params = {}
+        self.project_imports = set()
+        self.parameters = set(parameters)
+        self.kept_keywords = set()
+        self.perf_neutral = transform_profile == "perf-neutral"
+        self.contexts = ["module"]
 
     def get_random_identifier(self, original_name: str) -> str:
         """
@@ -46,11 +153,10 @@ class CodeObfuscatorCST(cst.CSTTransformer):
         @param original_name: Original identifier name
         @return: Random identifier string
         """
-        if original_name not in self.identifier_map:
-            noise = generate_random_variable_name()
-            random_name = f"{noise}{hash(original_name) % 1000}"
-            self.identifier_map[original_name] = random_name
-        return self.identifier_map[original_name]
+        new_name = self.names.get(original_name)
+        if new_name is None:
+            new_name = self.names.assign(original_name, self.pool.take(suffix=str(stable_name_hash(original_name) % 1000)))
+        return new_name
 
     def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
         """
@@ -60,72 +166,48 @@ class CodeObfuscatorCST(cst.CSTTransformer):
         @param updated_node: Updated LibCST Name node
         @return: Modified or original Name node
         """
-        if (original_node.value in builtin_identifiers or
-            original_node.value.startswith("__") or
-            original_node.value in self.imported_modules):
+        if is_reserved_name(original_node.value) or original_node.value in self.imported_modules:
             return updated_node
         
-        if updated_node.value in self.identifier_map.values():
+        if self.names.is_generated(updated_node.value):
             return updated_node
         
         original_name = original_node.value
         new_name = self.get_random_identifier(original_name)
         return updated_node.with_changes(value=new_name)
 
+    def visit_Attribute(self, original_node: cst.Attribute) -> bool:
+        """
+        Skip the generic traversal; leave_Attribute visits the object and renames the attribute itself.
+        
+        @param original_node: Original LibCST Attribute node
+        @return: False so the attribute name never reaches leave_Name
+        """
+        return False
+
     def leave_Attribute(self, original_node: cst.Attribute, updated_node: cst.Attribute) -> cst.Attribute:
         """
         Rename attribute names but preserve builtin methods and module attributes.
         
+        Attributes of the project's own modules are renamed if they have a project-wide name.
+        
         @param original_node: Original LibCST Attribute node
         @param updated_node: Updated LibCST Attribute node
         @return: Modified or original Attribute node
         """
-        module_name = None
-        if isinstance(original_node.value, cst.Name):
-            module_name = original_node.value.value
-        elif isinstance(updated_node.value, cst.Name):
-            updated_module_name = updated_node.value.value
-            for orig, renamed in self.identifier_map.items():
-                if renamed == updated_module_name and orig in self.imported_modules:
-                    module_name = orig
-                    break
-            if not module_name:
-                module_name = updated_module_name
-        elif isinstance(original_node.value, cst.Attribute):
-            base_attr = original_node.value
-            while isinstance(base_attr.value, cst.Attribute):
-                base_attr = base_attr.value
-            if isinstance(base_attr.value, cst.Name):
-                base_module = base_attr.value.value
-                if base_module in self.imported_modules:
-                    if updated_node.attr.value != original_node.attr.value:
-                        return updated_node.with_changes(attr=updated_node.attr.with_changes(value=original_node.attr.value))
-                    return updated_node
-        
-        if module_name:
-            if module_name in self.imported_modules:
-                if updated_node.attr.value != original_node.attr.value:
-                    return updated_node.with_changes(attr=updated_node.attr.with_changes(value=original_node.attr.value))
-                return updated_node
-
-        builtin_methods = {
-            'append', 'extend', 'insert', 'remove', 'pop', 'clear', 'index', 'count',
-            'sort', 'reverse', 'copy', 'keys', 'values', 'items', 'get', 'setdefault',
-            'popitem', 'update', 'join', 'split', 'strip', 'replace', 'find',
-            'startswith', 'endswith', 'upper', 'lower', 'capitalize', 'title'
-        }
-        if updated_node.attr.value in builtin_methods:
+        updated_node = updated_node.with_changes(value=original_node.value.visit(self))
+        attr_name = original_node.attr.value
+        if is_reserved_name(attr_name):
             return updated_node
 
-        if updated_node.attr.value.startswith("__"):
-            return updated_node
+        base = original_node.value
+        while isinstance(base, cst.Attribute):
+            base = base.value
+        if isinstance(base, cst.Name) and base.value in self.imported_modules:
+            if base.value not in self.project_imports or not self.names.shared(attr_name):
+                return updated_node
 
-        original_attr_name = original_node.attr.value
-        if original_attr_name in self.identifier_map:
-            new_attr = self.identifier_map[original_attr_name]
-        else:
-            new_attr = self.get_random_identifier(original_attr_name)
-        
+        new_attr = self.get_random_identifier(attr_name)
         return updated_node.with_changes(attr=updated_node.attr.with_changes(value=new_attr))
 
     def visit_FunctionDef(self, original_node: cst.FunctionDef) -> bool:
@@ -135,9 +217,10 @@ class CodeObfuscatorCST(cst.CSTTransformer):
         @param original_node: Original LibCST FunctionDef node
         @return: True to continue visiting
         """
+        self.contexts.append("function")
         for param in original_node.params.params:
             param_name = param.name.value
-            if param_name not in builtin_identifiers and not param_name.startswith("__"):
+            if not is_reserved_name(param_name):
                 self.get_random_identifier(param_name)
         return True
     
@@ -149,12 +232,54 @@ class CodeObfuscatorCST(cst.CSTTransformer):
         @param updated_node: Updated LibCST FunctionDef node
         @return: Modified or original FunctionDef node
         """
-        if (original_node.name.value not in builtin_identifiers and
-            not original_node.name.value.startswith("__")):
+        self.contexts.pop()
+        if not is_reserved_name(original_node.name.value):
             new_name = self.get_random_identifier(original_node.name.value)
             return updated_node.with_changes(name=updated_node.name.with_changes(value=new_name))
         return updated_node
 
+    def visit_For(self, original_node: cst.For) -> bool:
+        """
+        Enter a loop body, which may run more than once.
+        
+        @param original_node: Original LibCST For node
+        @return: True to continue visiting
+        """
+        self.contexts.append("loop")
+        return True
+
+    def leave_For(self, original_node: cst.For, updated_node: cst.For) -> cst.For:
+        """
+        Leave a loop body.
+        
+        @param original_node: Original LibCST For node
+        @param updated_node: Updated LibCST For node
+        @return: Updated For node
+        """
+        self.contexts.pop()
+        return updated_node
+
+    def visit_While(self, original_node: cst.While) -> bool:
+        """
+        Enter a loop body, which may run more than once.
+        
+        @param original_node: Original LibCST While node
+        @return: True to continue visiting
+        """
+        self.contexts.append("loop")
+        return True
+
+    def leave_While(self, original_node: cst.While, updated_node: cst.While) -> cst.While:
+        """
+        Leave a loop body.
+        
+        @param original_node: Original LibCST While node
+        @param updated_node: Updated LibCST While node
+        @return: Updated While node
+        """
+        self.contexts.pop()
+        return updated_node
+
     def visit_ClassDef(self, original_node: cst.ClassDef) -> bool:
         """
         Pre-create mappings for class methods before visiting.
@@ -167,7 +292,7 @@ class CodeObfuscatorCST(cst.CSTTransformer):
             for stmt in body.body:
                 if isinstance(stmt, cst.FunctionDef):
                     method_name = stmt.name.value
-                    if method_name not in builtin_identifiers and not method_name.startswith("__"):
+                    if not is_reserved_name(method_name):
                         self.get_random_identifier(method_name)
         return True
     
@@ -179,12 +304,21 @@ class CodeObfuscatorCST(cst.CSTTransformer):
         @param updated_node: Updated LibCST ClassDef node
         @return: Modified or original ClassDef node
         """
-        if (original_node.name.value not in builtin_identifiers and
-            not original_node.name.value.startswith("__")):
+        if not is_reserved_name(original_node.name.value):
             new_name = self.get_random_identifier(original_node.name.value)
             return updated_node.with_changes(name=updated_node.name.with_changes(value=new_name))
         return updated_node
 
+    def visit_Param(self, original_node: cst.Param) -> bool:
+        """
+        Record the parameter, so later keyword arguments naming it are renamed.
+        
+        @param original_node: Original LibCST Param node
+        @return: True to continue visiting
+        """
+        self.parameters.add(original_node.name.value)
+        return True
+
     def leave_Param(self, original_node: cst.Param, updated_node: cst.Param) -> cst.Param:
         """
         Rename function parameters using pre-created mappings.
@@ -194,37 +328,69 @@ class CodeObfuscatorCST(cst.CSTTransformer):
         @return: Modified or original Param node
         """
         param_name = original_node.name.value
-        if (param_name not in builtin_identifiers and
-            not param_name.startswith("__")):
+        if not is_reserved_name(param_name):
             new_name = self.get_random_identifier(param_name)
             return updated_node.with_changes(name=updated_node.name.with_changes(value=new_name))
         return updated_node
 
+    def visit_Arg(self, original_node: cst.Arg) -> bool:
+        """
+        Skip the generic traversal; leave_Arg visits the value and renames the keyword itself.
+        
+        @param original_node: Original LibCST Arg node
+        @return: False so the keyword never reaches leave_Name
+        """
+        return False
+
+    def leave_Arg(self, original_node: cst.Arg, updated_node: cst.Arg) -> cst.Arg:
+        """
+        Rename keyword arguments that refer to a parameter defined in this module (or the project).
+        
+        Other keywords belong to builtins or library functions and are kept, and
+        recorded in kept_keywords in case a lambda defines such a parameter later.
+        
+        @param original_node: Original LibCST Arg node
+        @param updated_node: Updated LibCST Arg node
+        @return: Modified or original Arg node
+        """
+        updated_node = updated_node.with_changes(value=original_node.value.visit(self))
+        keyword = original_node.keyword
+        if keyword is None or is_reserved_name(keyword.value):
+            return updated_node
+        if keyword.value not in self.parameters and not self.names.is_project_parameter(keyword.value):
+            self.kept_keywords.add(keyword.value)
+            return updated_node
+        new_keyword = self.get_random_identifier(keyword.value)
+        return updated_node.with_changes(keyword=keyword.with_changes(value=new_keyword))
+
     def visit_Import(self, original_node: cst.Import) -> bool:
         """
-        Track imported modules before visiting.
+        Track imported modules. Module names inside the statement are never renamed.
         
         @param original_node: Original LibCST Import node
-        @return: True to continue visiting
+        @return: False, the children are left untouched
         """
         for alias in original_node.names:
-            module_name = alias.asname.name.value if alias.asname else alias.name.value
-            self.imported_modules.add(module_name)
-            if alias.asname and alias.name.value != alias.asname.name.value:
-                self.imported_modules.add(alias.name.value)
-        return True
+            full_name = cst.helpers.get_full_name_for_node(alias.name)
+            bound_name = alias.asname.name.value if alias.asname else full_name.split(".")[0]
+            self.imported_modules.add(bound_name)
+            self.imported_modules.add(full_name)
+            if self.names.is_project_module(full_name):
+                self.project_imports.add(bound_name)
+        return False
     
     def leave_Import(self, original_node: cst.Import, updated_node: cst.Import) -> cst.Import:
         """
-        Add extra unused imports to the import statement.
+        Add extra imports of modules the interpreter has already loaded to the import statement.
         
         @param original_node: Original LibCST Import node
         @param updated_node: Updated LibCST Import node
         @return: Modified Import node with extra imports
         """
         existing = {alias.name.value for alias in updated_node.names}
+        decoy_rng = self.decoys.at("import", EMPTY_MODULE.code_for_node(original_node) if self.decoys.keyed else "")
         extra_modules = [
-            module for module in select_random_unused_libraries()
+            module for module in select_random_unused_libraries(rng=decoy_rng, libraries=preloaded_libraries)
             if module not in existing
         ]
         
@@ -236,26 +402,62 @@ class CodeObfuscatorCST(cst.CSTTransformer):
 
         return updated_node
 
+    def imports_from_project(self, node: cst.ImportFrom) -> bool:
+        """
+        Check whether a 'from X import Y' statement imports from one of the project's own modules.
+        
+        @param node: LibCST ImportFrom node
+        @return: True for relative imports and modules found by the project pre-scan
+        """
+        if node.relative:
+            return True
+        return node.module is not None and self.names.is_project_module(cst.helpers.get_full_name_for_node(node.module))
+
     def visit_ImportFrom(self, original_node: cst.ImportFrom) -> bool:
         """
-        Track imported modules from 'from X import Y' statements before visiting.
+        Track the module and the imported names of 'from X import Y' statements.
+        
+        Names imported from the project's own modules that have a project-wide
+        name are not tracked; leave_ImportFrom renames them.
         
         @param original_node: Original LibCST ImportFrom node
-        @return: True to continue visiting
+        @return: False, the children are left untouched
         """
+        from_project = self.imports_from_project(original_node)
         if original_node.module:
-            self.imported_modules.add(original_node.module.value)
-        return True
+            module_name = cst.helpers.get_full_name_for_node(original_node.module)
+            self.imported_modules.add(module_name)
+            if from_project:
+                self.project_imports.add(module_name)
+        if not isinstance(original_node.names, cst.ImportStar):
+            for alias in original_node.names:
+                if from_project and self.names.shared(alias.name.value):
+                    if alias.asname:
+                        self.imported_modules.add(alias.asname.name.value)
+                        self.project_imports.add(alias.asname.name.value)
+                    continue
+                self.imported_modules.add(alias.name.value)
+                if alias.asname:
+                    self.imported_modules.add(alias.asname.name.value)
+        return False
     
     def leave_ImportFrom(self, original_node: cst.ImportFrom, updated_node: cst.ImportFrom) -> cst.ImportFrom:
         """
-        Return the import statement unchanged.
+        Rename the names imported from the project's own modules that have a project-wide name.
         
         @param original_node: Original LibCST ImportFrom node
         @param updated_node: Updated LibCST ImportFrom node
-        @return: Original ImportFrom node
+        @return: ImportFrom node
         """
-        return updated_node
+        if isinstance(updated_node.names, cst.ImportStar) or not self.imports_from_project(original_node):
+            return updated_node
+        new_names = []
+        for alias in updated_node.names:
+            if self.names.shared(alias.name.value):
+                alias = alias.with_changes(name=alias.name.with_changes(
+                    value=self.get_random_identifier(alias.name.value)))
+            new_names.append(alias)
+        return updated_node.with_changes(names=tuple(new_names))
 
     def leave_If(self, original_node: cst.If, updated_node: cst.If) -> cst.If:
         """
@@ -277,35 +479,113 @@ class CodeObfuscatorCST(cst.CSTTransformer):
         """
         return updated_node
 
+    def decoy_placement(self) -> str:
+        """
+        Decide how decoy statements are added to the block being transformed.
+        
+        The default profile always adds them as they are. perf-neutral only does
+        so in code that runs once (module and class bodies), guards them with
+        'if False:' in function bodies, where the compiler leaves at most a NOP,
+        and leaves loop bodies alone.
+        
+        @return: "plain", "guarded", or None for no decoys
+        """
+        if not self.perf_neutral or self.contexts[-1] == "module":
+            return "plain"
+        return "guarded" if self.contexts[-1] == "function" else None
+
+    def insert_dummy_assignments(self, body: tuple) -> list:
+        """
+        Follow every assignment statement line in a block with a dummy assignment.
+        
+        @param body: Statements of a block
+        @return: New list of statements
+        """
+        placement = self.decoy_placement()
+        if placement is None:
+            return list(body)
+        new_body = []
+        dummy_statements = dummy_assignment_statements(guarded=placement == "guarded")
+        for statement in body:
+            new_body.append(statement)
+            if (isinstance(statement, cst.SimpleStatementLine) and
+                any(isinstance(small, ASSIGNMENT_NODES) and getattr(small, "value", None) is not None
+                    for small in statement.body)):
+                anchor = ("; ".join(EMPTY_MODULE.code_for_node(small) for small in statement.body)
+                          if self.decoys.keyed else "")
+                new_body.append(self.decoys.at("assignment", anchor).choice(dummy_statements))
+        return new_body
+
+    def leave_IndentedBlock(self, original_node: cst.IndentedBlock, updated_node: cst.IndentedBlock) -> cst.IndentedBlock:
+        """
+        Insert dummy assignments after assignments inside indented blocks.
+        
+        @param original_node: Original LibCST IndentedBlock node
+        @param updated_node: Updated LibCST IndentedBlock node
+        @return: IndentedBlock with dummy assignments
+        """
+        return updated_node.with_changes(body=self.insert_dummy_assignments(updated_node.body))
 
-def obfuscate_code_with_libcst(source_code: str) -> str:
+    def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
+        """
+        Insert dummy assignments at module level and append the decoy import block.
+        
+        @param original_node: Original LibCST Module node
+        @param updated_node: Updated LibCST Module node
+        @return: Module with dummy assignments and decoy imports
+        """
+        body = self.insert_dummy_assignments(updated_node.body)
+        body.extend(decoy_import_statements())
+        return updated_node.with_changes(body=body)
+
+
+def obfuscate_code_with_libcst(source_code: str, rng: random.Random = None, validate: bool = True,
+                               names: NameTable = None, transform_profile: str = "default",
+                               decoy_key: str = None) -> str:
     """
-    Parse source code using LibCST, transform it, then apply string-based obfuscation.
+    Parse source code using LibCST and obfuscate it in a single transformer pass.
+    
+    Renaming, dummy assignments and decoy imports are all applied to the tree, so
+    the module is parsed once and rendered once.
     
     @param source_code: Python source code as a string
+    @param rng: Random generator for names and decoys. None uses the global random module
+    @param validate: If True, check the result with compile() before returning it
+    @param names: Name table to record renames in. None creates a fresh one
+    @param transform_profile: Profile from TRANSFORM_PROFILES
+    @param decoy_key: Key to anchor decoys to the statements they follow, or None (see CodeObfuscatorCST)
     @return: Obfuscated Python source code as a string
     """
     if not source_code or not source_code.strip():
         raise ValueError("Source code cannot be empty")
 
     try:
-        tree = cst.parse_module(source_code)
-    except cst.ParserSyntaxError as e:
+        with stage("parse (libcst)"):
+            tree = cst.parse_module(source_code)
+    except (SyntaxError, cst.ParserSyntaxError) as e:
         raise SyntaxError(f"Invalid Python syntax: {e}") from e
     except Exception as e:
         raise RuntimeError(f"Failed to parse source code: {e}") from e
+    with stage("parameters"):
+        parameters = def_parameter_names(tree)
 
-    transformer = CodeObfuscatorCST()
-    transformed_tree = tree.visit(transformer)
-    final_code = transformed_tree.code
-
-    final_code = insert_dummy_variable_assignments(final_code)
-    final_code += "\n" + generate_random_import_statements()
-    final_code = add_random_spacing_to_code(final_code)
+    transformer = CodeObfuscatorCST(rng=rng, names=names, parameters=parameters, transform_profile=transform_profile,
+                                    decoy_key=decoy_key)
+    with stage("transform"):
+        transformed_tree = tree.visit(transformer)
+        late_keywords = transformer.kept_keywords & transformer.parameters
+        if late_keywords:
+            transformed_tree = transformed_tree.visit(KeywordRenamer(transformer.names, late_keywords))
+    with stage("render"):
+        final_code = transformed_tree.code
+    with stage("spacing"):
+        final_code = add_random_spacing_to_code(final_code)
 
-    try:
-        cst.parse_module(final_code)
-    except cst.ParserSyntaxError as e:
-        raise SyntaxError(f"Obfuscation introduced invalid syntax: {e}") from e
+    if validate:
+        try:
+            with stage("validate"):
+                compile(final_code, "<shittified>", "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+        except SyntaxError as e:
+            raise SyntaxError(f"Obfuscation introduced invalid syntax: {e}") from e
 
     return final_code
@@ -1,32 +1,307 @@
+import hashlib
 import random
 import string
+import zlib
 
 unused_libraries = ["math", "os", "sys", "random", "time", "collections", "functools"]
 
+# Modules the interpreter has already imported before user code runs: importing
+# one of them again only binds a name, so they are the only extra imports added
+# to real import statements.
+preloaded_libraries = ["os", "sys", "time"]
 
-def select_random_unused_libraries(count: int = 3) -> list:
+dummy_variable_assignments = ["dummy_var = 0", "temp = 12345", "unused_var = None"]
+
+
+def make_file_rng(seed, path: str) -> random.Random:
+    """
+    Create a per-file random generator derived from a run seed and a file path.
+    
+    The same seed and path always yield the same stream, independent of
+    PYTHONHASHSEED, the process the file is handled in, or the order files run in.
+    
+    @param seed: Run seed (any value with a stable str()), or None for an unseeded generator
+    @param path: Path identifying the file, normally relative to the processed root
+    @return: random.Random instance
+    """
+    if seed is None:
+        return random.Random()
+    digest = hashlib.sha256(f"{seed}\0{path}".encode("utf-8", "surrogatepass")).digest()
+    return random.Random(int.from_bytes(digest[:16], "big"))
+
+
+def stable_name_hash(name: str) -> int:
+    """
+    Hash an identifier consistently across processes, unlike the builtin hash().
+    
+    @param name: Identifier to hash
+    @return: Non-negative integer hash
+    """
+    return zlib.crc32(name.encode("utf-8", "surrogatepass"))
+
+
+def select_random_unused_libraries(count: int = 3, rng: random.Random = None, libraries: list = None) -> list:
     """
     Select random unused libraries from the predefined list.
     
     @param count: Number of libraries to select
+    @param rng: Random generator to draw from. None uses the global random module
+    @param libraries: Libraries to choose from. None uses unused_libraries
     @return: List of library names
     """
-    count = min(count, len(unused_libraries))
-    return random.sample(unused_libraries, count)
+    rng = rng or random
+    libraries = unused_libraries if libraries is None else libraries
+    count = min(count, len(libraries))
+    return rng.sample(libraries, count)
 
 
-def generate_random_variable_name() -> str:
+def generate_random_variable_name(rng: random.Random = None) -> str:
     """
     Generate a random variable name with random length and suffix.
     
+    @param rng: Random generator to draw from. None uses the global random module
     @return: Random variable name string
     """
-    variable_length = random.randint(7, 10)
-    first_character = random.choice(string.ascii_lowercase)
+    rng = rng or random
+    variable_length = rng.randint(7, 10)
+    first_character = rng.choice(string.ascii_lowercase)
     remaining_characters = "".join(
-        random.choices(string.ascii_letters + string.digits, k=variable_length - 1)
+        rng.choices(string.ascii_letters + string.digits, k=variable_length - 1)
     )
-    return f"{first_character}{remaining_characters}_{random.randint(100, 999)}"
+    return f"{first_character}{remaining_characters}_{rng.randint(100, 999)}"
+
+
+NAME_ALPHABET = string.ascii_letters + string.digits
+
+# Byte -> character tables for NamePool: a whole entropy buffer is mapped in one
+# bytes.translate() call instead of one rng.choice() per character.
+_NAME_CHARACTER_TABLE = bytes(ord(NAME_ALPHABET[i % len(NAME_ALPHABET)]) for i in range(256))
+_NAME_FIRST_CHARACTERS = string.ascii_lowercase
+
+# Entropy bytes per name: length, first character, two for the numeric suffix, up to nine characters.
+NAME_SLOT_BYTES = 16
+
+
+class NamePool:
+    """
+    Source of unique random identifiers, generated in bulk.
+    
+    Names have the shape of generate_random_variable_name() (a lowercase letter,
+    6-9 letters or digits, then _100-_999), but a batch of them is cut from a
+    single getrandbits() buffer, so each name costs a slice and a format instead
+    of several generator calls. A pool never hands out the same name twice, nor
+    a reserved word, nor a name the taken callback reports as used (normally the
+    file's NameTable, which also knows project-wide names).
+    """
+
+    def __init__(self, rng: random.Random = None, taken=None, reserved=frozenset(), batch: int = 64,
+                 issued: set = None):
+        """
+        Initialize an empty pool.
+        
+        @param rng: Random generator to draw entropy from. None uses the global random module
+        @param taken: Optional callable name -> bool for names that are already in use elsewhere
+        @param reserved: Keywords and builtins that must never be generated
+        @param batch: Names generated per entropy buffer
+        @param issued: Set of names handed out by another pool, shared so neither repeats the other's
+        @return: None
+        """
+        self.rng = rng or random
+        self.taken = taken
+        self.reserved = reserved
+        self.batch = batch
+        self.issued = set() if issued is None else issued
+        self._entropy = b""
+        self._characters = ""
+        self._position = 0
+
+    def _draw(self) -> str:
+        """
+        Cut the next candidate name from the entropy buffer, refilling it when exhausted.
+        
+        @return: Candidate name, not yet checked for uniqueness
+        """
+        if self._position >= len(self._entropy):
+            size = NAME_SLOT_BYTES * self.batch
+            self._entropy = self.rng.getrandbits(8 * size).to_bytes(size, "little")
+            self._characters = self._entropy.translate(_NAME_CHARACTER_TABLE).decode("ascii")
+            self._position = 0
+        position = self._position
+        self._position += NAME_SLOT_BYTES
+        entropy = self._entropy
+        length = 7 + entropy[position] % 4
+        first_character = _NAME_FIRST_CHARACTERS[entropy[position + 1] % 26]
+        number = 100 + (entropy[position + 2] | entropy[position + 3] << 8) % 900
+        return f"{first_character}{self._characters[position + 4:position + 3 + length]}_{number}"
+
+    def take(self, suffix: str = "") -> str:
+        """
+        Return a name that has not been handed out or used before.
+        
+        @param suffix: Text appended to the random part; uniqueness applies to the whole name
+        @return: Unique identifier
+        """
+        while True:
+            name = self._draw() + suffix
+            if name in self.issued or name in self.reserved or (self.taken is not None and self.taken(name)):
+                continue
+            self.issued.add(name)
+            return name
+
+
+class KeyedRandom(random.Random):
+    """
+    Random generator whose stream is derived from a key by hashing (BLAKE2b blocks).
+    
+    Creating one costs a hash rather than seeding a Mersenne Twister, so a fresh
+    generator can be made for every decoy. getrandbits() and random() come from
+    the hash; choice(), randint(), sample() and the rest build on them.
+    """
+
+    def __init__(self, key: bytes):
+        """
+        Initialize the generator.
+        
+        @param key: Bytes the stream is derived from
+        @return: None
+        """
+        self._key = key
+        self._blocks = 0
+        self._bits = 0
+        self._available = 0
+
+    def seed(self, *args, **kwargs) -> None:
+        """
+        Ignore seeding; the stream depends on the key only.
+        
+        @return: None
+        """
+
+    def getrandbits(self, k: int) -> int:
+        """
+        Return the next k bits of the stream.
+        
+        @param k: Number of bits
+        @return: Non-negative integer below 2 ** k
+        """
+        while self._available < k:
+            block = hashlib.blake2b(self._key, digest_size=64, salt=self._blocks.to_bytes(16, "little")).digest()
+            self._bits |= int.from_bytes(block, "little") << self._available
+            self._available += 512
+            self._blocks += 1
+        value = self._bits & ((1 << k) - 1)
+        self._bits >>= k
+        self._available -= k
+        return value
+
+    def random(self) -> float:
+        """
+        Return the next float in [0, 1).
+        
+        @return: Float with 53 random bits
+        """
+        return self.getrandbits(53) / 9007199254740992
+
+
+class DecoySource:
+    """
+    Random decisions and names for the decoys of one file, drawn in sequence.
+    
+    Backends ask at() for the generator of a decoy anchored at some code (for
+    example the line it follows) and name() for its identifier. Here every
+    anchor shares the file's generator and name pool, so an edit shifts every
+    decoy after it; see KeyedDecoySource.
+    """
+
+    # Whether at() uses its anchor; callers skip computing costly anchors when it does not.
+    keyed = False
+
+    def __init__(self, pool: NamePool):
+        """
+        Initialize the source.
+        
+        @param pool: Name pool of the file, drawing from the file's generator
+        @return: None
+        """
+        self.pool = pool
+
+    def at(self, *anchor: str) -> random.Random:
+        """
+        Return the generator for the decoys anchored at a piece of code.
+        
+        @param anchor: Text describing where the decoy goes, e.g. the line it follows
+        @return: Random generator
+        """
+        return self.pool.rng
+
+    def name(self, rng: random.Random, suffix: str = "") -> str:
+        """
+        Return a new decoy identifier.
+        
+        @param rng: Generator returned by at() for the decoy
+        @param suffix: Text appended to the random part
+        @return: Identifier unique within the file
+        """
+        return self.pool.take(suffix)
+
+
+class KeyedDecoySource(DecoySource):
+    """
+    Decoy decisions derived from a key and the code each decoy is anchored at.
+    
+    Each anchor is hashed with the key and the number of times the same anchor
+    occurred before in the file, so an edit only changes the decoys anchored at
+    the edited code. Decoy names come from a one-name NamePool on the anchor's
+    generator, sharing the file pool's issued names so they stay unique.
+    """
+
+    keyed = True
+
+    def __init__(self, pool: NamePool, key: str):
+        """
+        Initialize the source.
+        
+        @param pool: Name pool of the file
+        @param key: Seed or salt of the run combined with the file's rng key
+        @return: None
+        """
+        super().__init__(pool)
+        self.key = key.encode("utf-8", "surrogatepass") + b"\0"
+        self.occurrences = {}
+
+    def at(self, *anchor: str) -> random.Random:
+        """
+        Return a generator derived from the key, the anchor and its occurrence count.
+        
+        @param anchor: Text describing where the decoy goes, e.g. the line it follows
+        @return: KeyedRandom instance
+        """
+        text = "\0".join(anchor)
+        occurrence = self.occurrences.get(text, 0)
+        self.occurrences[text] = occurrence + 1
+        return KeyedRandom(self.key + f"{text}\0{occurrence}".encode("utf-8", "surrogatepass"))
+
+    def name(self, rng: random.Random, suffix: str = "") -> str:
+        """
+        Return a new decoy identifier drawn from the anchor's generator.
+        
+        @param rng: Generator returned by at() for the decoy
+        @param suffix: Text appended to the random part
+        @return: Identifier unique within the file
+        """
+        pool = NamePool(rng, taken=self.pool.taken, reserved=self.pool.reserved, batch=1, issued=self.pool.issued)
+        return pool.take(suffix)
+
+
+def decoy_source(pool: NamePool, key: str = None) -> DecoySource:
+    """
+    Create the decoy source of a file.
+    
+    @param pool: Name pool of the file
+    @param key: Key to anchor decoys with (see ObfuscationOptions.decoy_key()), or None to draw them in sequence
+    @return: KeyedDecoySource with a key, else DecoySource
+    """
+    return DecoySource(pool) if key is None else KeyedDecoySource(pool, key)
 
 
 def add_random_spacing_to_code(code_snippet: str) -> str:
@@ -41,9 +316,12 @@ def add_random_spacing_to_code(code_snippet: str) -> str:
 
 def generate_random_import_statements() -> str:
     """
-    Generate random import statements with example usage calls.
+    Generate the decoy block of import statements with example usage calls.
     
-    @return: String containing import statements and example calls
+    The block is guarded by 'if False:', which the compiler removes, so neither
+    the imports nor the calls (one of them is time.sleep) run when the module is imported.
+    
+    @return: String containing the guarded import statements and example calls
     """
     import_statements = []
     import_examples = {
@@ -57,29 +335,7 @@ def generate_random_import_statements() -> str:
     }
     for library in unused_libraries:
         if library in import_examples:
-            import_statements.append(f"import {library}")
-            import_statements.extend(import_examples[library])
-    return "\n".join(import_statements)
-
+            import_statements.append(f"    import {library}")
+            import_statements.extend(f"    {example}" for example in import_examples[library])
+    return "if False:\n" + "\n".join(import_statements)
 
-def insert_dummy_variable_assignments(code_snippet: str) -> str:
-    """
-    Insert dummy variable assignments after actual assignments, avoiding comparisons.
-    
-    @param code_snippet: Source code string
-    @return: Code with dummy assignments inserted
-    """
-    dummy_variables = ["dummy_var = 0", "temp = 12345", "unused_var = None"]
-    modified_lines = []
-    for line in code_snippet.splitlines():
-        modified_lines.append(line)
-        stripped = line.strip()
-        if stripped and "=" in stripped:
-            if "==" not in stripped and "!=" not in stripped and "<=" not in stripped and ">=" not in stripped:
-                if not stripped.startswith(("def ", "class ", "@", "import ", "from ", "if ", "elif ", "while ", "for ")):
-                    parts = stripped.split("=", 1)
-                    if len(parts) == 2 and parts[0].strip() and not parts[0].strip().startswith("#"):
-                        indent = len(line) - len(line.lstrip())
-                        dummy_line = " " * indent + random.choice(dummy_variables)
-                        modified_lines.append(dummy_line)
-    return "\n".join(modified_lines)
@@ -0,0 +1,377 @@
+import os
+import re
+import shutil
+
+from src.options import WalkOptions
+
+
+IGNORE_FILE_NAMES = (".gitignore", ".shittierignore")
+
+# Skipped like git skips its own directory, unless ignore files are disabled.
+VCS_DIRECTORIES = (".git/", ".hg/", ".svn/")
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+# ioctl request number of FICLONE (Linux): share the extents of another file.
+FICLONE = 0x40049409
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a size such as 500, 64K, 10M or 2G (binary units).
+    
+    @param text: Size string
+    @return: Number of bytes
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?)i?B?\s*", text, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).upper()]
+
+
+def _translate_segment(segment: str) -> str:
+    """
+    Translate one path segment of a gitignore pattern to a regular expression.
+    
+    @param segment: Pattern segment without slashes
+    @return: Regular expression source
+    """
+    regex = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            regex.append("[^/]*")
+            while i + 1 < len(segment) and segment[i + 1] == "*":
+                i += 1
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "\\" and i + 1 < len(segment):
+            i += 1
+            regex.append(re.escape(segment[i]))
+        elif char == "[":
+            end = segment.find("]", i + 2 if segment[i + 1:i + 2] in ("!", "^", "]") else i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                body = segment[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                regex.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+
+class IgnoreRule:
+    """
+    One gitignore pattern, bound to the directory of the file it came from.
+    """
+
+    def __init__(self, pattern: str, base: str = ""):
+        """
+        Compile a pattern.
+        
+        @param pattern: Pattern line in gitignore syntax (already stripped of comments)
+        @param base: Directory of the ignore file, relative to the walk root ('' for the root)
+        @return: None
+        """
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        self.directory_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        anchored = "/" in pattern
+        segments = pattern.lstrip("/").split("/")
+        regex = ""
+        for index, segment in enumerate(segments):
+            last = index == len(segments) - 1
+            if segment == "**":
+                regex += ".*" if last else "(?:.*/)?"
+            else:
+                regex += _translate_segment(segment) + ("" if last else "/")
+        self.regex = re.compile(("" if anchored else "(?:.*/)?") + regex + r"\Z", re.DOTALL)
+        self.prefix = base + "/" if base else ""
+
+    def matches(self, relative_path: str, is_dir: bool) -> bool:
+        """
+        Check whether the rule applies to a path.
+        
+        @param relative_path: Path relative to the walk root, with forward slashes
+        @param is_dir: Whether the path is a directory
+        @return: True if the pattern matches
+        """
+        if self.directory_only and not is_dir:
+            return False
+        if not relative_path.startswith(self.prefix):
+            return False
+        return self.regex.match(relative_path, len(self.prefix)) is not None
+
+
+def parse_ignore_lines(lines, base: str = "") -> tuple:
+    """
+    Parse the lines of a gitignore-style file.
+    
+    @param lines: Iterable of lines
+    @param base: Directory of the file, relative to the walk root
+    @return: Tuple of IgnoreRule
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.endswith(" ") and not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("\\#"):
+            line = line[1:]
+        rules.append(IgnoreRule(line, base))
+    return tuple(rules)
+
+
+class TreeWalker:
+    """
+    os.scandir-based walk of one directory tree that applies ignore rules and a size limit.
+    
+    Rules come from .gitignore and .shittierignore files in every directory (a
+    pattern applies below the directory of its file, and later rules override
+    earlier ones as in git), followed by the --exclude patterns, which always win.
+    Skipped paths, such as an output directory inside the tree, are never walked.
+    """
+
+    def __init__(self, root: str, options: WalkOptions = None, skip=()):
+        """
+        Initialize the walker.
+        
+        @param root: Directory the rules and --exclude patterns are relative to
+        @param options: Walk options. None uses defaults
+        @param skip: Paths left out regardless of any rule; those outside the root are ignored
+        @return: None
+        """
+        self.root = os.path.abspath(root)
+        self.options = options or WalkOptions()
+        self.skip = frozenset(
+            self.relative(path) for path in map(os.path.abspath, skip) if path.startswith(self.root + os.sep)
+        )
+        self.exclude_rules = parse_ignore_lines(self.options.exclude)
+        if self.options.use_ignore_files:
+            self.exclude_rules = parse_ignore_lines(VCS_DIRECTORIES) + self.exclude_rules
+        self._rules = {}
+
+    def relative(self, path: str) -> str:
+        """
+        Return a path relative to the root, with forward slashes.
+        
+        @param path: Absolute path below the root
+        @return: Relative path ('' for the root)
+        """
+        if path == self.root:
+            return ""
+        return path[len(self.root) + 1:].replace(os.sep, "/")
+
+    def _load_rules(self, directory: str) -> tuple:
+        """
+        Read the ignore files of one directory.
+        
+        @param directory: Absolute directory path
+        @return: Tuple of IgnoreRule
+        """
+        rules = ()
+        for name in IGNORE_FILE_NAMES:
+            try:
+                with open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace") as f:
+                    rules += parse_ignore_lines(f, self.relative(directory))
+            except OSError:
+                continue
+        return rules
+
+    def rules_for(self, directory: str) -> tuple:
+        """
+        Return the ignore-file rules in effect inside a directory, loading its ancestors as needed.
+        
+        @param directory: Absolute directory path at or below the root
+        @return: Tuple of IgnoreRule, outermost first
+        """
+        rules = self._rules.get(directory)
+        if rules is not None:
+            return rules
+        if not self.options.use_ignore_files:
+            rules = ()
+        elif directory == self.root or not directory.startswith(self.root + os.sep):
+            rules = self._load_rules(directory)
+        else:
+            rules = self.rules_for(os.path.dirname(directory)) + self._load_rules(directory)
+        self._rules[directory] = rules
+        return rules
+
+    def invalidate(self) -> None:
+        """
+        Forget cached ignore files, after one of them changed.
+        
+        @return: None
+        """
+        self._rules.clear()
+
+    def _excluded(self, relative_path: str, is_dir: bool, rules: tuple) -> bool:
+        """
+        Apply rules (last match wins), then the --exclude patterns.
+        
+        @param relative_path: Path relative to the root
+        @param is_dir: Whether the path is a directory
+        @param rules: Ignore-file rules in effect in the path's directory
+        @return: True if the path is excluded
+        """
+        if relative_path in self.skip:
+            return True
+        excluded = False
+        for rule in rules:
+            if rule.matches(relative_path, is_dir):
+                excluded = not rule.negate
+        for rule in self.exclude_rules:
+            if rule.matches(relative_path, is_dir):
+                excluded = not rule.negate
+        return excluded
+
+    def is_ignored(self, path: str) -> bool:
+        """
+        Check a single path, including whether one of its parent directories is ignored.
+        
+        @param path: Absolute path below the root
+        @return: True if the walk would never reach the path
+        """
+        path = os.path.abspath(path)
+        if not path.startswith(self.root + os.sep):
+            return False
+        parent = self.root
+        for component in self.relative(path).split("/"):
+            current = os.path.join(parent, component)
+            is_dir = current != path or (os.path.isdir(path) and not os.path.islink(path))
+            if self._excluded(self.relative(current), is_dir, self.rules_for(parent)):
+                return True
+            parent = current
+        return False
+
+    def classify(self, path: str, is_dir: bool, is_file: bool, stat=None) -> str:
+        """
+        Classify a path that was not excluded.
+        
+        @param path: Absolute path
+        @param is_dir: Whether the path is a directory (not following symlinks)
+        @param is_file: Whether the path is a regular file (not following symlinks)
+        @param stat: Callable returning the path's os.stat_result, used for the size limit
+        @return: "dir", "file", "large" (over max_file_size) or "other" (symlinks and special files)
+        """
+        if is_dir:
+            return "dir"
+        if not is_file:
+            return "other"
+        if self.options.max_file_size is not None:
+            try:
+                size = (stat or (lambda: os.stat(path)))().st_size
+            except OSError:
+                return "other"
+            if size > self.options.max_file_size:
+                return "large"
+        return "file"
+
+    def walk(self, directory: str = None):
+        """
+        Walk a directory below the root depth-first, skipping excluded entries.
+        
+        Each entry costs one getdents() batch per directory plus, only when a size
+        limit is set, one stat() per file; directories are yielded before their contents.
+        
+        @param directory: Absolute directory at or below the root. None walks the root
+        @return: Generator of (absolute path, path relative to directory, kind) with kind as in classify()
+        """
+        directory = os.path.abspath(directory or self.root)
+        stack = [(directory, "")]
+        while stack:
+            current, current_relative = stack.pop()
+            rules = self.rules_for(current)
+            try:
+                with os.scandir(current) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirectories = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    is_file = not is_dir and entry.is_file(follow_symlinks=False)
+                except OSError:
+                    continue
+                if self._excluded(self.relative(entry.path), is_dir, rules):
+                    continue
+                relative_path = f"{current_relative}{entry.name}"
+                kind = self.classify(entry.path, is_dir, is_file, lambda: entry.stat(follow_symlinks=False))
+                yield entry.path, relative_path.replace("/", os.sep), kind
+                if kind == "dir":
+                    subdirectories.append((entry.path, relative_path + "/"))
+            stack.extend(reversed(subdirectories))
+
+
+def _clone_file(src_path: str, dst_path: str) -> bool:
+    """
+    Copy a file without moving its bytes through user space.
+    
+    Tries a reflink (FICLONE: btrfs, XFS, bcachefs, ...) first, then
+    copy_file_range(), which lets the kernel or a network filesystem copy server-side.
+    
+    @param src_path: Source file
+    @param dst_path: Destination file, created or truncated
+    @return: True on success, False if neither mechanism is available (dst_path may be left truncated)
+    """
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        try:
+            import fcntl
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except (ImportError, OSError):
+            pass
+        if not hasattr(os, "copy_file_range"):
+            return False
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            return False
+        return remaining == 0
+
+
+def passthrough_file(src_path: str, dst_path: str, mode: str = "copy") -> None:
+    """
+    Put a file that is not obfuscated into the output tree.
+    
+    hardlink and reflink fall back to a regular copy where the filesystem does not
+    support them (for example across devices). With hardlink, the output shares
+    the file with the input, so editing one edits the other.
+    
+    @param src_path: Source file
+    @param dst_path: Destination path
+    @param mode: One of PASSTHROUGH_MODES
+    @return: None
+    """
+    if mode == "skip":
+        return
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    if os.path.lexists(dst_path):
+        # Never write through a hardlink left by an earlier run into the input file.
+        os.unlink(dst_path)
+    if mode == "hardlink":
+        try:
+            os.link(src_path, dst_path)
+            return
+        except OSError:
+            pass
+    elif mode == "reflink":
+        if _clone_file(src_path, dst_path):
+            shutil.copystat(src_path, dst_path)
+            return
+    shutil.copy2(src_path, dst_path)
@@ -0,0 +1,283 @@
+import abc
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+# Wait this long without new events before handing a batch over, but never
+# longer than DEBOUNCE_MAX_DELAY after the first event of the batch.
+DEBOUNCE_QUIET = 0.2
+DEBOUNCE_MAX_DELAY = 1.0
+
+POLL_INTERVAL = 0.5
+
+
+class Watcher(abc.ABC):
+    """
+    Base class of the change sources used by watch mode.
+    
+    Subclasses implement read_changes(). A returned path equal to one of the
+    roots means "rescan that whole root".
+    """
+
+    def __init__(self, roots: list, ignore=None):
+        """
+        Initialize the watcher.
+        
+        @param roots: Absolute paths of the directories to watch
+        @param ignore: Optional callable (absolute path) -> bool for paths to leave out
+        @return: None
+        """
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.ignore = ignore or (lambda path: False)
+
+    @abc.abstractmethod
+    def read_changes(self, timeout: float = None) -> set:
+        """
+        Wait up to timeout seconds for changes.
+        
+        @param timeout: Seconds to wait, or None to wait until something changes
+        @return: Set of absolute paths that were created, modified or deleted (may be empty)
+        """
+
+    def wait_for_changes(self, quiet: float = DEBOUNCE_QUIET, max_delay: float = DEBOUNCE_MAX_DELAY) -> set:
+        """
+        Block until something changes, then keep collecting until the burst settles.
+        
+        A burst such as a git checkout is reported as one batch once no new event
+        arrived for quiet seconds, or max_delay seconds after it started.
+        
+        @param quiet: Quiet period that ends a burst
+        @param max_delay: Upper bound on how long a batch is held back
+        @return: Set of changed absolute paths
+        """
+        changes = set()
+        while not changes:
+            changes = self.read_changes(None)
+        deadline = time.monotonic() + max_delay
+        while True:
+            remaining = min(quiet, deadline - time.monotonic())
+            if remaining <= 0:
+                break
+            more = self.read_changes(remaining)
+            if not more:
+                break
+            changes |= more
+        return changes
+
+    def close(self) -> None:
+        """
+        Release resources held by the watcher.
+        
+        @return: None
+        """
+
+
+class PollingWatcher(Watcher):
+    """
+    Portable watcher that compares stat snapshots of the trees at a fixed interval.
+    """
+
+    def __init__(self, roots: list, ignore=None, interval: float = POLL_INTERVAL):
+        """
+        Take the initial snapshot.
+        
+        @param roots: Absolute paths of the directories to watch
+        @param ignore: Optional callable (absolute path) -> bool for paths to leave out
+        @param interval: Seconds between two scans
+        @return: None
+        """
+        super().__init__(roots, ignore)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict:
+        """
+        Stat every file and directory below the roots, without following symlinks.
+        
+        Directories are only recorded as present: their mtime changes whenever an
+        entry is added or removed, and those entries are reported on their own.
+        
+        @return: Dict of absolute path to (mtime_ns, size), or None for directories
+        """
+        snapshot = {}
+        stack = list(self.roots)
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if self.ignore(entry.path):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        snapshot[entry.path] = None
+                        stack.append(entry.path)
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read_changes(self, timeout: float = None) -> set:
+        """
+        Rescan after the poll interval (or timeout, if shorter) and diff against the last snapshot.
+        
+        @param timeout: Seconds to wait, or None for one poll interval
+        @return: Set of changed absolute paths
+        """
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        snapshot = self._scan()
+        changes = set(snapshot.keys() ^ self.snapshot.keys())
+        changes.update(path for path, state in snapshot.items()
+                       if state is not None and path in self.snapshot and self.snapshot[path] != state)
+        self.snapshot = snapshot
+        return changes
+
+
+class InotifyWatcher(Watcher):
+    """
+    Linux watcher built on inotify through ctypes, with one watch per directory.
+    """
+
+    def __init__(self, roots: list, ignore=None):
+        """
+        Create the inotify instance and watch every directory below the roots.
+        
+        @param roots: Absolute paths of the directories to watch
+        @param ignore: Optional callable (absolute path) -> bool for paths to leave out
+        @return: None
+        """
+        super().__init__(roots, ignore)
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._add_watch.restype = ctypes.c_int
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.directories = {}
+        for root in self.roots:
+            self._watch_tree(root)
+
+    def _watch_tree(self, directory: str) -> None:
+        """
+        Add watches for a directory and every directory below it.
+        
+        @param directory: Absolute path
+        @return: None
+        """
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            if self.ignore(current):
+                continue
+            wd = self._add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if current in self.roots:
+                    raise OSError(errno, f"{os.strerror(errno)}: {current}")
+                continue
+            self.directories[wd] = current
+            try:
+                stack.extend(entry.path for entry in os.scandir(current)
+                             if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+
+    def read_changes(self, timeout: float = None) -> set:
+        """
+        Read pending inotify events.
+        
+        @param timeout: Seconds to wait, or None to wait until an event arrives
+        @return: Set of changed absolute paths
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return set()
+        changes = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                changes.update(self.roots)
+                continue
+            directory = self.directories.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.directories[wd]
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                changes.add(directory)
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if self.ignore(path):
+                continue
+            if mask & IN_ISDIR:
+                if not mask & (IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path)
+            changes.add(path)
+        return changes
+
+    def close(self) -> None:
+        """
+        Close the inotify file descriptor.
+        
+        @return: None
+        """
+        os.close(self.fd)
+
+
+def create_watcher(roots: list, ignore=None, polling: bool = False) -> Watcher:
+    """
+    Create the best available watcher: inotify on Linux, stat polling elsewhere.
+    
+    @param roots: Absolute paths of the directories to watch
+    @param ignore: Optional callable (absolute path) -> bool for paths to leave out
+    @param polling: Force the polling watcher
+    @return: Watcher instance
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots, ignore)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, ignore)
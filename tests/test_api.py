@@ -0,0 +1,75 @@
+import itertools
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api import ITEMS_IN_FLIGHT_PER_JOB, obfuscate, obfuscate_many
+from src.cache import ResultCache
+from src.options import ObfuscationOptions
+
+
+ITEMS = [
+    ("app.py", "def double(value):\n    return value * 2\n"),
+    ("web/main.js", "function greet(name) {\n  return 'hi ' + name;\n}\n"),
+    ("broken.py", "def broken(:\n    pass\n"),
+    ("native/shapes.c", "int area(int width, int height) {\n    return width * height;\n}\n"),
+    ("lib.rs", "fn main() {}\n"),
+    ("server.go", "package main\n\nfunc double(value int) int {\n\treturn value * 2\n}\n"),
+    ("notes.txt", "not code\n"),
+]
+
+
+class ObfuscateManyTest(unittest.TestCase):
+
+    def test_results_follow_input_order(self):
+        options = ObfuscationOptions(seed=4)
+        serial = list(obfuscate_many(ITEMS, options=options))
+        pooled = list(obfuscate_many(ITEMS, options=options, jobs=3))
+        self.assertEqual([result.path for result in pooled], [path for path, _ in ITEMS])
+        self.assertEqual([result.output for result in pooled], [result.output for result in serial])
+        self.assertEqual([result.ok for result in pooled], [True, True, False, True, False, True, False])
+        self.assertIn("SyntaxError", pooled[2].error)
+        self.assertIn("Rust", pooled[4].error)
+        self.assertIn("Unsupported language", pooled[6].error)
+
+    def test_input_is_consumed_a_window_at_a_time(self):
+        consumed = []
+
+        def endless():
+            for index in itertools.count():
+                consumed.append(index)
+                yield f"file{index}.py", f"value{index} = {index}\n"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = obfuscate_many(endless(), options=ObfuscationOptions(seed=1), jobs=2, executor=executor)
+            first = list(itertools.islice(results, 5))
+            results.close()
+        self.assertEqual([result.path for result in first], [f"file{index}.py" for index in range(5)])
+        self.assertTrue(all(result.ok for result in first))
+        self.assertLessEqual(len(consumed), 2 * ITEMS_IN_FLIGHT_PER_JOB + 5)
+
+    def test_paths_are_read_from_disk(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "app.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(ITEMS[0][1])
+            missing = os.path.join(root, "missing.py")
+            results = list(obfuscate_many([path, missing], options=ObfuscationOptions(seed=4)))
+        self.assertTrue(results[0].ok)
+        self.assertIn("double", results[0].identifier_map)
+        self.assertIn("FileNotFoundError", results[1].error)
+
+    def test_cached_results_have_no_identifier_map(self):
+        with tempfile.TemporaryDirectory() as root:
+            cache = ResultCache(root)
+            options = ObfuscationOptions(seed=4)
+            first = obfuscate(ITEMS[0][1], "python", options, "app.py", cache=cache)
+            second = obfuscate(ITEMS[0][1], "python", options, "app.py", cache=cache)
+        self.assertEqual(second.output, first.output)
+        self.assertIsNotNone(first.identifier_map)
+        self.assertIsNone(second.identifier_map)
+
+
+if __name__ == "__main__":
+    unittest.main()
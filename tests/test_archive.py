@@ -0,0 +1,121 @@
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from src.archive import archive_suffix, shittified_archive_path
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+MEMBERS = {
+    "app.py": b"def double(value):\n    return value * 2\n",
+    "web/main.js": b"function greet(name) {\n  return 'hi ' + name;\n}\n",
+    "docs/notes.txt": b"not code\n",
+    "native/lib.rs": b"fn main() {}\n",
+}
+
+
+def add_tar_member(archive: tarfile.TarFile, name: str, data: bytes) -> None:
+    """
+    Add an in-memory file to a tar archive.
+    
+    @param archive: Archive opened for writing
+    @param name: Member name
+    @param data: Member contents
+    @return: None
+    """
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = 0o644
+    archive.addfile(info, io.BytesIO(data))
+
+
+def read_members(path: str) -> dict:
+    """
+    Read the regular members of a tar or zip archive.
+    
+    @param path: Archive path
+    @return: Dict of member name to contents
+    """
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            return {name: archive.read(name) for name in archive.namelist() if not name.endswith("/")}
+    with tarfile.open(path) as archive:
+        return {member.name: archive.extractfile(member).read() for member in archive.getmembers() if member.isfile()}
+
+
+class ArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.root = self.workdir.name
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def run_cli(self, *args: str) -> subprocess.CompletedProcess:
+        """
+        Run main.py with a fixed seed in the work directory and check that it succeeds.
+        
+        @param args: Command-line arguments
+        @return: Completed process with captured text output
+        """
+        result = subprocess.run([sys.executable, MAIN, "--no-cache", "--seed", "1", *args],
+                                cwd=self.root, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        return result
+
+    def test_archive_names(self):
+        self.assertEqual(archive_suffix("src.TAR.GZ"), ".tar.gz")
+        self.assertEqual(archive_suffix("src.tgz"), ".tgz")
+        self.assertIsNone(archive_suffix("src.gz"))
+        self.assertEqual(shittified_archive_path("dist/src.tar.gz"), "dist/src.shittified.tar.gz")
+        self.assertEqual(shittified_archive_path("src.zip"), "src.shittified.zip")
+        with self.assertRaises(ValueError):
+            shittified_archive_path("src.py")
+
+    def test_tar_and_zip_members_are_handled_like_files(self):
+        with tarfile.open(os.path.join(self.root, "src.tar.gz"), "w:gz") as archive:
+            for name, data in MEMBERS.items():
+                add_tar_member(archive, name, data)
+            link = tarfile.TarInfo("app_link.py")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "app.py"
+            archive.addfile(link)
+        with zipfile.ZipFile(os.path.join(self.root, "src.zip"), "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, data in MEMBERS.items():
+                archive.writestr(name, data)
+        for name, data in MEMBERS.items():
+            path = os.path.join(self.root, "tree", name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        self.run_cli("src.tar.gz", "src.zip")
+        self.run_cli("--output-dir", "mirror", "tree")
+        with open(os.path.join(self.root, "mirror", "tree", "app.shittified.py"), "rb") as f:
+            expected_python = f.read()
+
+        for output in ("src.shittified.tar.gz", "src.shittified.zip"):
+            with self.subTest(output=output):
+                members = read_members(os.path.join(self.root, output))
+                self.assertEqual(set(members), {"app.shittified.py", "web/main.shittified.js", "docs/notes.txt"})
+                self.assertEqual(members["docs/notes.txt"], MEMBERS["docs/notes.txt"])
+                self.assertEqual(members["app.shittified.py"], expected_python)
+                self.assertNotIn(b"greet", members["web/main.shittified.js"])
+
+    def test_broken_archive_is_reported(self):
+        with open(os.path.join(self.root, "broken.zip"), "wb") as f:
+            f.write(b"not a zip file")
+        result = subprocess.run([sys.executable, MAIN, "--no-cache", "broken.zip"],
+                                cwd=self.root, capture_output=True, text=True)
+        self.assertIn("Unable to process archive", result.stdout)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "broken.shittified.zip")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from benchmarks.corpus import LANGUAGES, REGIMES, generate_corpus
+from benchmarks.suite import ENGINES, REPOSITORY_ROOT, RESULTS_VERSION, compare, measure
+
+
+def result(engine: str, mb_per_s: float, peak_rss_mb: float = 100.0, errors=()) -> dict:
+    """
+    Build a result dict like measure() returns.
+    
+    @param engine: Engine name
+    @param mb_per_s: Throughput
+    @param peak_rss_mb: Peak RSS
+    @param errors: Error messages
+    @return: Result dict for the "minified" regime
+    """
+    return {"engine": engine, "regime": "minified", "corpus": "same", "seconds": 1.0, "mb_per_s": mb_per_s,
+            "peak_rss_mb": peak_rss_mb, "errors": list(errors)}
+
+
+class CorpusTest(unittest.TestCase):
+
+    def test_corpora_are_deterministic(self):
+        for language in LANGUAGES:
+            with self.subTest(language=language):
+                corpus = generate_corpus(language, "small-files", scale=0.02, seed=3)
+                self.assertEqual(corpus, generate_corpus(language, "small-files", scale=0.02, seed=3))
+                self.assertNotEqual(corpus, generate_corpus(language, "small-files", scale=0.02, seed=4))
+
+    def test_every_engine_handles_every_regime(self):
+        for engine in ENGINES:
+            for regime in REGIMES:
+                with self.subTest(engine=engine, regime=regime):
+                    measured = measure(engine, regime, scale=0.02, seed=0, repeat=1)
+                    self.assertEqual(measured["errors"], [])
+                    self.assertGreater(measured["mb_per_s"], 0)
+
+
+class CompareTest(unittest.TestCase):
+
+    def test_regressions_beyond_the_thresholds(self):
+        baseline = {
+            ("c", "minified"): result("c", 10.0),
+            ("go", "minified"): result("go", 10.0),
+            ("javascript", "minified"): result("javascript", 10.0),
+            ("python-ast", "minified"): result("python-ast", 10.0),
+            ("typescript", "minified"): result("typescript", 10.0),
+            ("cpp", "minified"): result("cpp", 10.0),
+        }
+        current = {
+            ("c", "minified"): result("c", 9.5),
+            ("go", "minified"): result("go", 8.0),
+            ("javascript", "minified"): result("javascript", 10.0, peak_rss_mb=150.0),
+            ("python-ast", "minified"): result("python-ast", 10.0, errors=["a.py: SyntaxError"]),
+            ("typescript", "minified"): {"engine": "typescript", "regime": "minified", "errors": ["crashed"]},
+            ("python-libcst", "minified"): result("python-libcst", 10.0),
+        }
+        lines, regressions = compare(baseline, current, threshold=0.1, rss_threshold=0.1)
+        self.assertEqual(regressions, 4)
+        report = {line.split()[0]: line for line in lines[2:]}
+        self.assertTrue(report["c"].endswith("ok"))
+        self.assertIn("SLOWER", report["go"])
+        self.assertIn("MORE MEMORY", report["javascript"])
+        self.assertIn("NEW FAILURES", report["python-ast"])
+        self.assertIn("FAILED: crashed", report["typescript"])
+        self.assertTrue(report["python-libcst"].endswith("new"))
+        self.assertTrue(report["cpp"].endswith("missing"))
+
+    def test_compare_command_exit_status(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = {}
+            for name, speed in (("baseline", 10.0), ("same", 9.8), ("slower", 5.0)):
+                paths[name] = os.path.join(root, f"{name}.json")
+                with open(paths[name], "w", encoding="utf-8") as f:
+                    json.dump({"version": RESULTS_VERSION, "results": [result("c", speed)]}, f)
+            for name, status in (("same", 0), ("slower", 1)):
+                with self.subTest(current=name):
+                    completed = subprocess.run([sys.executable, "-m", "benchmarks.suite", "compare",
+                                                paths["baseline"], paths[name]],
+                                               cwd=REPOSITORY_ROOT, capture_output=True, text=True)
+                    self.assertEqual(completed.returncode, status, completed.stdout + completed.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.cache import ResultCache
+from src.options import ObfuscationOptions
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+class CacheSizeOptionTest(unittest.TestCase):
+
+    def test_non_positive_cache_size_is_a_usage_error(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "app.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("value = 1\n")
+            for size in ("0", "-5"):
+                with self.subTest(size=size):
+                    result = subprocess.run([sys.executable, MAIN, "--cache-dir", os.path.join(root, "cache"),
+                                             "--cache-size", size, path], capture_output=True, text=True)
+                    self.assertEqual(result.returncode, 2)
+                    self.assertIn("--cache-size must be at least 1", result.stdout)
+                    self.assertFalse(os.path.exists(os.path.join(root, "app.shittified.py")))
+
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.workdir.name, "cache"))
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_second_lookup_is_a_hit(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return f"result {len(calls)}"
+
+        config = ObfuscationOptions(seed=1).cache_config("app.py", "python")
+        self.assertEqual(self.cache.get_or_compute("value = 1\n", "python", config, compute), "result 1")
+        self.assertEqual(self.cache.get_or_compute("value = 1\n", "python", config, compute), "result 1")
+        self.assertEqual(len(calls), 1)
+
+    def test_source_language_and_options_are_part_of_the_key(self):
+        key = ResultCache.make_key("value = 1\n", "python", ObfuscationOptions(seed=1).cache_config("a.py", "python"))
+        self.cache.put(key, "cached")
+        misses = [
+            ("value = 2\n", "python", ObfuscationOptions(seed=1).cache_config("a.py", "python")),
+            ("value = 1\n", "javascript", ObfuscationOptions(seed=1).cache_config("a.py", "javascript")),
+            ("value = 1\n", "python", ObfuscationOptions(seed=2).cache_config("a.py", "python")),
+            ("value = 1\n", "python", ObfuscationOptions(seed=1).cache_config("b.py", "python")),
+            ("value = 1\n", "python", ObfuscationOptions(seed=1, engine="ast").cache_config("a.py", "python")),
+        ]
+        for source, language, config in misses:
+            with self.subTest(language=language, config=config):
+                self.assertIsNone(self.cache.get(ResultCache.make_key(source, language, config)))
+        self.assertEqual(self.cache.get(key), "cached")
+
+    def test_prune_evicts_least_recently_used_entries(self):
+        self.cache.max_bytes = 2500
+        for index in range(3):
+            key = ResultCache.make_key(f"value = {index}\n", "python")
+            self.cache.put(key, "x" * 1000)
+            path = self.cache._entry_path(key)
+            os.utime(path, (1000 + index, 1000 + index))
+        self.assertIsNotNone(self.cache.get(ResultCache.make_key("value = 0\n", "python")))
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertIsNone(self.cache.get(ResultCache.make_key("value = 1\n", "python")))
+        self.assertIsNotNone(self.cache.get(ResultCache.make_key("value = 0\n", "python")))
+        self.assertIsNotNone(self.cache.get(ResultCache.make_key("value = 2\n", "python")))
+
+    def test_unseeded_cli_run_reuses_the_cached_output(self):
+        path = os.path.join(self.workdir.name, "app.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("def double(value):\n    return value * 2\n")
+        outputs = []
+        for _ in range(2):
+            result = subprocess.run([sys.executable, MAIN, "--cache-dir", self.cache.cache_dir, path],
+                                    capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+            with open(os.path.join(self.workdir.name, "app.shittified.py"), encoding="utf-8") as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
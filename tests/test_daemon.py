@@ -0,0 +1,99 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from src import daemon
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class RemoteFallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.workdir.name, "test.sock")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def serve_once(self, reply: bytes) -> threading.Thread:
+        """
+        Accept one connection, read the request header, answer with raw bytes and close.
+        
+        @param reply: Bytes sent back instead of a proper response
+        @return: Thread running the fake daemon
+        """
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        listener.listen(1)
+
+        def answer() -> None:
+            with listener:
+                connection, _ = listener.accept()
+                with connection:
+                    connection.recv(daemon.HEADER.size)
+                    connection.sendall(reply)
+
+        thread = threading.Thread(target=answer, daemon=True)
+        thread.start()
+        return thread
+
+    def test_missing_daemon(self):
+        self.assertIsNone(daemon.obfuscate_remote(self.socket_path, "x = 1\n", "python"))
+
+    def test_broken_responses_fall_back(self):
+        replies = {
+            "closed": b"",
+            "truncated": daemon.HEADER.pack(100) + b"{}",
+            "oversized": daemon.HEADER.pack(daemon.MAX_MESSAGE_BYTES + 1),
+            "not_json": daemon.HEADER.pack(3) + b"{x}",
+            "not_utf8": daemon.HEADER.pack(2) + b"\xff\xfe",
+            "not_an_object": daemon.HEADER.pack(2) + b"[]",
+            "no_output": daemon.HEADER.pack(11) + b'{"ok":true}',
+        }
+        for label, reply in replies.items():
+            with self.subTest(reply=label):
+                thread = self.serve_once(reply)
+                self.assertIsNone(daemon.obfuscate_remote(self.socket_path, "x = 1\n", "python"))
+                thread.join(5)
+                os.unlink(self.socket_path)
+
+    def test_daemon_errors_are_raised(self):
+        thread = self.serve_once(daemon.HEADER.pack(28) + b'{"ok":false,"error":"boom!"}')
+        with self.assertRaisesRegex(RuntimeError, "boom!"):
+            daemon.obfuscate_remote(self.socket_path, "x = 1\n", "python")
+        thread.join(5)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class WorkerDaemonTest(unittest.TestCase):
+
+    def test_pool_workers_send_files_to_the_daemon(self):
+        import main
+
+        with tempfile.TemporaryDirectory() as root:
+            socket_path = os.path.join(root, "test.sock")
+            server = daemon.ObfuscationServer(socket_path, lambda source, language, *options: f"# daemon {language}\n")
+            thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+            thread.start()
+            tasks = []
+            for index in range(4):
+                src_path = os.path.join(root, f"file{index}.py")
+                with open(src_path, "w", encoding="utf-8") as f:
+                    f.write(f"value = {index}\n")
+                tasks.append((src_path, os.path.join(root, f"out{index}.py"), f"file{index}.py"))
+            previous, main._daemon_socket = main._daemon_socket, socket_path
+            try:
+                self.assertEqual(main.run_file_tasks(tasks, jobs=2), 0)
+            finally:
+                main._daemon_socket = previous
+                server.shutdown()
+                server.server_close()
+            for _, dst_path, _ in tasks:
+                with open(dst_path, "r", encoding="utf-8") as f:
+                    self.assertEqual(f.read(), "# daemon python\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def git(repository: str, *args: str) -> None:
+    """
+    Run a git command in a test repository.
+    
+    @param repository: Repository directory
+    @param args: git subcommand and arguments
+    @return: None
+    """
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                   cwd=repository, check=True, capture_output=True)
+
+
+def write(path: str, text: str) -> None:
+    """
+    Write a text file, creating its directory.
+    
+    @param path: File path
+    @param text: File content
+    @return: None
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@unittest.skipUnless(shutil.which("git"), "needs git")
+class StagedChangesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.repository = os.path.join(self.workdir.name, "repo")
+        self.project = os.path.join(self.repository, "project")
+        self.output = os.path.join(self.repository, "shittified_project")
+        self.tmp = os.path.join(self.workdir.name, "tmp")
+        os.mkdir(self.tmp)
+        write(os.path.join(self.project, "pkg", "calc.py"), "def double(value):\n    return value * 2\n")
+        write(os.path.join(self.project, "old.py"), "def unused():\n    return 0\n")
+        write(os.path.join(self.project, "notes.txt"), "first\n")
+        git(self.repository, "init", "-q")
+        git(self.repository, "add", ".")
+        git(self.repository, "commit", "-q", "-m", "initial")
+        self.run_cli()
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def run_cli(self, *args: str) -> None:
+        """
+        Run main.py on the project directory.
+        
+        @param args: Extra command-line arguments
+        @return: None
+        """
+        result = subprocess.run([sys.executable, MAIN, "--no-cache", "--seed", "7", *args, self.project],
+                                capture_output=True, text=True, env=dict(os.environ, TMPDIR=self.tmp))
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+    def read_output(self, *parts: str) -> str:
+        """
+        Read a file of the mirror.
+        
+        @param parts: Path components below the mirror
+        @return: File content
+        """
+        with open(os.path.join(self.output, *parts), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_staged_reads_the_index_not_the_working_tree(self):
+        write(os.path.join(self.project, "pkg", "calc.py"), "def triple(value):\n    return value * 3\n")
+        write(os.path.join(self.project, "notes.txt"), "staged\n")
+        git(self.repository, "add", ".")
+        git(self.repository, "rm", "-q", "--cached", "project/old.py")
+        write(os.path.join(self.project, "pkg", "calc.py"), "def triple(value):\n    return value * 3 + 'unstaged'\n")
+        write(os.path.join(self.project, "notes.txt"), "unstaged\n")
+        self.run_cli("--staged")
+
+        code = self.read_output("pkg", "calc.shittified.py")
+        self.assertIn("3", code)
+        self.assertNotIn("unstaged", code)
+        self.assertEqual(self.read_output("notes.txt"), "staged\n")
+        self.assertFalse(os.path.exists(os.path.join(self.output, "old.shittified.py")))
+        self.assertEqual(os.listdir(self.tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
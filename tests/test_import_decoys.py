@@ -0,0 +1,50 @@
+import dis
+import random
+import types
+import unittest
+from unittest import mock
+
+from src.transformer import ENGINES, obfuscate_code_with_ast
+from src.utils import preloaded_libraries
+
+
+SOURCE = "import json\n\n\ndef encode(value):\n    text = json.dumps(value)\n    return text\n\n\nresult = encode([1])\n"
+
+
+def imported_modules(code: types.CodeType) -> set:
+    """
+    Collect the modules a code object and the code nested in it can import.
+    
+    @param code: Compiled code
+    @return: Set of module names
+    """
+    modules = {instruction.argval for instruction in dis.get_instructions(code) if instruction.opname == "IMPORT_NAME"}
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            modules |= imported_modules(const)
+    return modules
+
+
+class ImportDecoyTest(unittest.TestCase):
+
+    def test_decoy_block_is_compiled_away(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                code = obfuscate_code_with_ast(SOURCE, rng=random.Random(0), engine=engine)
+                self.assertIn("if False:", code)
+                self.assertIn("time.sleep(1)", code)
+                self.assertLessEqual(imported_modules(compile(code, "<obfuscated>", "exec")),
+                                     {"json", *preloaded_libraries})
+
+    def test_importing_runs_no_decoy_calls(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                code = obfuscate_code_with_ast(SOURCE, rng=random.Random(0), engine=engine)
+                with mock.patch("time.sleep") as sleep:
+                    namespace = {"__name__": "obfuscated"}
+                    exec(compile(code, "<obfuscated>", "exec"), namespace)
+                sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
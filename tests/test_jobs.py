@@ -0,0 +1,73 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import main
+from src.options import ObfuscationOptions
+
+
+SOURCES = {
+    "app.py": "def scale(value, factor=2):\n    result = value * factor\n    return result\n",
+    "tool.py": "import os\n\n\ndef here():\n    path = os.getcwd()\n    return path\n",
+    "web.js": "function greet(name) {\n  const text = 'hi ' + name;\n  return text;\n}\n",
+    "shapes.c": "int area(int width, int height) {\n    int result = width * height;\n    return result;\n}\n",
+    "server.go": "package main\n\nfunc double(value int) int {\n\tresult := value * 2\n\treturn result\n}\n",
+    "broken.py": "def broken(:\n    pass\n",
+}
+
+
+class ProcessPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.root = self.workdir.name
+        for name, source in SOURCES.items():
+            with open(os.path.join(self.root, name), "w", encoding="utf-8") as f:
+                f.write(source)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def run_tasks(self, output: str, jobs: int) -> tuple:
+        """
+        Obfuscate every source into an output directory.
+        
+        @param output: Name of the output directory under the work directory
+        @param jobs: Number of worker processes
+        @return: (failure count, failed tasks, printed output, outputs by source name)
+        """
+        os.mkdir(os.path.join(self.root, output))
+        tasks = [(os.path.join(self.root, name), os.path.join(self.root, output, name), name)
+                 for name in sorted(SOURCES)]
+        failed = []
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            failures = main.run_file_tasks(tasks, jobs=jobs, options=ObfuscationOptions(seed=3), failed=failed)
+        outputs = {}
+        for name in sorted(SOURCES):
+            path = os.path.join(self.root, output, name)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    outputs[name] = f.read()
+        return failures, [task[2] for task in failed], printed.getvalue(), outputs
+
+    def test_pool_matches_a_serial_run(self):
+        serial = self.run_tasks("serial", jobs=1)
+        pooled = self.run_tasks("pooled", jobs=3)
+        self.assertEqual(serial[0], 1)
+        self.assertEqual(serial[1], ["broken.py"])
+        self.assertEqual(pooled[:2], serial[:2])
+        self.assertEqual(pooled[3], serial[3])
+        self.assertEqual(set(pooled[3]), set(SOURCES) - {"broken.py"})
+
+    def test_pool_replays_messages_in_task_order(self):
+        printed = self.run_tasks("pooled", jobs=3)[2]
+        positions = [printed.find(name) for name in sorted(SOURCES)]
+        self.assertNotIn(-1, positions, printed)
+        self.assertEqual(positions, sorted(positions))
+
+
+if __name__ == "__main__":
+    unittest.main()
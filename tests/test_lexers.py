@@ -0,0 +1,150 @@
+import random
+import unittest
+
+from src.language_transformers import shittify_c_cpp, shittify_go, shittify_javascript_typescript
+from src.lexers import GO_TOKEN_PATTERN, iter_javascript_tokens, iter_tokens
+
+
+C_SOURCE = r'''#include <stdio.h>
+#define GREETING(name) \
+    "hello " name
+/* counter: counts
+   the widgets */
+int counter = 0; // counter starts at 0
+const char *label = "counter \"quoted\" // not a comment";
+const char *raw = R"tag(counter )" /* still raw */)tag";
+char quote = '\'';
+int bump(int step) {
+    counter += step;
+    return counter;
+}
+'''
+
+JS_SOURCE = r'''#!/usr/bin/env node
+// total of the items
+function total(items) {
+  const label = 'total: "items"';
+  const pattern = /total\/[a-z]+/g;
+  const ratio = items.length / 2 / total.length;
+  const text = `total ${items.length} of ${`nested ${label}`} items // kept`;
+  /* total
+     block */
+  return text.replace(pattern, "total");
+}
+'''
+
+GO_SOURCE = '''package main
+
+import (
+\t"fmt"
+\tstr "strings"
+)
+
+// greet builds a greeting
+func greet(name string) string {
+\tpattern := `greet "name"
+\t// not a comment`
+\tquote := '\\''
+\t/* greet
+\t   block */
+\treturn fmt.Sprintf("greet %s %c", str.ToUpper(name), quote) + pattern
+}
+'''
+
+
+def kinds_of(tokens) -> dict:
+    """
+    Group token texts by kind.
+    
+    @param tokens: Iterable of (kind, text) tuples
+    @return: Dict of kind to list of texts, in order
+    """
+    kinds = {}
+    for kind, text in tokens:
+        kinds.setdefault(kind, []).append(text)
+    return kinds
+
+
+class CLexerTest(unittest.TestCase):
+
+    def test_tokens_concatenate_to_the_input(self):
+        tokens = list(iter_tokens(C_SOURCE))
+        self.assertEqual("".join(text for _, text in tokens), C_SOURCE)
+
+    def test_strings_comments_and_directives_are_single_tokens(self):
+        kinds = kinds_of(iter_tokens(C_SOURCE))
+        self.assertEqual(kinds["directive"], ["#include <stdio.h>", '#define GREETING(name) \\\n    "hello " name'])
+        self.assertEqual(kinds["block_comment"], ["/* counter: counts\n   the widgets */"])
+        self.assertEqual(kinds["line_comment"], ["// counter starts at 0"])
+        self.assertEqual(kinds["string"], ['"counter \\"quoted\\" // not a comment"'])
+        self.assertEqual(kinds["raw_string"], ['R"tag(counter )" /* still raw */)tag"'])
+        self.assertEqual(kinds["char"], ["'\\''"])
+
+    def test_backend_keeps_literals_and_comments_verbatim(self):
+        output = shittify_c_cpp(C_SOURCE, rng=random.Random(1))
+        for literal in ('"counter \\"quoted\\" // not a comment"', 'R"tag(counter )" /* still raw */)tag"',
+                        "'\\''", "/* counter: counts\n   the widgets */", "// counter starts at 0"):
+            with self.subTest(literal=literal):
+                self.assertIn(literal, output)
+        code = "".join(text for kind, text in iter_tokens(output) if kind == "identifier")
+        self.assertNotIn("counter", code)
+        self.assertNotIn("bump", code)
+
+
+
+class JavaScriptLexerTest(unittest.TestCase):
+
+    def test_tokens_concatenate_to_the_input(self):
+        tokens = list(iter_javascript_tokens(JS_SOURCE))
+        self.assertEqual("".join(text for _, text in tokens), JS_SOURCE)
+
+    def test_templates_regexes_strings_and_comments(self):
+        kinds = kinds_of(iter_javascript_tokens(JS_SOURCE))
+        self.assertEqual(kinds["template"], ["`total ${", "} of ${", "`nested ${", "}`", "} items // kept`"])
+        self.assertEqual(kinds["regex"], ["/total\\/[a-z]+/g"])
+        self.assertEqual(kinds["string"], ["'total: \"items\"'", '"total"'])
+        self.assertEqual(kinds["line_comment"], ["#!/usr/bin/env node", "// total of the items"])
+        self.assertEqual(kinds["block_comment"], ["/* total\n     block */"])
+        self.assertEqual(kinds["punct"].count("/"), 2)
+
+    def test_backend_keeps_literals_and_renames_substitutions(self):
+        output = shittify_javascript_typescript(JS_SOURCE, rng=random.Random(1))
+        for literal in ("'total: \"items\"'", "/total\\/[a-z]+/g", "`total ${", "} items // kept`", "`nested ${",
+                        "/* total\n     block */", "// total of the items"):
+            with self.subTest(literal=literal):
+                self.assertIn(literal, output)
+        identifiers = [text for kind, text in iter_javascript_tokens(output) if kind == "identifier"]
+        for name in ("total", "items", "label"):
+            with self.subTest(name=name):
+                self.assertNotIn(name, identifiers)
+
+
+
+class GoLexerTest(unittest.TestCase):
+
+    def test_tokens_concatenate_to_the_input(self):
+        tokens = list(iter_tokens(GO_SOURCE, GO_TOKEN_PATTERN))
+        self.assertEqual("".join(text for _, text in tokens), GO_SOURCE)
+
+    def test_raw_strings_runes_and_comments(self):
+        kinds = kinds_of(iter_tokens(GO_SOURCE, GO_TOKEN_PATTERN))
+        self.assertEqual(kinds["raw_string"], ['`greet "name"\n\t// not a comment`'])
+        self.assertEqual(kinds["rune"], ["'\\''"])
+        self.assertEqual(kinds["string"], ['"fmt"', '"strings"', '"greet %s %c"'])
+        self.assertEqual(kinds["line_comment"], ["// greet builds a greeting"])
+        self.assertEqual(kinds["block_comment"], ["/* greet\n\t   block */"])
+
+    def test_backend_keeps_literals_and_package_selectors(self):
+        output = shittify_go(GO_SOURCE, rng=random.Random(1))
+        for literal in ('`greet "name"\n\t// not a comment`', "'\\''", '"greet %s %c"', 'str "strings"',
+                        "fmt.Sprintf(", "str.ToUpper(", "/* greet\n\t   block */", "// greet builds a greeting"):
+            with self.subTest(literal=literal):
+                self.assertIn(literal, output)
+        identifiers = [text for kind, text in iter_tokens(output, GO_TOKEN_PATTERN) if kind == "identifier"]
+        for name in ("greet", "name", "pattern", "quote"):
+            with self.subTest(name=name):
+                self.assertNotIn(name, identifiers)
+
+
+if __name__ == "__main__":
+    unittest.main()
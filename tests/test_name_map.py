@@ -0,0 +1,111 @@
+import difflib
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.name_map import create_name_map, update_name_map
+from src.symbol_index import open_symbol_index
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+class NameMapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "names.idx")
+
+    def tearDown(self):
+        open_symbol_index.cache_clear()
+        self.workdir.cleanup()
+
+    def test_open_index_follows_a_rewritten_map(self):
+        create_name_map(self.path, seed=1)
+        before = open_symbol_index(self.path)
+        self.assertEqual(update_name_map(self.path, {("python", "alpha"): "first_1"}), 1)
+        after = open_symbol_index(self.path)
+        self.assertNotEqual(before.digest, after.digest)
+        self.assertEqual(after.get("python", "alpha"), "first_1")
+
+    def test_unchanged_map_is_not_rewritten(self):
+        create_name_map(self.path, seed=1)
+        update_name_map(self.path, {("python", "alpha"): "first_1"})
+        digest = open_symbol_index(self.path).digest
+        self.assertEqual(update_name_map(self.path, {("python", "alpha"): "other_2"}), 0)
+        self.assertEqual(open_symbol_index(self.path).digest, digest)
+
+    def test_unseeded_runs_give_identical_output(self):
+        project = os.path.join(self.workdir.name, "project")
+        os.mkdir(project)
+        sources = {
+            "app.py": "def double(value):\n    return value * 2\n\n\nprint(double(4))\n",
+            "app.js": "function double(value) {\n  return value * 2;\n}\nconsole.log(double(4));\n",
+        }
+        for name, source in sources.items():
+            with open(os.path.join(project, name), "w", encoding="utf-8") as f:
+                f.write(source)
+        for output in ("first", "second"):
+            result = subprocess.run([sys.executable, MAIN, "--no-cache", "--name-map", self.path,
+                                     "--output-dir", output, "project"],
+                                    cwd=self.workdir.name, capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        for name in ("app.shittified.py", "app.shittified.js"):
+            with self.subTest(output=name):
+                self.assertTrue(filecmp.cmp(os.path.join(self.workdir.name, "first", "project", name),
+                                            os.path.join(self.workdir.name, "second", "project", name),
+                                            shallow=False))
+
+
+    def test_one_line_edit_gives_a_small_output_diff(self):
+        project = os.path.join(self.workdir.name, "project")
+        os.mkdir(project)
+        functions = {
+            "app.py": "def step{i}(value):\n    total = value + {i}\n    return total * 2\n\n\n",
+            "app.c": "int step{i}(int value) {{\n    int total = value + {i};\n    // step {i}\n    return total * 2;\n}}\n",
+            "app.js": "function step{i}(value) {{\n  const total = value + {i};\n  // step {i}\n  return total * 2;\n}}\n",
+            "app.go": "func step{i}(value int) int {{\n\ttotal := value + {i}\n\t// step {i}\n\treturn total * 2\n}}\n",
+        }
+        headers = {"app.py": "import os\n", "app.c": "#include <stdio.h>\n", "app.js": "", "app.go": "package main\n\n"}
+        edits = {
+            "app.py": ("    total = value + 7\n", "    total = value + 7\n    extra = total - 1\n"),
+            "app.c": ("    int total = value + 7;\n", "    int total = value + 7;\n    int extra = total - 1;\n"),
+            "app.js": ("  const total = value + 7;\n", "  const total = value + 7;\n  const extra = total - 1;\n"),
+            "app.go": ("\ttotal := value + 7\n", "\ttotal := value + 7\n\textra := total - 1\n"),
+        }
+        for name, template in functions.items():
+            with open(os.path.join(project, name), "w", encoding="utf-8") as f:
+                f.write(headers[name] + "".join(template.format(i=i) for i in range(40)))
+
+        def run(output):
+            result = subprocess.run([sys.executable, MAIN, "--no-cache", "--name-map", self.path,
+                                     "--output-dir", output, "project"],
+                                    cwd=self.workdir.name, capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+        run("before")
+        for name, (old, new) in edits.items():
+            path = os.path.join(project, name)
+            with open(path, encoding="utf-8") as f:
+                source = f.read()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(source.replace(old, new, 1))
+        run("after")
+        for name in functions:
+            output = name.replace(".", ".shittified.")
+            with self.subTest(output=output):
+                with open(os.path.join(self.workdir.name, "before", "project", output), encoding="utf-8") as f:
+                    before = f.read().splitlines()
+                with open(os.path.join(self.workdir.name, "after", "project", output), encoding="utf-8") as f:
+                    after = f.read().splitlines()
+                changed = [line for line in difflib.unified_diff(before, after, lineterm="", n=0)
+                           if line[:1] in "+-" and not line.startswith(("+++", "---"))]
+                # The added line and the decoys that follow it.
+                self.assertLessEqual(len(changed), 3, "\n".join(changed))
+
+
+if __name__ == "__main__":
+    unittest.main()
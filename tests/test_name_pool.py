@@ -0,0 +1,52 @@
+import random
+import re
+import unittest
+
+from src.name_table import PYTHON_RESERVED_WORDS
+from src.symbol_index import shared_name
+from src.utils import NamePool
+
+
+NAME_SHAPE = re.compile(r"[a-z][A-Za-z0-9]{6,9}_[1-9][0-9]{2}")
+
+
+class NamePoolTest(unittest.TestCase):
+
+    def test_names_are_unique_and_well_formed(self):
+        pool = NamePool(random.Random(0), reserved=PYTHON_RESERVED_WORDS, batch=8)
+        names = [pool.take() for _ in range(5000)]
+        self.assertEqual(len(set(names)), len(names))
+        for name in names:
+            self.assertRegex(name, NAME_SHAPE)
+            self.assertTrue(name.isidentifier())
+
+    def test_taken_names_are_skipped(self):
+        first = NamePool(random.Random(1)).take()
+        pool = NamePool(random.Random(1), taken={first}.__contains__)
+        self.assertNotEqual(pool.take(), first)
+
+    def test_same_generator_gives_the_same_names(self):
+        left = NamePool(random.Random(7), batch=4)
+        right = NamePool(random.Random(7), batch=64)
+        self.assertEqual([left.take("x") for _ in range(100)], [right.take("x") for _ in range(100)])
+
+
+class SharedNameTest(unittest.TestCase):
+
+    def test_shared_names_come_from_the_pool_generator(self):
+        name = shared_name(42, "c", "area")
+        self.assertRegex(name, NAME_SHAPE)
+        self.assertEqual(name, shared_name(42, "c", "area"))
+        self.assertNotEqual(name, shared_name(43, "c", "area"))
+        self.assertNotEqual(name, shared_name(42, "c", "volume"))
+        self.assertTrue(shared_name(42, "python", "area").isidentifier())
+
+    def test_clashing_shared_names_are_redrawn(self):
+        name = shared_name(42, "go", "area")
+        other = shared_name(42, "go", "area", taken={name}.__contains__)
+        self.assertNotEqual(other, name)
+        self.assertEqual(other, shared_name(42, "go", "area", taken={name}.__contains__))
+
+
+if __name__ == "__main__":
+    unittest.main()
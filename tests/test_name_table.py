@@ -0,0 +1,73 @@
+import ast
+import random
+import unittest
+
+from src.name_table import NameTable, is_reserved_name, parameter_names
+from src.transformer import obfuscate_code_with_ast
+from src.utils import NamePool
+
+
+SOURCE = '''class Scaler:
+    def __init__(self, factor):
+        self.factor = factor
+
+    def scale(self, amounts):
+        result = []
+        for value in amounts:
+            result.append(value * self.factor)
+        print(len(result), end="\\n")
+        return result
+
+
+scaled = Scaler(factor=2).scale([1, 2])
+'''
+
+
+class NameTableTest(unittest.TestCase):
+
+    def test_both_directions(self):
+        table = NameTable()
+        self.assertEqual(table.assign("alpha", "x1"), "x1")
+        table.assign("beta", "x2")
+        self.assertEqual(len(table), 2)
+        self.assertIn("alpha", table)
+        self.assertNotIn("x1", table)
+        self.assertEqual(table.get("alpha"), "x1")
+        self.assertEqual(table.get("gamma", "missing"), "missing")
+        self.assertEqual(table.original_of("x2"), "beta")
+        self.assertIsNone(table.original_of("beta"))
+        self.assertTrue(table.is_generated("x1"))
+        self.assertTrue(table.is_taken("x2"))
+        self.assertFalse(table.is_taken("alpha"))
+
+    def test_reserved_names(self):
+        for name in ("print", "len", "append", "__init__", "__dunder__"):
+            with self.subTest(name=name):
+                self.assertTrue(is_reserved_name(name))
+        self.assertFalse(is_reserved_name("scale"))
+
+    def test_pool_skips_names_the_table_uses(self):
+        table = NameTable()
+        first = NamePool(random.Random(5), taken=table.is_taken).take()
+        table.assign("alpha", first)
+        self.assertNotEqual(NamePool(random.Random(5), taken=table.is_taken).take(), first)
+
+    def test_transformers_record_every_rename(self):
+        self.assertEqual(parameter_names(ast.parse(SOURCE)), {"self", "factor", "amounts"})
+        for engine in ("libcst", "ast"):
+            with self.subTest(engine=engine):
+                table = NameTable()
+                table.assign("Scaler", "KeptName")
+                output = obfuscate_code_with_ast(SOURCE, rng=random.Random(1), engine=engine, names=table)
+                self.assertIn("class KeptName", output)
+                for name in ("scale", "factor", "amounts", "result", "value", "scaled"):
+                    self.assertIn(name, table)
+                    self.assertIn(table.get(name), output)
+                for name in ("print", "len", "append", "__init__", "end"):
+                    self.assertNotIn(name, table)
+                self.assertEqual(set(table.reverse), set(table.forward.values()))
+                compile(output, "<obfuscated>", "exec")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+class OutputInsideInputTest(unittest.TestCase):
+
+    def test_output_dir_inside_the_processed_directory_is_not_walked(self):
+        with tempfile.TemporaryDirectory() as project:
+            with open(os.path.join(project, "app.py"), "w", encoding="utf-8") as f:
+                f.write("def double(value):\n    return value * 2\n")
+            with open(os.path.join(project, "notes.txt"), "w", encoding="utf-8") as f:
+                f.write("not code\n")
+            for _ in range(2):
+                result = subprocess.run([sys.executable, MAIN, "--no-cache", "--output-dir", "out", "."],
+                                        cwd=project, capture_output=True, text=True)
+                self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+            self.assertEqual(sorted(os.listdir(os.path.join(project, "out"))), ["app.shittified.py", "notes.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import glob
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+class ProfileDumpTest(unittest.TestCase):
+
+    def test_project_files_are_rerun_with_the_symbol_index(self):
+        with tempfile.TemporaryDirectory() as root:
+            project = os.path.join(root, "project")
+            tmp = os.path.join(root, "tmp")
+            os.makedirs(project)
+            os.mkdir(tmp)
+            with open(os.path.join(project, "helpers.py"), "w", encoding="utf-8") as f:
+                f.write("def shared_helper(value):\n    return value + 1\n")
+            with open(os.path.join(project, "app.py"), "w", encoding="utf-8") as f:
+                f.write("from helpers import shared_helper\nprint(shared_helper(2))\n")
+            result = subprocess.run([sys.executable, MAIN, "--no-cache", "--seed", "3", "--project",
+                                     "--profile-dump", "dumps", "--output-dir", "out", "project"],
+                                    cwd=root, capture_output=True, text=True, env=dict(os.environ, TMPDIR=tmp))
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+            dumps = sorted(glob.glob(os.path.join(root, "dumps", "*.prof")))
+            self.assertEqual(len(dumps), 2, result.stderr)
+            for dump in dumps:
+                with self.subTest(dump=os.path.basename(dump)):
+                    modules = {os.path.basename(function[0]) for function in pstats.Stats(dump).stats}
+                    self.assertIn("symbol_index.py", modules)
+            self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.symbol_index import SymbolIndex, build_symbol_index, module_names
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+PROJECT_FILES = {
+    "util.py": "def scale(value, factor=2):\n    local_only = value * factor\n    return local_only\n",
+    "app.py": "from util import scale\n\n\ndef run(values):\n    return [scale(value, factor=3) for value in values]\n",
+    "shapes.h": "int area(int width, int height);\n",
+    "shapes.c": "#include \"shapes.h\"\nint area(int width, int height) {\n    return width * height;\n}\n",
+    "main.c": "#include \"shapes.h\"\nint main(void) {\n    return area(2, 3);\n}\n",
+    "web/greet.js": "export function greet(name) {\n  return 'hi ' + name;\n}\n",
+    "web/main.js": "import { greet } from './greet.js';\nconsole.log(greet('x'));\n",
+}
+
+
+class ProjectTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.root = self.workdir.name
+        self.project = os.path.join(self.root, "project")
+        for relative_path, source in PROJECT_FILES.items():
+            path = os.path.join(self.project, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(source)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def obfuscate(self, output: str, *args: str) -> dict:
+        """
+        Obfuscate the project with the CLI.
+        
+        @param output: Output directory name under the work directory
+        @param args: Extra command-line arguments
+        @return: Dict of output path relative to the mirror to contents
+        """
+        result = subprocess.run([sys.executable, MAIN, "--no-cache", "--seed", "1", *args, "--output-dir", output,
+                                 "project"], cwd=self.root, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        outputs = {}
+        for relative_path in PROJECT_FILES:
+            name, extension = os.path.splitext(relative_path)
+            with open(os.path.join(self.root, output, "project", f"{name}.shittified{extension}"),
+                      encoding="utf-8") as f:
+                outputs[relative_path] = f.read()
+        return outputs
+
+    def test_module_names(self):
+        self.assertEqual(module_names("pkg/util.py"), {"pkg", "util", "pkg.util"})
+        self.assertEqual(module_names("pkg/__init__.py"), {"pkg"})
+
+    def test_index_holds_identifiers_shared_within_a_family(self):
+        files = [(os.path.join(self.project, relative_path), relative_path) for relative_path in PROJECT_FILES]
+        path = os.path.join(self.root, "symbols.idx")
+        build_symbol_index(files, path, seed=1, jobs=1)
+        index = SymbolIndex(path)
+        try:
+            for family, name in (("python", "scale"), ("python", "factor"), ("c", "area"), ("javascript", "greet")):
+                with self.subTest(family=family, name=name):
+                    self.assertIsNotNone(index.get(family, name))
+            for family, name in (("python", "local_only"), ("python", "run"), ("c", "main"), ("python", "area")):
+                with self.subTest(family=family, name=name):
+                    self.assertIsNone(index.get(family, name))
+            self.assertNotEqual(index.get("python", "scale"), index.get("python", "factor"))
+        finally:
+            index.close()
+
+    def test_shared_identifiers_get_one_name_in_every_file(self):
+        outputs = self.obfuscate("with-project", "--project")
+        scale = re.search(r"def (\w+)\(", outputs["util.py"]).group(1)
+        self.assertRegex(outputs["app.py"], rf"from util import {scale}\b")
+        self.assertRegex(outputs["app.py"], rf"\b{scale}\(\w+, \w+=3\)")
+        area = re.search(r"int (\w+)\(int", outputs["shapes.h"]).group(1)
+        self.assertNotEqual(area, "area")
+        self.assertIn(f"int {area}(int", outputs["shapes.c"])
+        self.assertIn(f"{area}(2, 3)", outputs["main.c"])
+        greet = re.search(r"export function (\w+)\(", outputs["web/greet.js"]).group(1)
+        self.assertIn(f"import {{ {greet} }} from './greet.js'", outputs["web/main.js"])
+
+    def test_files_are_named_on_their_own_without_project(self):
+        outputs = self.obfuscate("without-project")
+        scale = re.search(r"def (\w+)\(", outputs["util.py"]).group(1)
+        self.assertNotRegex(outputs["app.py"], rf"\b{scale}\b")
+
+
+if __name__ == "__main__":
+    unittest.main()
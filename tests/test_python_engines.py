@@ -0,0 +1,216 @@
+import contextlib
+import io
+import random
+import sys
+import unittest
+from unittest import mock
+
+from src.name_table import NameTable
+from src.transformer import ENGINES, LIBCST_AVAILABLE, obfuscate_code_with_ast
+
+
+SAMPLES = {
+    "imports_and_attributes": '''
+import os.path
+import collections
+from functools import reduce as fold
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def total(self):
+        return self.x + self.y
+
+
+point = Point(1, 2)
+point.y = 5
+print(os.path.join("a", "b"), collections.Counter("aab")["a"], fold(lambda a, b: a + b, [1, 2, 3]))
+print(point.total(), point.x)
+''',
+    "parameters_and_keywords": '''
+def area(width, height=1, *sides, scale=1, **extra):
+    return width * height * scale + len(sides) + len(extra)
+
+
+print(area(2, height=3, scale=2), area(width=1), area(1, 2, 3, label="x"))
+print(sorted([3, 1, 2], key=lambda value: -value), end="!\\n")
+print(dict(alpha=1), "x".split(sep="x", maxsplit=1))
+
+
+def apply(function, **options):
+    return function(**options)
+
+
+print(apply(amount=3, function=lambda amount: amount + 1), apply(lambda size: size * 2, size=4))
+''',
+    "global_and_nonlocal": '''
+count = 0
+
+
+def bump():
+    global count
+    count += 1
+    return count
+
+
+def make_counter():
+    total = 0
+
+    def step(amount):
+        nonlocal total
+        total += amount
+        return total
+    return step
+
+
+counter = make_counter()
+bump()
+print(bump(), counter(2), counter(3), count)
+''',
+    "except_as": '''
+def parse(text):
+    try:
+        return int(text)
+    except ValueError as error:
+        return type(error).__name__
+    finally:
+        pass
+
+
+try:
+    raise KeyError("missing")
+except (KeyError, IndexError) as failure:
+    message = str(failure)
+print(parse("12"), parse("x"), message)
+''',
+    "comprehensions": '''
+values = [1, 2, 3, 4]
+squares = [value * value for value in values if value % 2 == 0]
+pairs = {key: [inner for inner in range(key)] for key in values}
+unique = {value % 3 for value in values}
+total = sum(item for row in pairs.values() for item in row)
+print(squares, pairs[3], sorted(unique), total, [last := value for value in values][0], last)
+''',
+}
+
+MATCH_SAMPLE = '''
+def describe(shape):
+    match shape:
+        case {"kind": "circle", "radius": radius}:
+            return f"circle {radius}"
+        case [first, *rest]:
+            return f"list {first} {len(rest)}"
+        case Point(x=0, y=height):
+            return f"on axis {height}"
+        case {"kind": kind, **others}:
+            return f"{kind} {sorted(others)}"
+        case str() as text:
+            return text.upper()
+        case _:
+            return "unknown"
+
+
+class Point:
+    __match_args__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+print(describe({"kind": "circle", "radius": 2}), describe([1, 2, 3]), describe(Point(0, 4)))
+print(describe({"kind": "square", "side": 1}), describe("abc"), describe(3))
+'''
+
+if sys.version_info >= (3, 10):
+    SAMPLES["match"] = MATCH_SAMPLE
+
+
+def run_source(source: str) -> str:
+    """
+    Execute a module as __main__ and capture what it prints.
+    
+    @param source: Python source code
+    @return: Captured standard output
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(compile(source, "<sample>", "exec"), {"__name__": "__main__"})
+    return output.getvalue()
+
+
+def obfuscate(source: str, engine: str) -> tuple:
+    """
+    Obfuscate a sample with one engine.
+    
+    @param source: Python source code
+    @param engine: Engine name from ENGINES
+    @return: Tuple of (obfuscated code, set of renamed identifiers)
+    """
+    names = NameTable()
+    code = obfuscate_code_with_ast(source, rng=random.Random(0), engine=engine, names=names)
+    return code, set(names.forward)
+
+
+@unittest.skipUnless(LIBCST_AVAILABLE, "the libcst engine needs libcst")
+class EngineParityTest(unittest.TestCase):
+
+    def test_engines_rename_the_same_identifiers(self):
+        for label, source in SAMPLES.items():
+            with self.subTest(sample=label):
+                renamed = {engine: obfuscate(source, engine)[1] for engine in ENGINES}
+                self.assertEqual(renamed["libcst"], renamed["ast"])
+                self.assertTrue(renamed["ast"])
+
+    def test_obfuscated_code_still_runs(self):
+        for label, source in SAMPLES.items():
+            expected = run_source(source)
+            for engine in ENGINES:
+                with self.subTest(sample=label, engine=engine):
+                    code, _ = obfuscate(source, engine)
+                    self.assertEqual(run_source(code), expected)
+
+    def test_reserved_names_are_kept(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                _, renamed = obfuscate(SAMPLES["parameters_and_keywords"], engine)
+                self.assertIn("width", renamed)
+                self.assertTrue({"print", "sorted", "key", "end", "sep", "maxsplit", "__init__"}.isdisjoint(renamed))
+                _, renamed = obfuscate(SAMPLES["imports_and_attributes"], engine)
+                self.assertTrue({"os", "path", "join", "collections", "fold"}.isdisjoint(renamed))
+
+
+
+@unittest.skipUnless(LIBCST_AVAILABLE, "the libcst engine needs libcst")
+class LibcstPipelineTest(unittest.TestCase):
+
+    def test_module_is_parsed_once(self):
+        from src import transformer_libcst
+
+        source = "# keep me\ntotal = 0\nfor step in range(3):\n    total += step\nprint(total)\n"
+        transformer_libcst.decoy_import_statements()
+        with mock.patch.object(transformer_libcst.cst, "parse_module", wraps=transformer_libcst.cst.parse_module) as parse:
+            code = obfuscate_code_with_ast(source, rng=random.Random(0), engine="libcst")
+        self.assertEqual(parse.call_count, 1)
+        self.assertIn("# keep me", code)
+        self.assertEqual(run_source(code), run_source(source))
+
+    def test_decoys_follow_assignments_and_end_the_module(self):
+        from src.utils import dummy_variable_assignments, generate_random_import_statements
+
+        source = "first = 1\nsecond = first + 1\nprint(second)\n"
+        code = obfuscate_code_with_ast(source, rng=random.Random(0), engine="libcst")
+        lines = [line.strip() for line in code.splitlines() if line.strip()]
+        dummies = {statement.replace(" ", "") for statement in dummy_variable_assignments}
+        self.assertIn(lines[1].replace(" ", ""), dummies)
+        self.assertIn(lines[3].replace(" ", ""), dummies)
+        decoy_block = [line.strip() for line in generate_random_import_statements().splitlines() if line.strip()]
+        self.assertEqual([line.replace(" ", "") for line in lines[-len(decoy_block):]],
+                         [line.replace(" ", "") for line in decoy_block])
+
+
+if __name__ == "__main__":
+    unittest.main()
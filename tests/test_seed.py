@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.utils import make_file_rng
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+SOURCES = {
+    "app.py": "import os\n\n\nclass Greeter:\n    def greet(self, name):\n        text = 'hi ' + name\n"
+              "        return text\n\n\nvalue = Greeter().greet(os.name)\n",
+    "web.js": "function greet(name) {\n  const text = 'hi ' + name;\n  return text;\n}\nconsole.log(greet('x'));\n",
+    "shapes.c": "#include <stdio.h>\nint area(int width, int height) {\n    int result = width * height;\n"
+                "    return result;\n}\n",
+    "server.go": "package main\n\nfunc double(value int) int {\n\tresult := value * 2\n\treturn result\n}\n",
+}
+
+
+class SeedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.workdir.name, "project")
+        os.mkdir(self.project)
+        for name, source in SOURCES.items():
+            with open(os.path.join(self.project, name), "w", encoding="utf-8") as f:
+                f.write(source)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def run_seeded(self, output: str, seed: str, hash_seed: str, *args: str) -> dict:
+        """
+        Obfuscate the project in a fresh interpreter.
+        
+        @param output: Output directory name under the work directory
+        @param seed: Value of --seed
+        @param hash_seed: PYTHONHASHSEED of the interpreter
+        @param args: Extra command-line arguments
+        @return: Dict of output file name to contents
+        """
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+        result = subprocess.run([sys.executable, MAIN, "--no-cache", "--seed", seed, *args,
+                                 "--output-dir", output, "project"],
+                                cwd=self.workdir.name, env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        outputs = {}
+        directory = os.path.join(self.workdir.name, output, "project")
+        for name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                outputs[name] = f.read()
+        return outputs
+
+    def test_output_does_not_depend_on_the_hash_seed_or_jobs(self):
+        first = self.run_seeded("first", "42", "0", "--jobs", "1")
+        self.assertEqual(len(first), len(SOURCES))
+        for hash_seed, jobs in (("1234", "1"), ("random", "2")):
+            with self.subTest(hash_seed=hash_seed, jobs=jobs):
+                self.assertEqual(self.run_seeded(f"run-{hash_seed}", "42", hash_seed, "--jobs", jobs), first)
+
+    def test_different_seeds_give_different_output(self):
+        first = self.run_seeded("first", "1", "0")
+        second = self.run_seeded("second", "2", "0")
+        for name in first:
+            with self.subTest(output=name):
+                self.assertNotEqual(first[name], second[name])
+
+    def test_file_generators_depend_on_seed_and_path(self):
+        draws = {(seed, path): make_file_rng(seed, path).random() for seed in (1, 2) for path in ("a.py", "b.py")}
+        self.assertEqual(len(set(draws.values())), 4)
+        self.assertEqual(make_file_rng(1, "a.py").random(), draws[1, "a.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import filecmp
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.shards import SHARD_REPORT_NAME, assign_shards, parse_shard
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+PROJECT_FILES = {
+    "app.py": "from util import scale\n\n\ndef run(values):\n    return [scale(value) for value in values]\n",
+    "util.py": "def scale(value, factor=2):\n    return value * factor\n",
+    "web/main.js": "function greet(name) {\n  return 'hi ' + name;\n}\nconsole.log(greet('x'));\n",
+    "web/big.js": "const table = [\n" + "  1,\n" * 2000 + "];\nconsole.log(table.length);\n",
+    "native/shapes.c": "int area(int width, int height) {\n    return width * height;\n}\n",
+    "docs/notes.txt": "not code\n",
+    "data.csv": "a,b\n1,2\n",
+}
+
+
+def run_cli(*args: str, cwd: str) -> subprocess.CompletedProcess:
+    """
+    Run main.py in a fresh interpreter.
+    
+    @param args: Command-line arguments
+    @param cwd: Working directory
+    @return: Completed process with captured text output
+    """
+    return subprocess.run([sys.executable, MAIN, "--no-cache", *args], cwd=cwd, capture_output=True, text=True)
+
+
+def same_tree(left: str, right: str) -> bool:
+    """
+    Compare two directory trees file by file.
+    
+    @param left: First directory
+    @param right: Second directory
+    @return: True if both hold the same paths with the same contents
+    """
+    comparison = filecmp.dircmp(left, right)
+    if comparison.left_only or comparison.right_only or comparison.funny_files:
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(left, right, comparison.common_files, shallow=False)
+    if mismatch or errors:
+        return False
+    return all(same_tree(os.path.join(left, name), os.path.join(right, name)) for name in comparison.common_dirs)
+
+
+class ShardSplitTest(unittest.TestCase):
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/8"), (2, 8))
+        for text in ("0/3", "4/3", "1", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_assign_shards_is_size_balanced_and_complete(self):
+        weights = {f"file{index}.py": (index * 7919) % 1000 + 1 for index in range(200)}
+        assignment = assign_shards(weights, 4)
+        self.assertEqual(set(assignment), set(weights))
+        loads = [sum(weights[key] for key in weights if assignment[key] == shard) for shard in range(1, 5)]
+        self.assertLessEqual(max(loads) - min(loads), max(weights.values()))
+        self.assertEqual(assignment, assign_shards(dict(reversed(list(weights.items()))), 4))
+
+
+class ShardMergeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.root = self.workdir.name
+        for relative_path, source in PROJECT_FILES.items():
+            path = os.path.join(self.root, "project", relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(source)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def run_documented_flow(self, project: str, cwd: str) -> None:
+        """
+        Run three shards into out1..out3, merge them and compare with an unsharded run.
+        
+        @param project: Project path as given on the command line
+        @param cwd: Directory the commands run in, which holds the output roots
+        @return: None
+        """
+        full = run_cli("--seed", "42", "--output-dir", "full", project, cwd=cwd)
+        self.assertEqual(full.returncode, 0, full.stdout + full.stderr)
+        for number in (1, 2, 3):
+            shard = run_cli("--seed", "42", "--shard", f"{number}/3", "--output-dir", f"out{number}", project,
+                            cwd=cwd)
+            self.assertEqual(shard.returncode, 0, shard.stdout + shard.stderr)
+        merge = run_cli("--merge-shards", "merged", "--report", "report.json", "out1", "out2", "out3", cwd=cwd)
+        self.assertEqual(merge.returncode, 0, merge.stdout + merge.stderr)
+
+        self.assertTrue(same_tree(os.path.join(cwd, "full"), os.path.join(cwd, "merged")))
+        with open(os.path.join(cwd, "report.json"), "r", encoding="utf-8") as f:
+            report = json.load(f)
+        code_files = [path for path in PROJECT_FILES if not path.endswith((".txt", ".csv"))]
+        self.assertEqual(len(report["files"]), len(code_files))
+        self.assertEqual(report["failed"], [])
+        self.assertEqual(sum(shard["files"] for shard in report["per_shard"]), len(code_files))
+        for _, _, names in os.walk(os.path.join(cwd, "merged")):
+            self.assertNotIn(SHARD_REPORT_NAME, names)
+
+    def test_relative_project_path(self):
+        self.run_documented_flow("project", self.root)
+
+    def test_absolute_project_path_outside_cwd(self):
+        ci_dir = os.path.join(self.root, "ci")
+        os.mkdir(ci_dir)
+        self.run_documented_flow(os.path.join(self.root, "project"), ci_dir)
+
+    def test_missing_shard_is_rejected(self):
+        for number in (1, 3):
+            run_cli("--seed", "1", "--shard", f"{number}/3", "--output-dir", f"out{number}", "project", cwd=self.root)
+        merge = run_cli("--merge-shards", "merged", "out1", "out3", cwd=self.root)
+        self.assertEqual(merge.returncode, 2)
+        self.assertIn("missing [2]", merge.stderr)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "merged")))
+
+
+if __name__ == "__main__":
+    unittest.main()
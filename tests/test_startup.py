@@ -0,0 +1,68 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from benchmarks.importtime import parse_importtime
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# Maximum median import time of one CLI run; SHITTIER_STARTUP_BUDGET_MS overrides it on slow machines.
+STARTUP_BUDGET_MS = float(os.environ.get("SHITTIER_STARTUP_BUDGET_MS", "100"))
+
+RUNS = 3
+
+# (file name, source, extra CLI arguments). The Python sample uses the ast engine:
+# the libcst engine necessarily imports libcst, which alone exceeds any useful budget.
+SAMPLES = [
+    ("sample.c", "int main(void) {\n    int x = 1;\n    return x;\n}\n", []),
+    ("sample.js", "const x = 1;\nconsole.log(x);\n", []),
+    ("sample.go", "package main\n\nfunc main() {\n\tx := 1\n\t_ = x\n}\n", []),
+    ("sample.py", "x = 1\nprint(x)\n", ["--engine", "ast"]),
+]
+
+
+def measure(path: str, extra_args: list, runs: int) -> tuple:
+    """
+    Run the CLI on path several times under -X importtime.
+    
+    @param path: Input file
+    @param extra_args: Additional command-line arguments
+    @param runs: Number of fresh interpreter runs
+    @return: Tuple of (median milliseconds, set of all imported module names)
+    """
+    totals = []
+    imported = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", MAIN, "--no-cache", *extra_args, path],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(path),
+        )
+        top_level, run_imports = parse_importtime(result.stderr)
+        imported |= run_imports
+        totals.append(sum(top_level.values()) / 1000)
+    return statistics.median(totals), imported
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_import_time_budget_and_no_libcst(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, source, extra_args in SAMPLES:
+                with self.subTest(sample=name):
+                    path = os.path.join(workdir, name)
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(source)
+                    median_ms, imported = measure(path, extra_args, RUNS)
+                    libcst_modules = sorted(module for module in imported
+                                            if module == "libcst" or module.startswith("libcst."))
+                    self.assertEqual(libcst_modules, [])
+                    self.assertLessEqual(median_ms, STARTUP_BUDGET_MS,
+                                         f"{name}: median import time {median_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import dis
+import random
+import types
+import unittest
+
+from benchmarks.overhead import HOT_PATHS
+from src.name_table import NameTable
+from src.transformer import ENGINES, LIBCST_AVAILABLE, obfuscate_code_with_ast
+from src.utils import dummy_variable_assignments
+
+
+def opcodes(code: types.CodeType) -> list:
+    """
+    List the operations of a code object and of the code objects nested in it, without NOPs.
+    
+    @param code: Compiled code
+    @return: Nested list of opcode names
+    """
+    operations = [instruction.opname for instruction in dis.get_instructions(code) if instruction.opname != "NOP"]
+    operations.extend(opcodes(const) for const in code.co_consts if isinstance(const, types.CodeType))
+    return operations
+
+
+def load(source: str) -> dict:
+    """
+    Execute a module and return its namespace.
+    
+    @param source: Python source code
+    @return: Module globals
+    """
+    namespace = {"__name__": "hot_paths"}
+    exec(compile(source, "<hot_paths>", "exec"), namespace)
+    return namespace
+
+
+@unittest.skipUnless(LIBCST_AVAILABLE, "the libcst engine needs libcst")
+class PerfNeutralProfileTest(unittest.TestCase):
+
+    def obfuscate(self, engine: str, profile: str) -> tuple:
+        """
+        Obfuscate the hot paths of benchmarks.overhead.
+        
+        @param engine: Engine name from ENGINES
+        @param profile: Transform profile
+        @return: Tuple of (obfuscated code, name table)
+        """
+        names = NameTable()
+        code = obfuscate_code_with_ast(HOT_PATHS, rng=random.Random(0), engine=engine, names=names,
+                                       transform_profile=profile)
+        return code, names
+
+    def test_functions_compile_to_the_original_bytecode(self):
+        original = load(HOT_PATHS)
+        functions = [name for name, value in original.items() if isinstance(value, types.FunctionType)]
+        self.assertTrue(functions)
+        for engine in ENGINES:
+            for profile in ("perf-neutral", "default"):
+                code, names = self.obfuscate(engine, profile)
+                obfuscated = load(code)
+                for name in functions:
+                    with self.subTest(engine=engine, profile=profile, function=name):
+                        same = opcodes(original[name].__code__) == opcodes(obfuscated[names.get(name)].__code__)
+                        self.assertEqual(same, profile == "perf-neutral")
+
+    def test_renames_and_module_decoys_are_kept(self):
+        source = "limit = 10\n\n\ndef count(stop):\n    total = 0\n    for step in range(stop):\n" \
+                 "        total += step\n    return total\n\n\nresult = count(limit)\n"
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                codes, names = {}, {}
+                for profile in ("perf-neutral", "default"):
+                    table = NameTable()
+                    codes[profile] = obfuscate_code_with_ast(source, rng=random.Random(0), engine=engine, names=table,
+                                                             transform_profile=profile)
+                    names[profile] = set(table.forward)
+                    self.assertEqual(load(codes[profile])[table.get("result")], 45)
+                self.assertEqual(names["perf-neutral"], names["default"])
+                module_lines = [line.replace(" ", "") for line in codes["perf-neutral"].splitlines()
+                                if line and not line[0].isspace()]
+                decoys = {statement.replace(" ", "") for statement in dummy_variable_assignments}
+                self.assertTrue(decoys & set(module_lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
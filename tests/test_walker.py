@@ -0,0 +1,168 @@
+import os
+import tempfile
+import unittest
+
+from src.options import WalkOptions
+from src.walker import IgnoreRule, TreeWalker, parse_ignore_lines, parse_size, passthrough_file
+
+
+TREE = {
+    ".gitignore": "*.log\n!keep.log\nbuild/\n/top.txt\n",
+    ".git/config": "[core]\n",
+    "app.py": "value = 1\n",
+    "debug.log": "ignored\n",
+    "keep.log": "kept\n",
+    "top.txt": "ignored at the root only\n",
+    "build/out.py": "value = 2\n",
+    "data/big.csv": "x" * 4096,
+    "data/small.csv": "a,b\n",
+    "pkg/.shittierignore": "secret.py\n",
+    "pkg/secret.py": "token = 1\n",
+    "pkg/top.txt": "kept below the root\n",
+    "pkg/tool.py": "value = 3\n",
+}
+
+
+class IgnoreRuleTest(unittest.TestCase):
+
+    def test_patterns(self):
+        cases = [
+            ("*.py", "a/b/c.py", False, True),
+            ("/*.py", "a/c.py", False, False),
+            ("/*.py", "c.py", False, True),
+            ("docs/*.md", "docs/a.md", False, True),
+            ("docs/*.md", "x/docs/a.md", False, False),
+            ("**/fixtures", "a/b/fixtures", True, True),
+            ("logs/**", "logs/a/b.txt", False, True),
+            ("a/**/b", "a/b", False, True),
+            ("a/**/b", "a/x/y/b", False, True),
+            ("build/", "build", False, False),
+            ("build/", "src/build", True, True),
+            ("file?.[ch]", "file1.c", False, True),
+            ("file?.[!ch]", "file1.c", False, False),
+        ]
+        for pattern, path, is_dir, expected in cases:
+            with self.subTest(pattern=pattern, path=path):
+                self.assertEqual(IgnoreRule(pattern).matches(path, is_dir), expected)
+
+    def test_rules_apply_below_their_directory(self):
+        rule = IgnoreRule("/secret.py", "pkg")
+        self.assertTrue(rule.matches("pkg/secret.py", False))
+        self.assertFalse(rule.matches("secret.py", False))
+        self.assertFalse(rule.matches("pkg/sub/secret.py", False))
+
+    def test_ignore_file_lines(self):
+        rules = parse_ignore_lines(["# comment\n", "\n", "\\#hash\n", "!keep\n", "trailing   \n"])
+        self.assertEqual(len(rules), 3)
+        self.assertTrue(rules[0].matches("#hash", False))
+        self.assertTrue(rules[1].negate)
+        self.assertTrue(rules[2].matches("trailing", False))
+
+    def test_sizes(self):
+        self.assertEqual(parse_size("500"), 500)
+        self.assertEqual(parse_size("64K"), 64 * 1024)
+        self.assertEqual(parse_size("10MiB"), 10 * 1024 ** 2)
+        self.assertEqual(parse_size("2g"), 2 * 1024 ** 3)
+        with self.assertRaises(ValueError):
+            parse_size("ten")
+
+
+class TreeWalkerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.root = self.workdir.name
+        for name, text in TREE.items():
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        os.symlink("app.py", os.path.join(self.root, "link.py"))
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def walk(self, options: WalkOptions = None) -> list:
+        """
+        Walk the test tree.
+        
+        @param options: Walk options. None uses defaults
+        @return: List of (relative path with forward slashes, kind), in walk order
+        """
+        return [(relative_path.replace(os.sep, "/"), kind)
+                for _, relative_path, kind in TreeWalker(self.root, options).walk()]
+
+    def test_ignore_files_and_vcs_directories(self):
+        self.assertEqual(self.walk(), [
+            (".gitignore", "file"),
+            ("app.py", "file"),
+            ("data", "dir"),
+            ("keep.log", "file"),
+            ("link.py", "other"),
+            ("pkg", "dir"),
+            ("data/big.csv", "file"),
+            ("data/small.csv", "file"),
+            ("pkg/.shittierignore", "file"),
+            ("pkg/tool.py", "file"),
+            ("pkg/top.txt", "file"),
+        ])
+
+    def test_exclude_patterns_and_size_limit(self):
+        walked = dict(self.walk(WalkOptions(exclude=("*.csv", "!small.csv", "pkg/tool.py"), max_file_size=1024)))
+        self.assertNotIn("data/big.csv", walked)
+        self.assertEqual(walked["data/small.csv"], "file")
+        self.assertNotIn("pkg/tool.py", walked)
+        walked = dict(self.walk(WalkOptions(max_file_size=1024)))
+        self.assertEqual(walked["data/big.csv"], "large")
+
+    def test_no_ignore_walks_everything(self):
+        walked = dict(self.walk(WalkOptions(use_ignore_files=False)))
+        for name in TREE:
+            with self.subTest(name=name):
+                self.assertEqual(walked[name], "file")
+
+    def test_single_paths_and_skipped_directories(self):
+        walker = TreeWalker(self.root, skip=(os.path.join(self.root, "data"),))
+        self.assertTrue(walker.is_ignored(os.path.join(self.root, "build", "out.py")))
+        self.assertTrue(walker.is_ignored(os.path.join(self.root, "pkg", "secret.py")))
+        self.assertTrue(walker.is_ignored(os.path.join(self.root, "data", "small.csv")))
+        self.assertFalse(walker.is_ignored(os.path.join(self.root, "pkg", "top.txt")))
+        self.assertFalse(walker.is_ignored(os.path.join(self.root, "keep.log")))
+        self.assertNotIn("data", {path for _, path, _ in walker.walk()})
+
+
+class PassthroughTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.workdir.name, "notes.txt")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("not code\n")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_modes(self):
+        for mode in ("copy", "hardlink", "reflink"):
+            with self.subTest(mode=mode):
+                target = os.path.join(self.workdir.name, mode, "notes.txt")
+                passthrough_file(self.source, target, mode)
+                with open(target, encoding="utf-8") as f:
+                    self.assertEqual(f.read(), "not code\n")
+                self.assertEqual(os.path.samefile(self.source, target), mode == "hardlink")
+        target = os.path.join(self.workdir.name, "skip", "notes.txt")
+        passthrough_file(self.source, target, "skip")
+        self.assertFalse(os.path.lexists(target))
+
+    def test_copy_replaces_an_earlier_hardlink(self):
+        target = os.path.join(self.workdir.name, "out", "notes.txt")
+        passthrough_file(self.source, target, "hardlink")
+        passthrough_file(self.source, target, "copy")
+        with open(target, "w", encoding="utf-8") as f:
+            f.write("edited output\n")
+        with open(self.source, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "not code\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from src.watcher import InotifyWatcher, PollingWatcher, Watcher
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def wait_for(condition, timeout: float = 15.0) -> bool:
+    """
+    Poll a condition until it holds or the timeout passes.
+    
+    @param condition: Zero-argument callable
+    @param timeout: Seconds to wait
+    @return: True if the condition held in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+class ScriptedWatcher(Watcher):
+    """
+    Watcher that reports prepared batches of changes, one per read.
+    """
+
+    def __init__(self, batches: list):
+        """
+        Initialize the watcher.
+        
+        @param batches: Sets of paths returned by successive read_changes() calls
+        @return: None
+        """
+        super().__init__([])
+        self.batches = list(batches)
+
+    def read_changes(self, timeout: float = None) -> set:
+        """
+        Return the next prepared batch.
+        
+        @param timeout: Ignored
+        @return: Set of paths, empty once the batches run out
+        """
+        return self.batches.pop(0) if self.batches else set()
+
+
+class WatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self.workdir.name)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        """
+        Create a file below the root, with its parent directories.
+        
+        @param name: Path relative to the root
+        @param text: File contents
+        @return: Absolute path of the file
+        """
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_watcher_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Watcher([self.root])
+
+    def test_bursts_are_merged_into_one_batch(self):
+        watcher = ScriptedWatcher([set(), {"a"}, {"b"}, set(), {"c"}])
+        self.assertEqual(watcher.wait_for_changes(quiet=0.01), {"a", "b"})
+        self.assertEqual(watcher.wait_for_changes(quiet=0.01), {"c"})
+
+    def test_polling_watcher_reports_changes(self):
+        kept = self.write("kept.py", "value = 1\n")
+        removed = self.write("removed.py", "value = 2\n")
+        watcher = PollingWatcher([self.root], ignore=lambda path: path.endswith(".log"), interval=0.01)
+        self.assertEqual(watcher.read_changes(0), set())
+        with open(kept, "a", encoding="utf-8") as f:
+            f.write("value += 1\n")
+        os.remove(removed)
+        added = self.write("pkg/added.py", "value = 3\n")
+        self.write("debug.log", "ignored\n")
+        self.assertEqual(watcher.read_changes(0),
+                         {kept, removed, os.path.dirname(added), added})
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_inotify_watcher_reports_changes(self):
+        watcher = InotifyWatcher([self.root])
+        try:
+            os.mkdir(os.path.join(self.root, "pkg"))
+            self.assertIn(os.path.join(self.root, "pkg"), watcher.wait_for_changes(quiet=0.05))
+            added = self.write("pkg/added.py", "value = 1\n")
+            self.assertIn(added, watcher.wait_for_changes(quiet=0.05))
+        finally:
+            watcher.close()
+
+    def test_watch_mode_updates_the_mirror(self):
+        project = os.path.join(self.root, "project")
+        self.write("project/app.py", "value = 1\n")
+        self.write("project/old.js", "const value = 1;\n")
+        mirror = os.path.join(self.root, "shittified_project")
+        process = subprocess.Popen([sys.executable, MAIN, "--no-cache", "--watch", "--watch-polling", project],
+                                   cwd=self.root, env=dict(os.environ, PYTHONUNBUFFERED="1"),
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        try:
+            for line in process.stdout:
+                if line.startswith("Watching"):
+                    break
+            self.assertTrue(os.path.exists(os.path.join(mirror, "old.shittified.js")))
+            self.write("project/pkg/new.py", "def double(value):\n    return value * 2\n")
+            os.remove(os.path.join(project, "old.js"))
+            self.assertTrue(wait_for(lambda: os.path.exists(os.path.join(mirror, "pkg", "new.shittified.py"))))
+            self.assertTrue(wait_for(lambda: not os.path.exists(os.path.join(mirror, "old.shittified.js"))))
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.communicate(timeout=15)
+
+
+if __name__ == "__main__":
+    unittest.main()